@@ -0,0 +1,296 @@
+import argparse
+import functools
+import os
+import time
+import wave
+import numpy as np
+from startup import LazyResource
+import metrics
+
+# Trained with `python acoustic_emotion.py train <folder>`; QUIZ_ACOUSTIC_MODEL points elsewhere
+ACOUSTIC_MODEL_ENV = "QUIZ_ACOUSTIC_MODEL"
+ACOUSTIC_MODEL_PATH = "acoustic_emotion.npz"
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+N_MELS = 26
+N_MFCC = 13
+PRE_EMPHASIS = 0.97
+PITCH_RANGE = (75.0, 400.0)
+# Normalized autocorrelation a frame needs to count as voiced
+VOICING_THRESHOLD = 0.45
+# Share of the fused distribution that comes from the transcript
+TEXT_WEIGHT = 0.6
+_EPS = 1e-10
+
+FRAME_FEATURES = ["log_energy", "zero_crossings", "centroid", "bandwidth", "rolloff", "flatness"] + [
+    f"mfcc{i}" for i in range(N_MFCC)
+]
+FEATURE_NAMES = [f"{name}_{stat}" for stat in ("mean", "std") for name in FRAME_FEATURES] + [
+    "pitch_mean", "pitch_std", "pitch_range", "voiced_fraction", "energy_delta_std",
+]
+
+
+def read_wav(path):
+    # (int16 mono samples, sample rate) of a 16-bit PCM WAV file
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if wav.getnchannels() > 1:
+            samples = samples.reshape(-1, wav.getnchannels()).mean(axis=1).astype(np.int16)
+        return samples, wav.getframerate()
+
+
+def frame_signal(signal, frame_length, hop):
+    # (frames, frame_length) strided view; short signals are zero padded to one frame
+    if len(signal) < frame_length:
+        signal = np.pad(signal, (0, frame_length - len(signal)))
+    return np.lib.stride_tricks.sliding_window_view(signal, frame_length)[::hop]
+
+
+@functools.lru_cache(maxsize=8)
+def analysis_setup(sample_rate):
+    # Window, FFT sizes, mel filterbank and DCT matrix for one sample rate, built once
+    frame_length = int(sample_rate * FRAME_SECONDS)
+    n_fft = 1 << (frame_length - 1).bit_length()
+    window = np.hanning(frame_length).astype(np.float32)
+
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    edges = mel_to_hz(np.linspace(0.0, hz_to_mel(sample_rate / 2.0), N_MELS + 2))
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    filterbank = np.maximum(0.0, np.minimum((freqs - lower) / (center - lower), (upper - freqs) / (upper - center)))
+    k = np.arange(N_MFCC)[:, None]
+    dct = np.cos(np.pi * k * (2 * np.arange(N_MELS) + 1) / (2 * N_MELS)) * np.sqrt(2.0 / N_MELS)
+
+    # Autocorrelation of the window, to undo its taper on the pitch estimate
+    n_ac = 1 << (2 * frame_length - 1).bit_length()
+    window_ac = np.fft.irfft(np.abs(np.fft.rfft(window, n_ac)) ** 2)[:frame_length]
+    return {
+        "frame_length": frame_length,
+        "hop": int(sample_rate * HOP_SECONDS),
+        "n_fft": n_fft,
+        "n_ac": n_ac,
+        "window": window,
+        "freqs": freqs.astype(np.float32),
+        "filterbank": filterbank.T.astype(np.float32),
+        "dct": dct.T.astype(np.float32),
+        "window_ac": (window_ac / window_ac[0]).astype(np.float32),
+        "lags": (int(sample_rate / PITCH_RANGE[1]), int(sample_rate / PITCH_RANGE[0])),
+    }
+
+
+def frame_features(samples, sample_rate=SAMPLE_RATE):
+    """Per-frame acoustic features of an int16 or float waveform, all frames at once.
+
+    Returns (features, pitch, voiced): a (frames, len(FRAME_FEATURES))
+    matrix of energy, zero-crossing rate, spectral centroid, bandwidth,
+    roll-off, flatness and MFCCs, plus the autocorrelation pitch in Hz and
+    a voiced mask per frame.
+    """
+    setup = analysis_setup(sample_rate)
+    x = np.asarray(samples, dtype=np.float32)
+    if np.issubdtype(np.asarray(samples).dtype, np.integer):
+        x = x / 32768.0
+    raw = frame_signal(x, setup["frame_length"], setup["hop"])
+    emphasized = frame_signal(np.append(x[:1], x[1:] - PRE_EMPHASIS * x[:-1]), setup["frame_length"], setup["hop"])
+    windowed = emphasized * setup["window"]
+
+    power = np.abs(np.fft.rfft(windowed, setup["n_fft"])) ** 2 / setup["n_fft"]
+    total = power.sum(axis=1) + _EPS
+    freqs = setup["freqs"]
+    centroid = power @ freqs / total
+    bandwidth = np.sqrt(np.maximum(power @ (freqs * freqs) / total - centroid ** 2, 0.0))
+    rolloff = freqs[np.argmax(np.cumsum(power, axis=1) >= 0.85 * total[:, None], axis=1)]
+    flatness = np.exp(np.mean(np.log(power + _EPS), axis=1)) / (np.mean(power, axis=1) + _EPS)
+    mfcc = np.log(power @ setup["filterbank"] + _EPS) @ setup["dct"]
+
+    energy = np.mean(raw * raw, axis=1)
+    zero_crossings = np.mean(np.abs(np.diff(np.signbit(raw).astype(np.int8), axis=1)), axis=1)
+
+    # Pitch from the peak of the normalized autocorrelation within PITCH_RANGE
+    spectrum = np.fft.rfft(raw * setup["window"], setup["n_ac"])
+    ac = np.fft.irfft(np.abs(spectrum) ** 2)[:, :setup["frame_length"]]
+    ac = ac / (ac[:, :1] + _EPS) / setup["window_ac"]
+    low, high = setup["lags"]
+    lag = np.argmax(ac[:, low:high], axis=1) + low
+    strength = ac[np.arange(len(ac)), lag]
+    voiced = (strength > VOICING_THRESHOLD) & (energy > 0.05 * energy.max() + _EPS)
+    pitch = sample_rate / lag
+
+    features = np.column_stack([
+        np.log(energy + _EPS), zero_crossings, centroid, bandwidth, rolloff, flatness, mfcc,
+    ]).astype(np.float32)
+    return features, pitch.astype(np.float32), voiced
+
+
+def utterance_features(samples, sample_rate=SAMPLE_RATE):
+    # One fixed-length vector (FEATURE_NAMES) summarizing a whole utterance
+    features, pitch, voiced = frame_features(samples, sample_rate)
+    if voiced.any():
+        semitones = 12.0 * np.log2(pitch[voiced] / 100.0)
+        prosody = [semitones.mean(), semitones.std(), np.ptp(semitones), voiced.mean()]
+    else:
+        prosody = [0.0, 0.0, 0.0, 0.0]
+    energy_delta = np.diff(features[:, 0]) if len(features) > 1 else np.zeros(1)
+    return np.concatenate([
+        features.mean(axis=0), features.std(axis=0), prosody, [energy_delta.std()],
+    ]).astype(np.float32)
+
+
+class AcousticEmotionModel:
+    """Standardized features into a softmax (multinomial logistic) regression.
+
+    Small enough to train in seconds with NumPy on a few hundred labeled
+    utterances and to evaluate in microseconds.
+    """
+
+    def __init__(self, labels, mean, scale, weights, bias):
+        self.labels = list(labels)
+        self.mean = mean
+        self.scale = scale
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def fit(cls, features, labels, l2=1e-2, iterations=500, learning_rate=0.5):
+        features = np.asarray(features, dtype=np.float64)
+        names = sorted(set(labels))
+        targets = np.eye(len(names))[[names.index(label) for label in labels]]
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0) + 1e-6
+        x = (features - mean) / scale
+        weights = np.zeros((x.shape[1], len(names)))
+        bias = np.zeros(len(names))
+        for _ in range(iterations):
+            probs = _softmax(x @ weights + bias)
+            error = (probs - targets) / len(x)
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        return cls(names, mean, scale, weights, bias)
+
+    def predict_proba(self, features):
+        x = (np.atleast_2d(features) - self.mean) / self.scale
+        return _softmax(x @ self.weights + self.bias)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, labels=np.array(self.labels), mean=self.mean, scale=self.scale,
+                     weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["labels"].tolist(), data["mean"], data["scale"], data["weights"], data["bias"])
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def acoustic_model_path():
+    return os.environ.get(ACOUSTIC_MODEL_ENV, ACOUSTIC_MODEL_PATH)
+
+
+class AcousticEmotionEngine:
+    """Emotion straight from the waveform, without waiting for a transcript.
+
+    classify() returns every label with its probability, best first, in the
+    text classifier's [{"label", "score"}] format so either result (or
+    fuse_emotions() of both) can drive the quiz.
+    """
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or acoustic_model_path()
+        self._model = LazyResource("acoustic emotion model", lambda: AcousticEmotionModel.load(self.model_path))
+
+    @property
+    def available(self):
+        return self._model.loaded or os.path.exists(self.model_path)
+
+    def prefetch(self):
+        if self.available:
+            self._model.prefetch()
+
+    @metrics.instrument("acoustic_emotion")
+    def classify(self, samples, sample_rate=SAMPLE_RATE):
+        model = self._model.get()
+        probs = model.predict_proba(utterance_features(samples, sample_rate))[0]
+        order = np.argsort(probs)[::-1]
+        return [{"label": model.labels[i], "score": float(probs[i])} for i in order]
+
+    def classify_wav(self, path):
+        return self.classify(*read_wav(path))
+
+
+def fuse_emotions(text_result, acoustic_result, text_weight=TEXT_WEIGHT):
+    # Weighted mix of two [{"label", "score"}] results; labels one side does not
+    # score get an even share of that side's leftover probability
+    labels = list(dict.fromkeys([r["label"] for r in acoustic_result] + [r["label"] for r in text_result]))
+
+    def distribution(result):
+        scores = {r["label"]: r["score"] for r in result}
+        missing = [label for label in labels if label not in scores]
+        rest = max(0.0, 1.0 - sum(scores.values()))
+        scores.update({label: rest / len(missing) for label in missing})
+        return scores
+
+    text, acoustic = distribution(text_result), distribution(acoustic_result)
+    fused = {label: text_weight * text[label] + (1.0 - text_weight) * acoustic[label] for label in labels}
+    return [{"label": label, "score": score} for label, score in sorted(fused.items(), key=lambda item: -item[1])]
+
+
+def load_labeled_folder(folder):
+    # One subfolder of WAV files per emotion, named like the text classifier's
+    # labels (joy, sadness, anger, ...) so the two results can be fused
+    features, labels = [], []
+    for label in sorted(os.listdir(folder)):
+        label_dir = os.path.join(folder, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(".wav"):
+                features.append(utterance_features(*read_wav(os.path.join(label_dir, name))))
+                labels.append(label)
+    return np.array(features), labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or run the acoustic emotion model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="fit the model on a folder with one subfolder of WAVs per emotion")
+    train_parser.add_argument("folder")
+    train_parser.add_argument("--out", default=acoustic_model_path())
+    predict_parser = commands.add_parser("predict", help="classify WAV files")
+    predict_parser.add_argument("wavs", nargs="+")
+    predict_parser.add_argument("--model", default=acoustic_model_path())
+    args = parser.parse_args()
+
+    if args.command == "train":
+        features, labels = load_labeled_folder(args.folder)
+        if not labels:
+            parser.error(f"no labeled WAV files under {args.folder}")
+        model = AcousticEmotionModel.fit(features, labels)
+        accuracy = np.mean(np.array(model.labels)[model.predict_proba(features).argmax(axis=1)] == labels)
+        model.save(args.out)
+        print(f"Trained on {len(labels)} utterances ({', '.join(model.labels)}); "
+              f"training accuracy {accuracy:.1%}; saved {args.out}")
+    else:
+        engine = AcousticEmotionEngine(args.model)
+        for path in args.wavs:
+            start_time = time.perf_counter()
+            best = engine.classify_wav(path)[0]
+            print(f"{path}: {best['label']} ({best['score']:.2f}) "
+                  f"in {(time.perf_counter() - start_time) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
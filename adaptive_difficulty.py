@@ -0,0 +1,128 @@
+import bisect
+import math
+from collections import deque
+from question_bank import DIFFICULTIES
+
+# Item difficulty of each tier on the ability (logit) scale of a Rasch model
+TIER_RATINGS = {"Easy": -1.0, "Medium": 0.0, "Hard": 1.0}
+# Aim for questions the student gets right this often
+TARGET_SUCCESS = 0.6
+# Elo step size, shrinking from K_START towards K_MIN as answers accumulate
+K_START = 1.2
+K_MIN = 0.3
+# Weight of the emotion/engagement tier: all of it before the first answer,
+# never less than SIGNAL_FLOOR once the answers speak for themselves
+SIGNAL_FLOOR = 0.3
+SIGNAL_HALF_LIFE = 3
+
+
+def success_probability(ability, rating):
+    return 1.0 / (1.0 + math.exp(rating - ability))
+
+
+class StudentAbility:
+    # Running Elo/Rasch ability estimate of one student
+    def __init__(self, rating=0.0):
+        self.rating = rating
+        self.answered = 0
+        self.correct = 0
+
+    @property
+    def k(self):
+        return max(K_MIN, K_START / (1.0 + 0.25 * self.answered))
+
+    def update(self, item_rating, correct):
+        expected = success_probability(self.rating, item_rating)
+        self.rating += self.k * (float(correct) - expected)
+        self.answered += 1
+        self.correct += bool(correct)
+        return expected
+
+
+class AdaptiveDifficulty:
+    """Per-question difficulty from answer history blended with live signals.
+
+    record_answer() moves the student's ability after every answer, Elo
+    style, against the rating of the tier the question came from.
+    next_difficulty() mixes the rating at which the student should succeed
+    TARGET_SUCCESS of the time with the tier the current emotion or
+    engagement suggests; the signal dominates at the start of a quiz and
+    fades towards SIGNAL_FLOOR as answers come in. Abilities are kept per
+    student name (None for an unidentified student) for the whole session.
+    """
+
+    def __init__(self, ratings=None, target_success=TARGET_SUCCESS):
+        self.ratings = dict(ratings or TIER_RATINGS)
+        self.tiers = sorted(self.ratings, key=self.ratings.get)
+        values = [self.ratings[tier] for tier in self.tiers]
+        self._edges = [(a + b) / 2 for a, b in zip(values, values[1:])]
+        self.offset = math.log(target_success / (1.0 - target_success))
+        self.students = {}
+
+    def ability(self, student=None):
+        if student not in self.students:
+            self.students[student] = StudentAbility()
+        return self.students[student]
+
+    def record_answer(self, student, difficulty, correct):
+        # Returns the probability the model gave the student of answering correctly
+        rating = self.ratings.get(str(difficulty).capitalize(), 0.0)
+        return self.ability(student).update(rating, correct)
+
+    def signal_weight(self, student=None):
+        answered = self.ability(student).answered
+        return max(SIGNAL_FLOOR, 1.0 / (1.0 + answered / SIGNAL_HALF_LIFE))
+
+    def target_rating(self, student=None, signal=None):
+        ability = self.ability(student)
+        target = ability.rating - self.offset
+        if signal not in self.ratings:
+            return target
+        weight = self.signal_weight(student)
+        return weight * self.ratings[signal] + (1.0 - weight) * target
+
+    def tier_for(self, rating):
+        return self.tiers[bisect.bisect(self._edges, rating)]
+
+    def next_difficulty(self, student=None, signal=None):
+        return self.tier_for(self.target_rating(student, signal))
+
+
+class QuestionPool:
+    """Questions drawn ahead of time into one bucket per tier.
+
+    draw() pops the next question of a tier in O(1); a bucket is refilled
+    with batch questions from source.sample() only when it runs dry.
+    Questions already handed out in this pool are skipped.
+    """
+
+    def __init__(self, source, batch=20, tiers=DIFFICULTIES):
+        self.source = source
+        self.batch = batch
+        self.buckets = {tier: deque() for tier in tiers}
+        self.asked = set()
+
+    def _refill(self, tier):
+        fresh = [q for q in self.source.sample(tier, self.batch) if q["Question"] not in self.asked]
+        self.buckets[tier].extend(fresh)
+        return bool(fresh)
+
+    def draw(self, tier):
+        bucket = self.buckets[tier]
+        while True:
+            while bucket:
+                question = bucket.popleft()
+                if question["Question"] not in self.asked:
+                    self.asked.add(question["Question"])
+                    return question
+            if not self._refill(tier):
+                return None
+
+    def draw_many(self, tier, k):
+        questions = []
+        for _ in range(k):
+            question = self.draw(tier)
+            if question is None:
+                break
+            questions.append(question)
+        return questions
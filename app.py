@@ -4,11 +4,15 @@ from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QPushButton,
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
 import os
+import model_server
 
 class ScriptLauncher(QMainWindow):
     def __init__(self):
         super().__init__()
 
+        # Keep the quiz apps' models warm in one long-lived process
+        self.model_server = model_server.start_server()
+
         self.setWindowTitle("Script Launcher")
         self.showFullScreen()  # Make the app full-screen
         self.setStyleSheet("background-color: #1E1E2E; color: white;")
@@ -55,6 +59,11 @@ class ScriptLauncher(QMainWindow):
         except Exception as e:
             print(f"Error launching {script_name}: {e}")
 
+    def closeEvent(self, event):
+        # Apps still running fall back to loading their models locally
+        model_server.stop_server(self.model_server)
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = ScriptLauncher()
@@ -0,0 +1,247 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import multiprocessing
+import numpy as np
+from replay import open_capture
+
+DEFAULT_VIDEO = "dataset"
+DEFAULT_AUDIO = "temp_audio.wav"
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    """Per-stage latency samples for one pipeline run.
+
+    A stage that raises is disabled with the error as its skip reason, so a
+    machine without e.g. the DeepFace weights still benchmarks the rest.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.skipped = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+
+    def run(self, name, fn, *args):
+        # (True, fn(*args)), or (False, None) once the stage has failed
+        if name in self.skipped:
+            return False, None
+        try:
+            with self.stage(name):
+                return True, fn(*args)
+        except Exception as e:
+            self.skipped[name] = f"{type(e).__name__}: {e}"
+            return False, None
+
+    def summary(self):
+        stages = {}
+        for name, samples in self.samples.items():
+            ms = np.asarray(samples) * 1000.0
+            stats = {"count": len(ms), "mean_ms": float(ms.mean())}
+            stats.update({f"p{p}_ms": float(v) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))})
+            stages[name] = stats
+        return stages
+
+
+def frames(source, timer, max_frames):
+    cap = open_capture(source)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video source {source!r}")
+    try:
+        for _ in range(max_frames):
+            with timer.stage("decode"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def face_pipeline(video, audio, timer, max_frames):
+    import face_models
+    from perception import PerceptionPipeline
+
+    pipeline = PerceptionPipeline(face_models.detect_faces, keep_crops=True)
+    count = 0
+    for frame in frames(video, timer, max_frames):
+        count += 1
+        _, observations = timer.run("faces", pipeline, frame)
+        crops = [observation.crop for observation in observations or []]
+        if crops:
+            timer.run("emotion", face_models.predict_emotion_proba, crops)
+            timer.run("identity", face_models.identify_student, crops)
+    return count
+
+
+def eye_pipeline(video, audio, timer, max_frames):
+    import face_models
+    from face_tracking import FaceTracker, landmark_boxes
+    from landmarks import average_ear, engagement_levels
+    from preprocessing import HOG_DETECT_WIDTH, FramePreprocessor
+
+    preprocessor = FramePreprocessor(detect_width=HOG_DETECT_WIDTH)
+    tracker = FaceTracker(preprocessor.detector(face_models.detect_faces_hog), redetect_every=10, tracker_factory=None)
+    count = 0
+    for frame in frames(video, timer, max_frames):
+        count += 1
+        gray = preprocessor.gray(frame)
+        ok, boxes = timer.run("faces", tracker.update, frame, gray)
+        if not ok:
+            continue
+        ok, points = timer.run("landmarks", face_models.get_face_landmarks, gray, boxes)
+        if not ok:
+            continue
+        tracker.refine(landmark_boxes(points))
+        preprocessor.follow(tracker.boxes)
+        if len(points):
+            timer.run("engagement", lambda p: engagement_levels(average_ear(p)), points)
+    return count
+
+
+def speech_pipeline(video, audio, timer, max_frames):
+    from acoustic_emotion import AcousticEmotionEngine
+    from speech_backends import GoogleRecognizer, VoskRecognizer, WavFileSource, chunk_rms
+    from text_emotion import TextEmotionService
+    from voice_activity import VoiceActivityDetector
+
+    source = WavFileSource(audio)
+    detector = VoiceActivityDetector(source.sample_rate)
+    count = 0
+    acoustic = AcousticEmotionEngine()
+    for chunk in source.chunks():
+        count += 1
+        timer.run("rms", chunk_rms, chunk)
+        ok, utterances = timer.run("vad", detector.feed, chunk)
+        for utterance in utterances if ok else []:
+            # Tone-of-voice emotion, available as soon as the utterance ends
+            timer.run("acoustic", acoustic.classify, utterance, source.sample_rate)
+    # Endpointing is the offline half of the Google backend; the upload itself is not measured
+    timer.run("endpoint", GoogleRecognizer().record, WavFileSource(audio))
+    ok, text = timer.run("transcribe", VoskRecognizer().transcribe, WavFileSource(audio), None, False)
+    if ok and text:
+        timer.run("text_emotion", TextEmotionService().classify, text)
+    return count
+
+
+def combined_pipeline(video, audio, timer, max_frames):
+    # The session engine's single-detection pipeline with every head enabled
+    from session_engine import make_face_analyzer
+
+    analyze = make_face_analyzer()
+    count = 0
+    for frame in frames(video, timer, max_frames):
+        count += 1
+        timer.run("perceive", analyze, frame)
+    return count
+
+
+PIPELINES = {"face": face_pipeline, "eye": eye_pipeline, "speech": speech_pipeline, "combined": combined_pipeline}
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def run_pipeline(name, video=DEFAULT_VIDEO, audio=DEFAULT_AUDIO, max_frames=300):
+    timer = StageTimer()
+    start = time.perf_counter()
+    units = PIPELINES[name](video, audio, timer, max_frames)
+    seconds = time.perf_counter() - start
+    return {
+        "units": units,
+        "seconds": seconds,
+        "units_per_sec": units / seconds if seconds else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": timer.summary(),
+        "skipped": timer.skipped,
+    }
+
+
+def measure(name, video=DEFAULT_VIDEO, audio=DEFAULT_AUDIO, max_frames=300):
+    # A fresh process per pipeline so peak memory is not inherited from the others
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_pipeline, name, video, audio, max_frames).result()
+
+
+def compare(results, baseline, tolerance=0.2):
+    # Human-readable regressions against a previous --json report; a pipeline or
+    # stage the baseline measured that is now missing or skipped counts as one
+    regressions = []
+    for name, base in baseline.items():
+        result = results.get(name)
+        if result is None:
+            regressions.append(f"{name}: measured in the baseline but not run")
+            continue
+        skipped = result.get("skipped", {})
+        for stage in base["stages"]:
+            if stage in skipped:
+                regressions.append(f"{name}.{stage}: skipped ({skipped[stage]})")
+            elif stage not in result["stages"]:
+                regressions.append(f"{name}.{stage}: measured in the baseline but not run")
+        if result["units_per_sec"] < base["units_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['units_per_sec']:.1f}/s vs baseline {base['units_per_sec']:.1f}/s"
+            )
+        for stage, stats in result["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats and stats["p95_ms"] > base_stats["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name}.{stage}: p95 {stats['p95_ms']:.2f}ms vs baseline {base_stats['p95_ms']:.2f}ms"
+                )
+    return regressions
+
+
+def print_report(results):
+    for name, result in results.items():
+        memory = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{name}: {result['units']} units in {result['seconds']:.2f}s "
+              f"({result['units_per_sec']:.1f}/s), peak RSS {memory}")
+        for stage, stats in result["stages"].items():
+            print(f"  {stage:<12} n={stats['count']:<5} p50 {stats['p50_ms']:8.2f}ms "
+                  f"p95 {stats['p95_ms']:8.2f}ms p99 {stats['p99_ms']:8.2f}ms")
+        for stage, reason in result["skipped"].items():
+            print(f"  {stage:<12} skipped ({reason})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the quiz pipelines on recorded video and audio.")
+    parser.add_argument("--pipelines", nargs="+", choices=sorted(PIPELINES), default=sorted(PIPELINES))
+    parser.add_argument("--video", default=DEFAULT_VIDEO, help="video file or image folder")
+    parser.add_argument("--audio", default=DEFAULT_AUDIO, help="16-bit PCM WAV file")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="fail if slower than this earlier --json report")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {name: measure(name, args.video, args.audio, args.max_frames) for name in args.pipelines}
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+from startup import LazyResource
+
+# Output order of DeepFace's facial expression model
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+INPUT_SIZE = 48
+EMOTION_DIFFICULTY = {
+    "happy": "Hard", "sad": "Medium", "angry": "Easy", "fear": "Easy",
+    "surprise": "Hard", "neutral": "Medium", "disgust": "Medium"
+}
+
+
+def build_emotion_model():
+    from deepface import DeepFace
+    try:
+        client = DeepFace.build_model(model_name="Emotion", task="facial_attribute")
+    except TypeError:
+        # Older deepface releases only take the model name
+        client = DeepFace.build_model("Emotion")
+    return getattr(client, "model", client)
+
+
+class EmotionEngine:
+    """Runs DeepFace's emotion network on many face crops per forward pass.
+
+    Crops are converted to 48x48 grayscale in one preallocated array and fed
+    to the underlying Keras model in batches of up to batch_size, returning a
+    {emotion: percentage} distribution per crop.
+    """
+
+    def __init__(self, batch_size=64):
+        self.batch_size = batch_size
+        self._model = LazyResource("deepface emotion model", build_emotion_model)
+
+    @property
+    def model(self):
+        return self._model.get()
+
+    def prefetch(self):
+        self._model.prefetch()
+
+    def preprocess(self, crops):
+        batch = np.empty((len(crops), INPUT_SIZE, INPUT_SIZE, 1), dtype=np.float32)
+        for i, crop in enumerate(crops):
+            gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+            batch[i, :, :, 0] = cv2.resize(gray, (INPUT_SIZE, INPUT_SIZE), interpolation=cv2.INTER_AREA)
+        batch *= 1.0 / 255.0
+        return batch
+
+    def predict_proba(self, crops):
+        if len(crops) == 0:
+            return np.empty((0, len(EMOTION_LABELS)), dtype=np.float32)
+        batch = self.preprocess(crops)
+        outputs = []
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            outputs.append(np.asarray(self.model(chunk, training=False)))
+        probs = np.concatenate(outputs)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def analyze(self, crops):
+        probs = self.predict_proba(crops)
+        return [
+            {
+                "emotion": dict(zip(EMOTION_LABELS, (row * 100).tolist())),
+                "dominant_emotion": EMOTION_LABELS[int(row.argmax())],
+            }
+            for row in probs
+        ]
+
+
+def dominant_emotion(probs, default="neutral"):
+    # Average the per-crop distributions and pick the strongest class
+    if len(probs) == 0:
+        return default
+    return EMOTION_LABELS[int(np.asarray(probs).mean(axis=0).argmax())]
@@ -1,52 +1,53 @@
 
 import sys
-import cv2
-import dlib
+import startup
 import time
 import numpy as np
-import pandas as pd
-from collections import Counter
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QLineEdit, QTextEdit)
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt
-
-# Load face detector and landmark predictor
-detector = dlib.get_frontal_face_detector()
-predictor = dlib.shape_predictor("./shape_predictor_68_face_landmarks.dat")
-
-LEFT_EYE_INDICES = list(range(42, 48))
-RIGHT_EYE_INDICES = list(range(36, 42))
-
-def get_eye_aspect_ratio(eye_points):
-    A = np.linalg.norm(eye_points[1] - eye_points[5])
-    B = np.linalg.norm(eye_points[2] - eye_points[4])
-    C = np.linalg.norm(eye_points[0] - eye_points[3])
-    return (A + B) / (2.0 * C)
-
-def analyze_eye_tracking(frame, landmarks):
-    left_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in LEFT_EYE_INDICES])
-    right_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in RIGHT_EYE_INDICES])
-    left_ear = get_eye_aspect_ratio(left_eye)
-    right_ear = get_eye_aspect_ratio(right_eye)
-    avg_ear = (left_ear + right_ear) / 2.0
-    if avg_ear < 0.25:
-        return "Drowsy or Low Engagement"
-    elif avg_ear < 0.3:
-        return "Neutral"
-    else:
-        return "Highly Engaged"
+from PyQt6.QtCore import Qt, QTimer
+from workers import make_capture_worker
+from replay import camera_source
+from question_bank import question_bank
+from adaptive_difficulty import AdaptiveDifficulty, QuestionPool
+from results_store import results_store
+import metrics
+from stats_overlay import attach_overlay
+from landmarks import ENGAGEMENT_DIFFICULTY, engagement_levels
+from face_models import detect_faces_hog, get_face_landmarks, landmark_models, remote_models
+from signal_stream import SignalAggregator
+from preprocessing import HOG_DETECT_WIDTH
+from perception import PerceptionPipeline
+
+CALIBRATION_SECONDS = 15
+DIFFICULTY_MAP = ENGAGEMENT_DIFFICULTY
+
+def make_engagement_analyzer(redetect_every=10):
+    # The HOG detector runs every few frames on a downscaled region around the
+    # last faces; in between each face box is carried over from the bounding
+    # box of the previous frame's landmarks
+    pipeline = PerceptionPipeline(
+        detect_faces_hog, landmarks=get_face_landmarks, redetect_every=redetect_every, detect_width=HOG_DETECT_WIDTH
+    )
+
+    def analyze_frame_engagement(frame):
+        # Mean EAR over every face in the frame, or None when nobody is visible
+        ears = [observation.ear for observation in pipeline(frame) if observation.ear is not None]
+        if not ears:
+            return None
+        return float(np.mean(ears))
+
+    return analyze_frame_engagement
 
-def get_most_frequent_engagement(engagement_list):
-    if not engagement_list:
+def current_engagement(ear_stream):
+    estimate = ear_stream.estimate()
+    if estimate is None:
         return "Neutral"
-    return Counter(engagement_list).most_common(1)[0][0]
+    return str(engagement_levels(estimate[0]))
 
 def get_quiz(engagement, num_questions=10):
-    df = pd.read_csv("./math_questions.csv")
-    mapping = {"Drowsy or Low Engagement": "Easy", "Neutral": "Medium", "Highly Engaged": "Hard"}
-    difficulty = mapping.get(engagement, "Medium")
-    filt_df = df[df["Difficulty"] == difficulty]
-    selected_questions = filt_df.sample(n=min(num_questions, len(filt_df)), random_state=None).reset_index(drop=True)
+    difficulty = DIFFICULTY_MAP.get(engagement, "Medium")
+    selected_questions = question_bank.get().sample(difficulty, num_questions)
     return selected_questions, difficulty
 
 class QuizApp(QWidget):
@@ -54,6 +55,16 @@ class QuizApp(QWidget):
         super().__init__()
         self.setGeometry(100, 100, 600, 400)
         self.setWindowTitle("AI Adaptive Quiz")
+        self.capture_worker = None
+        # EAR keeps being tracked during the quiz so difficulty can follow it
+        self.ear_stream = SignalAggregator(["ear"])
+        self.tracking_started = 0.0
+        self.quiz_started = False
+        self.difficulty = "Medium"
+        self.adaptive = AdaptiveDifficulty()
+        self.question_pool = None
+        self.session = None
+        self.question_shown_at = None
         self.initUI()
     
     def initUI(self):
@@ -75,7 +86,7 @@ class QuizApp(QWidget):
         self.start_btn = QPushButton("Start Quiz")
         self.start_btn.setFont(font)
         self.start_btn.setStyleSheet("background-color: #1E88E5; color: white; padding: 10px; border-radius: 5px;")
-        self.start_btn.clicked.connect(self.start_eye_tracking)
+        self.start_btn.clicked.connect(self.toggle_eye_tracking)
         layout.addWidget(self.start_btn, alignment=Qt.AlignmentFlag.AlignCenter)
         
         self.engagement_label = QLabel("Detecting engagement level...")
@@ -107,56 +118,124 @@ class QuizApp(QWidget):
         layout.addWidget(self.score_label, alignment=Qt.AlignmentFlag.AlignCenter)
         
         self.setLayout(layout)
+        self.stats_overlay = attach_overlay(self)
     
+    def toggle_eye_tracking(self):
+        if self.capture_worker is not None and self.capture_worker.isRunning():
+            self.capture_worker.cancel()
+            self.engagement_label.setText("Cancelling engagement detection...")
+            self.start_btn.setEnabled(False)
+        else:
+            self.start_eye_tracking()
+
     def start_eye_tracking(self):
-        cap = cv2.VideoCapture(0)
-        engagement_records = []
-        start_time = time.time()
-        duration = 15
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = detector(gray)
-            for face in faces:
-                landmarks = predictor(gray, face)
-                engagement = analyze_eye_tracking(frame, landmarks)
-                engagement_records.append(engagement)
-            time.sleep(2)
-            if time.time() - start_time >= duration:
-                break
-        cap.release()
-        cv2.destroyAllWindows()
-        self.engagement_level = get_most_frequent_engagement(engagement_records)
+        self.engagement_label.setText("Detecting engagement level...")
+        self.start_btn.setText("Cancel")
+        self.ear_stream.reset()
+        self.quiz_started = False
+        self.tracking_started = time.monotonic()
+        self.capture_worker = make_capture_worker(make_engagement_analyzer, source=camera_source())
+        self.capture_worker.frame_result.connect(self.on_frame_analyzed)
+        self.capture_worker.cancelled.connect(self.on_tracking_cancelled)
+        self.capture_worker.failed.connect(self.on_tracking_failed)
+        self.capture_worker.finished.connect(self.reset_start_button)
+        self.capture_worker.start()
+
+    def on_frame_analyzed(self, ear):
+        if ear is not None:
+            self.ear_stream.update([ear])
+        engagement = current_engagement(self.ear_stream)
+        if self.quiz_started:
+            self.engagement_label.setText(f"Your engagement level: {engagement}")
+        elif time.monotonic() - self.tracking_started >= CALIBRATION_SECONDS:
+            self.start_btn.setText("Stop Eye Tracking")
+            self.on_engagement_detected(engagement)
+        else:
+            seen = engagement if ear is not None else "no face"
+            self.engagement_label.setText(f"Detecting engagement level... ({seen})")
+
+    def on_engagement_detected(self, engagement_level):
+        self.engagement_level = engagement_level
         self.engagement_label.setText(f"Your engagement level: {self.engagement_level}")
         
-        self.quiz_ques, difficulty = get_quiz(self.engagement_level)
-        self.difficulty_label.setText(f"Difficulty Level: {difficulty}")
+        self.quiz_ques, self.difficulty = get_quiz(self.engagement_level)
+        self.question_pool = QuestionPool(question_bank.get())
+        self.question_pool.asked.update(q["Question"] for q in self.quiz_ques)
+        self.difficulty_label.setText(f"Difficulty Level: {self.difficulty}")
+        self.quiz_started = True
         self.current_question_index = 0
         self.correct_answers = 0
+        self.session = results_store.start_session("eye")
         self.show_question()
+
+    def adapt_difficulty(self, correct):
+        # Rate the answer, then pick the next question for the new ability and live engagement
+        answered = self.quiz_ques[self.current_question_index - 1]
+        self.adaptive.record_answer(None, answered["Difficulty"], correct)
+        if self.current_question_index >= len(self.quiz_ques):
+            return
+        signal = DIFFICULTY_MAP.get(current_engagement(self.ear_stream), "Medium")
+        self.difficulty = self.adaptive.next_difficulty(None, signal)
+        question = self.question_pool.draw(self.difficulty)
+        if question is not None:
+            self.quiz_ques[self.current_question_index] = question
+        self.difficulty_label.setText(f"Difficulty Level: {self.difficulty}")
+
+    def on_tracking_cancelled(self):
+        if self.quiz_started:
+            self.engagement_label.setText("Eye tracking stopped.")
+        else:
+            self.engagement_label.setText("Engagement detection cancelled.")
+
+    def on_tracking_failed(self, message):
+        self.engagement_label.setText(f"Engagement detection failed: {message}")
+        if not self.quiz_started:
+            self.on_engagement_detected("Neutral")
+
+    def reset_start_button(self):
+        self.start_btn.setText("Start Quiz")
+        self.start_btn.setEnabled(True)
+
+    def stop_tracking(self):
+        if self.capture_worker is not None and self.capture_worker.isRunning():
+            self.capture_worker.cancel()
+
+    def closeEvent(self, event):
+        if self.capture_worker is not None and self.capture_worker.isRunning():
+            self.capture_worker.cancel()
+            self.capture_worker.wait()
+        super().closeEvent(event)
     
     def show_question(self):
         if self.current_question_index < len(self.quiz_ques):
-            question_text = self.quiz_ques.iloc[self.current_question_index]['Question']
+            question_text = self.quiz_ques[self.current_question_index]['Question']
             self.question_label.setText(f"Q{self.current_question_index + 1}: {question_text}")
             self.answer_input.show()
             self.answer_input.clear()
             self.next_btn.show()
+            self.question_shown_at = time.monotonic()
         else:
             self.answer_input.hide()
             self.show_score()
     
     def next_question(self):
-        correct_answer = str(self.quiz_ques.iloc[self.current_question_index]['Answers']).strip()
+        question = self.quiz_ques[self.current_question_index]
+        correct_answer = str(question['Answers']).strip()
         user_answer = self.answer_input.text().strip()
-        if user_answer == correct_answer:
+        correct = user_answer == correct_answer
+        if correct:
             self.correct_answers += 1
+        results_store.record_answer(
+            self.session, "eye", question["Question"], question["Difficulty"], correct,
+            latency=time.monotonic() - self.question_shown_at, signal=current_engagement(self.ear_stream),
+        )
         self.current_question_index += 1
+        self.adapt_difficulty(correct)
         self.show_question()
     
     def show_score(self):
+        self.stop_tracking()
+        results_store.finish_session(self.session, self.correct_answers, len(self.quiz_ques))
         self.question_label.setText("Quiz Completed!")
         self.score_label.setText(f"Your Score: {self.correct_answers} / {len(self.quiz_ques)}")
         self.next_btn.hide()
@@ -165,6 +244,11 @@ def main():
     app = QApplication(sys.argv)
     ex = QuizApp()
     ex.show()
+    QTimer.singleShot(0, startup.window_shown)
+    metrics.start_exporters()
+    QTimer.singleShot(0, question_bank.prefetch)
+    if not remote_models.available:
+        QTimer.singleShot(0, landmark_models.prefetch)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import cv2
+import numpy as np
+from face_training import DATASET_PATH, IMAGE_EXTENSIONS, load_images, scan_dataset, write_atomic
+
+PACK_PATH = "dataset.pack"
+CROP_SIZE = 100
+
+
+def normalize_crop(img, size=CROP_SIZE):
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+
+
+def pack_folder(dataset_path=DATASET_PATH, pack_path=PACK_PATH, size=CROP_SIZE, loose_label=None, workers=None):
+    """Pack dataset/<person>/*.jpg into faces.npy, labels.npy and index.json.
+
+    Crops are resized to size x size and rows are grouped by label, so every
+    person is one contiguous slice of the memory-mapped array. Images saved
+    loose at the top of the dataset are packed under loose_label, or skipped.
+    """
+    people = scan_dataset(dataset_path)
+    rows = [(person, os.path.join(person, f)) for person, files in people.items() for f in files]
+    if loose_label is not None:
+        loose = sorted(
+            f for f in os.listdir(dataset_path)
+            if f.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(dataset_path, f))
+        )
+        rows += [(loose_label, f) for f in loose]
+    images = load_images([os.path.join(dataset_path, path) for _, path in rows], workers)
+    kept = [(person, path, img) for (person, path), img in zip(rows, images) if img is not None]
+    for (person, path), img in zip(rows, images):
+        if img is None:
+            print(f"Skipping invalid image: {os.path.join(dataset_path, path)}")
+
+    names = sorted({person for person, _, _ in kept})
+    kept.sort(key=lambda row: names.index(row[0]))
+    faces = np.empty((len(kept), size, size), dtype=np.uint8)
+    for i, (_, _, img) in enumerate(kept):
+        faces[i] = normalize_crop(img, size)
+    labels = np.array([names.index(person) for person, _, _ in kept], dtype=np.int32)
+    index = {"names": names, "files": [path for _, path, _ in kept], "size": size}
+
+    os.makedirs(pack_path, exist_ok=True)
+    write_atomic(os.path.join(pack_path, "faces.npy"), lambda f: np.save(f, faces))
+    write_atomic(os.path.join(pack_path, "labels.npy"), lambda f: np.save(f, labels))
+    # index.json goes last: a pack is complete once its index names every row
+    write_atomic(os.path.join(pack_path, "index.json"), lambda f: f.write(json.dumps(index).encode()))
+    return len(kept)
+
+
+class PackedFaceDataset:
+    """Memory-mapped face crops written by pack_folder().
+
+    images is an (N, size, size) uint8 array and labels the matching person
+    ids into names; person(name) returns that person's crops as a view.
+    """
+
+    def __init__(self, images, labels, names, files):
+        if len(images) != len(labels) or len(labels) != len(files):
+            raise ValueError("Packed dataset files disagree; re-run the pack step")
+        self.images = images
+        self.labels = labels
+        self.names = names
+        self.files = files
+        bounds = np.searchsorted(labels, np.arange(len(names) + 1))
+        self.ranges = {name: (int(bounds[i]), int(bounds[i + 1])) for i, name in enumerate(names)}
+
+    @classmethod
+    def open(cls, pack_path=PACK_PATH):
+        with open(os.path.join(pack_path, "index.json")) as f:
+            index = json.load(f)
+        images = np.load(os.path.join(pack_path, "faces.npy"), mmap_mode="r")
+        labels = np.load(os.path.join(pack_path, "labels.npy"), mmap_mode="r")
+        return cls(images, labels, index["names"], index["files"])
+
+    def __len__(self):
+        return len(self.images)
+
+    def person(self, name):
+        start, stop = self.ranges[name]
+        return self.images[start:stop]
+
+    def person_files(self, name):
+        start, stop = self.ranges[name]
+        return self.files[start:stop]
+
+
+def export_folder(pack_path=PACK_PATH, dataset_path=DATASET_PATH):
+    # Inverse of pack_folder: one PNG per row under its original relative path
+    dataset = PackedFaceDataset.open(pack_path)
+    for img, path in zip(dataset.images, dataset.files):
+        out_path = os.path.join(dataset_path, os.path.splitext(path)[0] + ".png")
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        cv2.imwrite(out_path, np.asarray(img))
+    return len(dataset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between the dataset folder and a packed face dataset.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack_parser = commands.add_parser("pack", help="pack dataset/<person>/ folders")
+    pack_parser.add_argument("--dataset", default=DATASET_PATH)
+    pack_parser.add_argument("--out", default=PACK_PATH)
+    pack_parser.add_argument("--size", type=int, default=CROP_SIZE)
+    pack_parser.add_argument("--loose-label", help="person name for images at the top of the dataset")
+    pack_parser.add_argument("--workers", type=int)
+    export_parser = commands.add_parser("export", help="write a pack back out as image folders")
+    export_parser.add_argument("--pack", default=PACK_PATH)
+    export_parser.add_argument("--out", default=DATASET_PATH)
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        count = pack_folder(args.dataset, args.out, args.size, args.loose_label, args.workers)
+        print(f"Packed {count} crops into {args.out}")
+    else:
+        print(f"Exported {export_folder(args.pack, args.out)} crops to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import time
+import numpy as np
+from face_dataset import CROP_SIZE, PACK_PATH, PackedFaceDataset, normalize_crop
+
+FACE_INDEX_PATH = "face_index.npz"
+EMBEDDING_SIZE = 128
+GRID = 7
+MATCH_THRESHOLD = 0.5
+# People held out at a time when calibrating against faces the index has never seen
+CALIBRATION_FOLDS = 10
+# (dy, dx) of the 8 neighbours, clockwise from the top-left
+_NEIGHBOURS = [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0)]
+
+
+def _uniform_table():
+    # 58 uniform patterns (at most two 0/1 transitions) get their own bin, the rest share bin 58
+    table = np.full(256, 58, dtype=np.int64)
+    uniform = [c for c in range(256) if bin(c ^ ((c >> 1) | ((c & 1) << 7))).count("1") <= 2]
+    table[uniform] = np.arange(len(uniform))
+    return table
+
+
+UNIFORM_BINS = 59
+_UNIFORM_TABLE = _uniform_table()
+
+
+def lbp_histograms(crops, size=CROP_SIZE, grid=GRID):
+    """Uniform LBP histograms on a grid x grid layout for a batch of face crops.
+
+    Every crop is normalized to size x size first; the codes and histograms
+    of the whole batch are computed in a handful of array operations.
+    """
+    images = np.stack([normalize_crop(np.asarray(crop), size) for crop in crops]).astype(np.int16)
+    n, h, w = images.shape
+    center = images[:, 1:-1, 1:-1]
+    codes = np.zeros(center.shape, dtype=np.uint8)
+    for bit, (dy, dx) in enumerate(_NEIGHBOURS):
+        codes |= (images[:, dy:dy + h - 2, dx:dx + w - 2] >= center).astype(np.uint8) << bit
+    cell_h, cell_w = (h - 2) // grid, (w - 2) // grid
+    codes = codes[:, :cell_h * grid, :cell_w * grid]
+    rows = np.arange(cell_h * grid) // cell_h
+    cols = np.arange(cell_w * grid) // cell_w
+    cell = rows[:, None] * grid + cols[None, :]
+    flat = (np.arange(n)[:, None, None] * grid * grid + cell) * UNIFORM_BINS + _UNIFORM_TABLE[codes]
+    hist = np.bincount(flat.ravel(), minlength=n * grid * grid * UNIFORM_BINS)
+    return hist.reshape(n, -1).astype(np.float32)
+
+
+def l2_normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def fit_calibration(genuine, impostor, iterations=50):
+    # Platt scaling: P(match | similarity) = sigmoid(a * similarity + b)
+    if len(genuine) == 0 or len(impostor) == 0:
+        return 10.0, -5.0
+    x = np.concatenate([genuine, impostor]).astype(np.float64)
+    y = np.concatenate([np.ones(len(genuine)), np.zeros(len(impostor))])
+    params = np.array([10.0, -5.0])
+    design = np.stack([x, np.ones_like(x)], axis=1)
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-design @ params))
+        gradient = design.T @ (p - y)
+        hessian = design.T @ (design * (p * (1 - p))[:, None]) + 1e-6 * np.eye(2)
+        params -= np.linalg.solve(hessian, gradient)
+    return float(params[0]), float(params[1])
+
+
+def pca_projection(features, embedding_size):
+    # Mean and principal axes of the features via SVD of the centered matrix
+    mean = features.mean(axis=0)
+    _, _, vt = np.linalg.svd(features - mean, full_matrices=False)
+    return mean, vt[:embedding_size].astype(np.float32)
+
+
+def person_centroids(embeddings, labels, people):
+    return l2_normalize(np.stack([embeddings[labels == person].mean(axis=0) for person in people]))
+
+
+def open_set_scores(features, labels, embedding_size, folds=CALIBRATION_FOLDS, seed=0):
+    """Genuine and stranger similarities for calibrating an open-set index.
+
+    People are split into folds; each fold is left out of a sub-index built
+    on half of everyone else's crops. Genuine scores are the other half
+    against their own centroid, stranger scores the left-out people against
+    their best enrolled centroid, so the calibration sees faces that were
+    never enrolled rather than only the other enrolled people.
+    """
+    rng = np.random.default_rng(seed)
+    people, first = np.unique(labels, return_index=True)
+    heldout = rng.random(len(labels)) < 0.5
+    # Everyone keeps at least one enrolled crop
+    heldout[first] = False
+    genuine, stranger = [], []
+    for group in np.array_split(rng.permutation(people), min(folds, len(people))):
+        left_out = np.isin(labels, group)
+        enrolled = np.setdiff1d(people, group)
+        if not len(enrolled):
+            continue
+        fit = ~left_out & ~heldout
+        mean, components = pca_projection(features[fit], embedding_size)
+        embeddings = l2_normalize((features - mean) @ components.T)
+        similarities = embeddings @ person_centroids(embeddings[fit], labels[fit], enrolled).T
+        test = ~left_out & heldout
+        own = np.searchsorted(enrolled, labels[test])
+        genuine.append(similarities[test][np.arange(len(own)), own])
+        stranger.append(similarities[left_out].max(axis=1))
+    if not genuine:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(genuine), np.concatenate(stranger)
+
+
+def kmeans(vectors, k, iterations=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = vectors[rng.choice(len(vectors), k, replace=False)]
+    for _ in range(iterations):
+        assignment = (vectors @ centers.T).argmax(axis=1)
+        for i in range(k):
+            members = vectors[assignment == i]
+            if len(members):
+                centers[i] = members.mean(axis=0)
+        centers = l2_normalize(centers)
+    return centers, (vectors @ centers.T).argmax(axis=1)
+
+
+class FaceIndex:
+    """Nearest-centroid face identification over compact LBP embeddings.
+
+    Crops are embedded as square-rooted LBP histograms projected with PCA
+    to embedding_size dimensions; every enrolled person is one unit-length
+    centroid. Match probabilities are calibrated against people left out of
+    the index (open_set_scores), so strangers come back "Unknown". With
+    partitions, centroids are split into IVF lists and only the nprobe
+    closest lists are scanned.
+    """
+
+    def __init__(self, names, centroids, mean, components, calibration, partition_centers=None, lists=None, nprobe=4):
+        self.names = list(names)
+        self.centroids = centroids
+        self.mean = mean
+        self.components = components
+        self.calibration = calibration
+        self.partition_centers = partition_centers
+        self.lists = lists
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, images, labels, names, embedding_size=EMBEDDING_SIZE, partitions=0):
+        features = np.sqrt(lbp_histograms(images))
+        labels = np.asarray(labels)
+        mean, components = pca_projection(features, embedding_size)
+        embeddings = l2_normalize((features - mean) @ components.T)
+        centroids = person_centroids(embeddings, labels, range(len(names)))
+        genuine, stranger = open_set_scores(features, labels, embedding_size)
+        index = cls(names, centroids, mean, components, fit_calibration(genuine, stranger))
+        if partitions:
+            index.partition(partitions)
+        return index
+
+    @classmethod
+    def from_pack(cls, pack_path=PACK_PATH, **kwargs):
+        dataset = PackedFaceDataset.open(pack_path)
+        return cls.build(np.asarray(dataset.images), np.asarray(dataset.labels), dataset.names, **kwargs)
+
+    def partition(self, partitions):
+        self.partition_centers, assignment = kmeans(self.centroids, min(partitions, len(self.centroids)))
+        self.lists = [np.flatnonzero(assignment == i) for i in range(len(self.partition_centers))]
+
+    def embed(self, crops):
+        return l2_normalize((np.sqrt(lbp_histograms(crops)) - self.mean) @ self.components.T)
+
+    def search(self, embeddings):
+        # Best centroid and its cosine similarity for every embedding
+        if self.partition_centers is None:
+            similarities = embeddings @ self.centroids.T
+            best = similarities.argmax(axis=1)
+            return best, similarities[np.arange(len(best)), best]
+        best, scores = [], []
+        probes = np.argsort(-(embeddings @ self.partition_centers.T), axis=1)[:, :self.nprobe]
+        for embedding, probe in zip(embeddings, probes):
+            candidates = np.concatenate([self.lists[i] for i in probe])
+            similarities = self.centroids[candidates] @ embedding
+            best.append(candidates[similarities.argmax()])
+            scores.append(similarities.max())
+        return np.array(best), np.array(scores)
+
+    def match_probability(self, similarities):
+        a, b = self.calibration
+        return 1.0 / (1.0 + np.exp(-(a * np.asarray(similarities) + b)))
+
+    def identify(self, crops, threshold=MATCH_THRESHOLD):
+        # [(name or "Unknown", match probability)] for each crop
+        if len(crops) == 0:
+            return []
+        best, similarities = self.search(self.embed(crops))
+        probabilities = self.match_probability(similarities)
+        return [
+            (self.names[i] if p >= threshold else "Unknown", float(p))
+            for i, p in zip(best, probabilities)
+        ]
+
+    def save(self, path=FACE_INDEX_PATH):
+        arrays = dict(
+            names=np.array(self.names), centroids=self.centroids, mean=self.mean,
+            components=self.components, calibration=np.array(self.calibration),
+        )
+        if self.partition_centers is not None:
+            arrays["partition_centers"] = self.partition_centers
+            assignment = np.empty(len(self.centroids), dtype=np.int64)
+            for i, ids in enumerate(self.lists):
+                assignment[ids] = i
+            arrays["list_assignment"] = assignment
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path=FACE_INDEX_PATH):
+        with np.load(path) as data:
+            index = cls(
+                data["names"].tolist(), data["centroids"], data["mean"], data["components"],
+                tuple(data["calibration"].tolist()),
+            )
+            if "partition_centers" in data:
+                index.partition_centers = data["partition_centers"]
+                assignment = data["list_assignment"]
+                index.lists = [np.flatnonzero(assignment == i) for i in range(len(index.partition_centers))]
+        return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the face identification index from a packed dataset.")
+    parser.add_argument("--pack", default=PACK_PATH)
+    parser.add_argument("--out", default=FACE_INDEX_PATH)
+    parser.add_argument("--size", type=int, default=EMBEDDING_SIZE, help="embedding dimensions")
+    parser.add_argument("--partitions", type=int, default=0, help="IVF lists, 0 for brute force")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    index = FaceIndex.from_pack(args.pack, embedding_size=args.size, partitions=args.partitions)
+    index.save(args.out)
+    print(f"Indexed {len(index.names)} people into {args.out} ({time.perf_counter() - start_time:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import cv2
+import numpy as np
+from startup import LazyResource
+from emotion_engine import EmotionEngine
+from face_identity import FACE_INDEX_PATH, FaceIndex
+from landmarks import boxes_to_rects, rects_to_boxes, shapes_to_array
+import model_server
+import metrics
+
+# The face, emotion, identity and landmark models shared by the quiz apps, the
+# session engine and the benchmark; nothing here needs a GUI
+
+# Use the launcher's warm model server when it is running, otherwise load locally
+remote_models = model_server.RemoteModels()
+emotion_engine = EmotionEngine()
+face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+
+def load_face_index():
+    # Identification is optional: without an index (see face_identity.py) students stay anonymous
+    if not os.path.exists(FACE_INDEX_PATH):
+        return None
+    return FaceIndex.load(FACE_INDEX_PATH)
+
+
+face_index = LazyResource("face index", load_face_index)
+
+
+def load_landmark_models():
+    import dlib
+
+    if not os.path.exists(model_server.LANDMARK_MODEL):
+        raise FileNotFoundError(f"landmark model {model_server.LANDMARK_MODEL} not found")
+    # Load face detector and landmark predictor
+    detector = dlib.get_frontal_face_detector()
+    predictor = dlib.shape_predictor(model_server.LANDMARK_MODEL)
+    return detector, predictor
+
+
+landmark_models = LazyResource("dlib landmark models", load_landmark_models)
+
+
+@metrics.instrument("emotion_inference")
+def predict_emotion_proba(crops):
+    return remote_models.call("emotion_proba", crops, fallback=emotion_engine.predict_proba)
+
+
+@metrics.instrument("face_detection")
+def detect_faces(gray):
+    # Haar cascade, used for emotion and identity
+    return face_cascade.detectMultiScale(gray, 1.3, 5)
+
+
+def get_local_faces(gray):
+    detector, _ = landmark_models.get()
+    # dlib needs contiguous rows; region views of the downscaled frame are not
+    return rects_to_boxes(detector(np.ascontiguousarray(gray)))
+
+
+def get_local_landmarks(gray, boxes):
+    _, predictor = landmark_models.get()
+    return shapes_to_array([predictor(gray, rect) for rect in boxes_to_rects(boxes)])
+
+
+@metrics.instrument("face_detection")
+def detect_faces_hog(gray):
+    # dlib's HOG detector, whose boxes the landmark predictor expects
+    return remote_models.call("detect_faces", gray, fallback=get_local_faces)
+
+
+@metrics.instrument("landmarks")
+def get_face_landmarks(gray, boxes):
+    if not boxes:
+        return shapes_to_array([])
+    return remote_models.call("landmarks_in_boxes", gray, boxes, fallback=get_local_landmarks)
+
+
+def identify_faces(crops):
+    # [(name, p)] per crop, or None without a face index
+    index = face_index.get()
+    return None if index is None else index.identify(crops)
+
+
+@metrics.instrument("face_identification")
+def identify_student(crops):
+    # Name behind the most confident crop, "Unknown", or None without an index
+    if len(crops) == 0:
+        return None
+    try:
+        matches = identify_faces(crops)
+        if matches is None:
+            return None
+        return max(matches, key=lambda match: match[1])[0]
+    except Exception as e:
+        print("Face Identification Error:", str(e))
+        return None
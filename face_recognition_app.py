@@ -1,21 +1,91 @@
 
 import sys
-import cv2
-import pandas as pd
+import time
+import startup
 import numpy as np
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QLineEdit, QMessageBox, QFrame
 )
 from PyQt6.QtGui import QFont, QPixmap, QImage
-from PyQt6.QtCore import Qt
-from deepface import DeepFace
-from collections import Counter
+from PyQt6.QtCore import Qt, QTimer
+from workers import make_capture_worker
+from replay import camera_source
+from question_bank import question_bank
+from adaptive_difficulty import AdaptiveDifficulty, QuestionPool
+from results_store import results_store
+from emotion_engine import EMOTION_DIFFICULTY, EMOTION_LABELS
+from signal_stream import SignalAggregator
+from face_models import (
+    detect_faces, emotion_engine, face_index, identify_student, predict_emotion_proba, remote_models
+)
+from perception import PerceptionPipeline
+import metrics
+from stats_overlay import attach_overlay
+
+DIFFICULTY_MAP = EMOTION_DIFFICULTY
+CALIBRATION_FRAMES = 10
+QUIZ_LENGTH = 10
+
+def make_crop_extractor(redetect_every=5):
+    # Run the Haar cascade every few frames on a downscaled region around the
+    # last faces, and track the faces in between; the models are batched over
+    # several frames by the caller, so the pipeline only hands back the crops
+    pipeline = PerceptionPipeline(detect_faces, keep_crops=True, redetect_every=redetect_every)
+
+    def extract_face_crops(frame):
+        return [observation.crop for observation in pipeline(frame)]
+
+    return extract_face_crops
+
+def estimate_emotion(crops):
+    # One batched forward pass; None when no face was seen or the model failed
+    if len(crops) == 0:
+        return None
+    try:
+        probs = predict_emotion_proba(crops)
+    except Exception as e:
+        # Like the per-crop DeepFace calls before, never block the quiz on the model
+        print("Emotion Detection Error:", str(e))
+        return None
+    return np.asarray(probs).mean(axis=0)
+
+def make_emotion_analyzer(batch_frames=5):
+    # Crops from batch_frames consecutive frames share one model call; the
+    # analyzer returns that window's (mean distribution, student), with
+    # (None, None) while the window is filling
+    extract_face_crops = make_crop_extractor()
+    pending = []
+    frames = 0
+
+    def analyze_frame(frame):
+        nonlocal frames
+        pending.extend(extract_face_crops(frame))
+        frames += 1
+        if frames < batch_frames:
+            return None, None
+        crops = pending[:]
+        pending.clear()
+        frames = 0
+        return estimate_emotion(crops), identify_student(crops)
+
+    return analyze_frame
 
 class QuizApp(QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
         self.detected_emotion = "neutral"
+        self.capture_worker = None
+        self.frames_analyzed = 0
+        # Emotion keeps being sensed during the quiz so difficulty can follow it
+        self.emotion_stream = SignalAggregator(EMOTION_LABELS)
+        self.quiz_started = False
+        self.difficulty = "Medium"
+        self.student = None
+        self.adaptive = AdaptiveDifficulty()
+        self.question_pool = None
+        self.session = None
+        self.question_shown_at = None
         self.quiz_questions = []
         self.current_question_index = 0
         self.score = 0
@@ -45,7 +115,7 @@ class QuizApp(QWidget):
         self.start_button = QPushButton("Start Quiz")
         self.start_button.setFont(QFont("Arial", 14, QFont.Weight.Bold))
         self.start_button.setStyleSheet(self.get_button_styles())
-        self.start_button.clicked.connect(self.detect_emotion)
+        self.start_button.clicked.connect(self.toggle_detection)
         self.layout.addWidget(self.start_button)
 
         # Horizontal Line
@@ -77,62 +147,115 @@ class QuizApp(QWidget):
         self.submit_button.setEnabled(False)
 
         self.setLayout(self.layout)
+        self.stats_overlay = attach_overlay(self)
+
+    def toggle_detection(self):
+        if self.capture_worker is not None and self.capture_worker.isRunning():
+            self.capture_worker.cancel()
+            self.label.setText("Cancelling detection...")
+            self.start_button.setEnabled(False)
+        else:
+            self.detect_emotion()
 
     def detect_emotion(self):
         self.label.setText("Detecting face and emotion... Please wait.")
-        cap = cv2.VideoCapture(0)
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-        emotion_records = []
-
-        for _ in range(10):  # Capture frames for emotion detection
-            ret, frame = cap.read()
-            if not ret:
-                continue
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-
-            for (x, y, w, h) in faces:
-                try:
-                    emotion_analysis = DeepFace.analyze(frame[y:y+h, x:x+w], actions=['emotion'], enforce_detection=False)
-                    detected_emotion = emotion_analysis[0]['dominant_emotion']
-                    emotion_records.append(detected_emotion)
-                except:
-                    pass
-
-        cap.release()
-
-        if emotion_records:
-            self.detected_emotion = Counter(emotion_records).most_common(1)[0][0]
+        self.start_button.setText("Cancel")
+        self.frames_analyzed = 0
+        self.quiz_started = False
+        self.student = None
+        self.emotion_stream.reset()
+        self.capture_worker = make_capture_worker(make_emotion_analyzer, source=camera_source())
+        self.capture_worker.frame_result.connect(self.on_frame_analyzed)
+        self.capture_worker.cancelled.connect(self.on_detection_cancelled)
+        self.capture_worker.failed.connect(self.on_detection_failed)
+        self.capture_worker.finished.connect(self.reset_start_button)
+        self.capture_worker.start()
+
+    def on_frame_analyzed(self, result):
+        probs, student = result
+        self.frames_analyzed += 1
+        if probs is not None:
+            self.emotion_stream.update(probs)
+        if student not in (None, "Unknown"):
+            self.student = student
+        current = self.emotion_stream.dominant("neutral")
+        if self.quiz_started:
+            self.label.setText(f"{self.student_prefix()}Current Emotion: {current} | Difficulty: {self.difficulty}")
+        elif self.frames_analyzed >= CALIBRATION_FRAMES:
+            self.start_button.setText("Stop Emotion Tracking")
+            self.on_emotion_detected(current)
         else:
-            self.detected_emotion = "neutral"
+            self.label.setText(
+                f"Detecting face and emotion... frame {self.frames_analyzed}/{CALIBRATION_FRAMES} ({current})"
+            )
+
+    def student_prefix(self):
+        return f"Student: {self.student} | " if self.student else ""
 
-        self.label.setText(f"Detected Emotion: {self.detected_emotion}. Loading quiz...")
+    def on_emotion_detected(self, emotion):
+        self.detected_emotion = emotion
+        self.label.setText(f"{self.student_prefix()}Detected Emotion: {self.detected_emotion}. Loading quiz...")
         self.load_quiz()
 
+    def on_detection_cancelled(self):
+        if self.quiz_started:
+            self.label.setText(f"Emotion tracking stopped. Difficulty: {self.difficulty}")
+        else:
+            self.label.setText("Detection cancelled. Press 'Start Quiz' to try again.")
+
+    def on_detection_failed(self, message):
+        self.label.setText(f"Detection failed: {message}")
+        if not self.quiz_started:
+            self.on_emotion_detected("neutral")
+
+    def reset_start_button(self):
+        self.start_button.setText("Start Quiz")
+        self.start_button.setEnabled(True)
+
+    def stop_tracking(self):
+        if self.capture_worker is not None and self.capture_worker.isRunning():
+            self.capture_worker.cancel()
+
+    def closeEvent(self, event):
+        if self.capture_worker is not None and self.capture_worker.isRunning():
+            self.capture_worker.cancel()
+            self.capture_worker.wait()
+        super().closeEvent(event)
+
     def load_quiz(self):
-        df = pd.read_csv("./math_questions.csv")
-        difficulty_map = {
-            "happy": "Hard", "sad": "Medium", "angry": "Easy", "fear": "Easy",
-            "surprise": "Hard", "neutral": "Medium", "disgust": "Medium"
-        }
-        difficulty = difficulty_map.get(self.detected_emotion, "Medium")
-
-        self.quiz_questions = df[df["Difficulty"] == difficulty].sample(
-            n=min(10, len(df[df["Difficulty"] == difficulty])), 
-            random_state=None
-        ).reset_index(drop=True)
+        signal = DIFFICULTY_MAP.get(self.detected_emotion, "Medium")
+        self.difficulty = self.adaptive.next_difficulty(self.student, signal)
+        self.question_pool = QuestionPool(question_bank.get())
+        self.quiz_questions = self.question_pool.draw_many(self.difficulty, QUIZ_LENGTH)
 
+        self.quiz_started = True
         self.current_question_index = 0
         self.score = 0
+        self.session = results_store.start_session("face", self.student)
         self.show_question()
 
+    def adapt_difficulty(self, correct):
+        # Rate the answer, then pick the next question for the new ability and live emotion
+        answered = self.quiz_questions[self.current_question_index - 1]
+        self.adaptive.record_answer(self.student, answered["Difficulty"], correct)
+        if self.current_question_index >= len(self.quiz_questions):
+            return
+        signal = DIFFICULTY_MAP.get(self.emotion_stream.dominant("neutral"), "Medium")
+        self.difficulty = self.adaptive.next_difficulty(self.student, signal)
+        question = self.question_pool.draw(self.difficulty)
+        if question is not None:
+            self.quiz_questions[self.current_question_index] = question
+
     def show_question(self):
         if self.current_question_index < len(self.quiz_questions):
-            question_text = self.quiz_questions.iloc[self.current_question_index]["Question"]
+            question_text = self.quiz_questions[self.current_question_index]["Question"]
             self.question_label.setText(f"Q{self.current_question_index+1}: {question_text}")
             self.answer_input.clear()
             self.submit_button.setEnabled(True)
+            self.question_shown_at = time.monotonic()
         else:
+            self.stop_tracking()
+            results_store.finish_session(self.session, self.score, len(self.quiz_questions), self.student)
             QMessageBox.information(
                 self, 
                 "Quiz Completed", 
@@ -141,13 +264,21 @@ class QuizApp(QWidget):
             self.submit_button.setEnabled(False)
 
     def check_answer(self):
+        question = self.quiz_questions[self.current_question_index]
         user_answer = self.answer_input.text().strip()
-        correct_answer = str(self.quiz_questions.iloc[self.current_question_index]["Answers"]).strip()
+        correct_answer = str(question["Answers"]).strip()
         
-        if user_answer == correct_answer:
+        correct = user_answer == correct_answer
+        if correct:
             self.score += 1
+        results_store.record_answer(
+            self.session, "face", question["Question"], question["Difficulty"], correct,
+            latency=time.monotonic() - self.question_shown_at,
+            signal=self.emotion_stream.dominant(self.detected_emotion), student=self.student,
+        )
 
         self.current_question_index += 1
+        self.adapt_difficulty(correct)
         self.show_question()
 
     def get_button_styles(self):
@@ -183,5 +314,12 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = QuizApp()
     window.show()
+    QTimer.singleShot(0, startup.window_shown)
+    metrics.start_exporters()
+    QTimer.singleShot(0, question_bank.prefetch)
+    QTimer.singleShot(0, face_index.prefetch)
+    if not remote_models.available:
+        # Warm the emotion model while the user reads the start screen
+        QTimer.singleShot(0, emotion_engine.prefetch)
     sys.exit(app.exec())
 
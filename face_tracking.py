@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+
+def create_cv_tracker():
+    # KCF is the cheapest accurate tracker; older or slimmer builds may lack it
+    for factory in (
+        getattr(cv2, "TrackerKCF_create", None),
+        getattr(getattr(cv2, "legacy", None), "TrackerMOSSE_create", None),
+        getattr(cv2, "TrackerMIL_create", None),
+    ):
+        if factory is not None:
+            return factory()
+    raise RuntimeError("No OpenCV tracker available; install opencv-contrib-python")
+
+
+def landmark_boxes(points, margin=0.25):
+    # Face box for the next frame from (N, 68, 2) landmarks, padded on all sides
+    boxes = []
+    for face in np.asarray(points):
+        x0, y0 = face.min(axis=0)
+        x1, y1 = face.max(axis=0)
+        pad_x, pad_y = (x1 - x0) * margin, (y1 - y0) * margin
+        boxes.append((int(x0 - pad_x), int(y0 - pad_y), int(x1 - x0 + 2 * pad_x), int(y1 - y0 + 2 * pad_y)))
+    return boxes
+
+
+def clip_box(box, shape):
+    x, y, w, h = box
+    height, width = shape[:2]
+    x0, y0 = max(0, int(x)), max(0, int(y))
+    x1, y1 = min(width, int(x + w)), min(height, int(y + h))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+class FaceTracker:
+    """Runs the face detector every redetect_every frames and tracks in between.
+
+    detect(image) returns (x, y, w, h) boxes. Between detections each box is
+    followed by a cheap OpenCV tracker from tracker_factory; if any tracker
+    loses its face the detector runs again on that same frame. With
+    tracker_factory=None boxes are held until refine() supplies new ones,
+    e.g. from landmark_boxes() on the previous frame's landmarks.
+    """
+
+    def __init__(self, detect, redetect_every=10, tracker_factory=create_cv_tracker):
+        self.detect = detect
+        self.redetect_every = redetect_every
+        self.tracker_factory = tracker_factory
+        self.detections = 0
+        self.reset()
+
+    def reset(self):
+        self.boxes = []
+        self._trackers = []
+        self._frames_since_detect = 0
+
+    def update(self, frame, detect_image=None):
+        # Nothing to follow yet: keep detecting until a face shows up
+        if not self.boxes or self._frames_since_detect + 1 >= self.redetect_every:
+            return self._redetect(frame, detect_image)
+        self._frames_since_detect += 1
+        if self._trackers:
+            boxes = []
+            for tracker in self._trackers:
+                ok, box = tracker.update(frame)
+                box = clip_box(box, frame.shape) if ok else None
+                if box is None:
+                    return self._redetect(frame, detect_image)
+                boxes.append(box)
+            self.boxes = boxes
+        return self.boxes
+
+    def refine(self, boxes):
+        # Replace tracked boxes with better estimates derived by the caller
+        self.boxes = [b for b in (clip_box(box, (1 << 30, 1 << 30)) for box in boxes) if b is not None]
+
+    def _redetect(self, frame, detect_image):
+        image = frame if detect_image is None else detect_image
+        self.detections += 1
+        self.boxes = [tuple(int(v) for v in box) for box in self.detect(image)]
+        self._frames_since_detect = 0
+        self._trackers = []
+        if self.tracker_factory is not None:
+            for box in self.boxes:
+                tracker = self.tracker_factory()
+                tracker.init(frame, box)
+                self._trackers.append(tracker)
+        return self.boxes
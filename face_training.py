@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+
+DATASET_PATH = "dataset"
+MODEL_PATH = "face_model.yml"
+LABELS_PATH = "labels.pkl"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+# Below this many images a process pool costs more than it saves
+MIN_PARALLEL_IMAGES = 64
+
+
+def manifest_path_for(model_path):
+    return os.path.splitext(model_path)[0] + ".manifest.json"
+
+
+def create_recognizer():
+    if not hasattr(cv2, "face"):
+        raise ImportError("OpenCV face module is missing! Install with: pip install opencv-contrib-python")
+    return cv2.face.LBPHFaceRecognizer_create()
+
+
+def read_gray(path):
+    return cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+
+
+def load_images(paths, workers=None):
+    # JPEG decoding is CPU bound and releases little of the GIL, so use processes
+    if workers == 0 or len(paths) < MIN_PARALLEL_IMAGES:
+        return [read_gray(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read_gray, paths, chunksize=32))
+
+
+def scan_dataset(dataset_path=DATASET_PATH):
+    # {person: [image file names]} for every dataset/<person>/ folder
+    people = {}
+    for person in sorted(os.listdir(dataset_path)):
+        person_path = os.path.join(dataset_path, person)
+        if not os.path.isdir(person_path):
+            continue
+        people[person] = sorted(
+            name for name in os.listdir(person_path) if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    return people
+
+
+def write_atomic(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class FaceTrainer:
+    """LBPH face model that can grow one person or one batch of images at a time.
+
+    labels maps person name -> integer label as in labels.pkl, and trained
+    records which dataset files are already in the model (kept next to the
+    model as a manifest), so train() only decodes and adds the new ones
+    through LBPH's update() instead of retraining from scratch.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, labels_path=LABELS_PATH, workers=None):
+        self.model_path = model_path
+        self.labels_path = labels_path
+        self.workers = workers
+        self.recognizer = None
+        self.labels = {}
+        self.trained = {}
+
+    def load(self):
+        # A model, labels.pkl and manifest that disagree are ignored and rebuilt
+        manifest_path = manifest_path_for(self.model_path)
+        if not all(os.path.exists(p) for p in (self.model_path, self.labels_path, manifest_path)):
+            return False
+        labels = self.read_labels()
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("labels") != labels:
+            print("labels.pkl does not match the face model; a full retrain is needed")
+            return False
+        recognizer = create_recognizer()
+        recognizer.read(self.model_path)
+        self.recognizer = recognizer
+        self.labels = labels
+        # Older manifests may hold packed "person/N.png" keys for the same files
+        self.trained = {name: {os.path.basename(f) for f in files} for name, files in manifest["files"].items()}
+        return True
+
+    def read_labels(self):
+        with open(self.labels_path, "rb") as f:
+            return pickle.load(f)
+
+    def label_for(self, name):
+        if name not in self.labels:
+            self.labels[name] = max(self.labels.values(), default=-1) + 1
+        return self.labels[name]
+
+    def add_images(self, name, images):
+        images = [img for img in images if img is not None]
+        if not images:
+            return 0
+        label = self.label_for(name)
+        if self.recognizer is None:
+            self.recognizer = create_recognizer()
+        # update() appends histograms; on an empty model it behaves like train()
+        self.recognizer.update(images, np.full(len(images), label, dtype=np.int32))
+        return len(images)
+
+    def train(self, dataset_path=DATASET_PATH, full=False):
+        if full:
+            # Keep the ids already in labels.pkl so existing names stay stable
+            self.recognizer = None
+            self.labels = self.read_labels() if os.path.exists(self.labels_path) else {}
+            self.trained = {}
+        new_files = {
+            person: [f for f in files if f not in self.trained.get(person, ())]
+            for person, files in scan_dataset(dataset_path).items()
+        }
+        paths = [
+            os.path.join(dataset_path, person, f) for person, files in new_files.items() for f in files
+        ]
+        images = iter(load_images(paths, self.workers))
+        added = 0
+        for person, files in new_files.items():
+            person_images = [next(images) for _ in files]
+            for path, img in zip(files, person_images):
+                if img is None:
+                    print(f"Skipping invalid image: {os.path.join(dataset_path, person, path)}")
+            added += self.add_images(person, person_images)
+            self.trained.setdefault(person, set()).update(files)
+        return added
+
+    def train_packed(self, dataset, full=False):
+        # Same as train() for a PackedFaceDataset; crops are zero-copy slices.
+        # Packed rows are "person/N.png", recorded by file name as train() does.
+        if full:
+            self.recognizer = None
+            self.labels = self.read_labels() if os.path.exists(self.labels_path) else {}
+            self.trained = {}
+        added = 0
+        for person in dataset.names:
+            done = self.trained.setdefault(person, set())
+            files = [os.path.basename(f) for f in dataset.person_files(person)]
+            new_rows = [i for i, f in enumerate(files) if f not in done]
+            crops = dataset.person(person)
+            added += self.add_images(person, [crops[i] for i in new_rows])
+            done.update(files)
+        return added
+
+    def save(self):
+        if self.recognizer is None:
+            raise ValueError("Error: No valid face images found for training!")
+        manifest = {
+            "labels": self.labels,
+            "files": {name: sorted(files) for name, files in self.trained.items()},
+        }
+        fd, tmp_model = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.model_path)), suffix=".yml"
+        )
+        os.close(fd)
+        try:
+            self.recognizer.write(tmp_model)
+            os.replace(tmp_model, self.model_path)
+        except BaseException:
+            os.remove(tmp_model)
+            raise
+        write_atomic(manifest_path_for(self.model_path), lambda f: f.write(json.dumps(manifest).encode()))
+        write_atomic(self.labels_path, lambda f: pickle.dump(self.labels, f))
+
+
+def enroll(name, dataset_path=DATASET_PATH, count=100, source=0):
+    # Capture count face crops from the webcam into dataset/<name>/
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    user_folder = os.path.join(dataset_path, name)
+    os.makedirs(user_folder, exist_ok=True)
+    start = len(os.listdir(user_folder))
+    cap = cv2.VideoCapture(source)
+    captured = 0
+    try:
+        while captured < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            for (x, y, w, h) in face_cascade.detectMultiScale(gray, 1.3, 5):
+                captured += 1
+                cv2.imwrite(os.path.join(user_folder, f"{start + captured}.jpg"), gray[y:y+h, x:x+w])
+    finally:
+        cap.release()
+    print(f"Captured {captured} images for {name}.")
+    return captured
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enroll faces and train the LBPH face model.")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--labels", default=LABELS_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    enroll_parser = commands.add_parser("enroll", help="capture webcam face crops for one person")
+    enroll_parser.add_argument("name")
+    enroll_parser.add_argument("--count", type=int, default=100)
+    enroll_parser.add_argument("--train", action="store_true", help="add the new images to the model")
+    train_parser = commands.add_parser("train", help="add new dataset images to the model")
+    train_parser.add_argument("--full", action="store_true", help="retrain from scratch")
+    train_parser.add_argument("--workers", type=int, help="decode processes, 0 to decode serially")
+    train_parser.add_argument("--pack", help="train from a packed dataset (see face_dataset.py)")
+    args = parser.parse_args()
+
+    if args.command == "enroll":
+        enroll(args.name, args.dataset, args.count)
+        if not args.train:
+            return
+    trainer = FaceTrainer(args.model, args.labels, getattr(args, "workers", None))
+    full = getattr(args, "full", False) or not trainer.load()
+    start_time = time.perf_counter()
+    if getattr(args, "pack", None):
+        from face_dataset import PackedFaceDataset
+
+        added = trainer.train_packed(PackedFaceDataset.open(args.pack), full=full)
+    else:
+        added = trainer.train(args.dataset, full=full)
+    if added:
+        trainer.save()
+    mode = "Trained" if full else "Added"
+    print(f"{mode} {added} images from {len(trainer.labels)} people ({time.perf_counter() - start_time:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
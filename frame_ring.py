@@ -0,0 +1,253 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+MAGIC = 0x46524E47
+# Header fields, int64 each, followed by one sequence number per slot
+_MAGIC, _SLOTS, _HEIGHT, _WIDTH, _CHANNELS, _HEAD, _CLAIMED, _CLAIMS = range(8)
+_HEADER_FIELDS = 8
+
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block again; pool processes share
+        # the creator's resource tracker, so that registration is the same entry
+        return shared_memory.SharedMemory(name=name)
+
+
+class FrameSlot:
+    # Holds only the newest frame so analysis never works on a stale backlog
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._closed = False
+
+    def put(self, frame):
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get_after(self, seq, timeout=1.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > seq or self._closed, timeout)
+            if self._seq > seq:
+                return self._seq, self._frame
+            return seq, None
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class FrameRing:
+    """Fixed ring of uint8 frame slots in one shared memory block.
+
+    The writer always fills the slot after the newest one, so the oldest
+    frame is overwritten when readers fall behind. Each slot carries the
+    sequence number of the frame in it (-1 while being written); readers
+    get a zero-copy view and call still_valid(seq) afterwards to find out
+    whether the writer lapped them in the meantime.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        if header[_MAGIC] != MAGIC:
+            raise ValueError(f"{shm.name} is not a frame ring")
+        self.slots = int(header[_SLOTS])
+        shape = tuple(int(v) for v in header[_HEIGHT:_CHANNELS + 1] if v)
+        self.header = header
+        self.seqs = np.ndarray((self.slots,), dtype=np.int64, buffer=shm.buf, offset=8 * _HEADER_FIELDS)
+        self.frames = np.ndarray((self.slots,) + shape, dtype=np.uint8, buffer=shm.buf, offset=self._data_offset(self.slots))
+        self.shape = shape
+
+    @staticmethod
+    def _data_offset(slots):
+        # Frames start on a cache line boundary
+        return -(-8 * (_HEADER_FIELDS + slots) // 64) * 64
+
+    @classmethod
+    def create(cls, shape, slots=8):
+        dims = tuple(shape) + (0,) * (3 - len(shape))
+        size = cls._data_offset(slots) + slots * int(np.prod(shape))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_SLOTS] = slots
+        header[_HEIGHT:_CHANNELS + 1] = dims
+        np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=8 * _HEADER_FIELDS)[:] = 0
+        header[_MAGIC] = MAGIC
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_attach_shared_memory(name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def head(self):
+        return int(self.header[_HEAD])
+
+    def put(self, frame):
+        if frame.shape != self.shape:
+            raise ValueError(f"frame shape {frame.shape} does not match ring shape {self.shape}")
+        seq = self.head + 1
+        index = seq % self.slots
+        self.seqs[index] = -1
+        self.frames[index] = frame
+        self.seqs[index] = seq
+        self.header[_HEAD] = seq
+        return seq
+
+    def view(self, seq):
+        return self.frames[seq % self.slots]
+
+    def still_valid(self, seq):
+        return int(self.seqs[seq % self.slots]) == seq
+
+    def latest(self, after=0):
+        # (seq, view) of the newest complete frame newer than after, or (after, None)
+        seq = self.head
+        if seq <= after or not self.still_valid(seq):
+            return after, None
+        return seq, self.view(seq)
+
+    def claim(self):
+        # Newest unclaimed frame for one of several readers; call under a shared lock
+        seq = self.head
+        if seq <= self.header[_CLAIMED] or not self.still_valid(seq):
+            return None
+        self.header[_CLAIMED] = seq
+        self.header[_CLAIMS] += 1
+        return seq
+
+    @property
+    def claims(self):
+        return int(self.header[_CLAIMS])
+
+    @property
+    def claimed(self):
+        return int(self.header[_CLAIMED])
+
+    def close(self):
+        # Views into the block must be released before the mapping can close
+        self.header = self.seqs = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # An analyzer kept a view; the mapping goes away with the process
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+class AnalysisError:
+    # Sent back instead of a result when analysis raised in a worker
+    def __init__(self, message):
+        self.message = message
+
+
+class Overwritten:
+    # Sent back instead of a result computed on a frame the writer replaced mid-analysis
+    pass
+
+
+def _analysis_worker(ring_name, ready, stop, results, analyzer_factory):
+    ring = FrameRing.attach(ring_name)
+    try:
+        try:
+            analyze = analyzer_factory()
+        except Exception as e:
+            results.put((0, AnalysisError(f"{type(e).__name__}: {e}")))
+            return
+        while not stop.is_set():
+            with ready:
+                seq = ring.claim()
+                if seq is None:
+                    ready.wait(0.1)
+                    continue
+            try:
+                result = analyze(ring.view(seq))
+            except Exception as e:
+                results.put((seq, AnalysisError(str(e))))
+                continue
+            # The writer may have lapped the ring while this frame was analyzed
+            results.put((seq, result if ring.still_valid(seq) else Overwritten()))
+    finally:
+        ring.close()
+
+
+class AnalysisPool:
+    """Analysis processes reading frames from a FrameRing without pickling them.
+
+    analyzer_factory must be importable by name (a module-level function);
+    each process calls it once and analyzes the newest unclaimed frame, so
+    slow analysis drops frames instead of building a backlog. Results come
+    back as (seq, result) pairs through get_result().
+    """
+
+    def __init__(self, analyzer_factory, shape, processes=2, slots=8):
+        context = multiprocessing.get_context("spawn")
+        self.ring = FrameRing.create(shape, slots)
+        self._ready = context.Condition()
+        self._stop = context.Event()
+        self._results = context.Queue()
+        self.received = 0
+        self._processes = [
+            context.Process(
+                target=_analysis_worker,
+                args=(self.ring.name, self._ready, self._stop, self._results, analyzer_factory),
+                daemon=True,
+            )
+            for _ in range(processes)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def publish(self, frame):
+        seq = self.ring.put(frame)
+        with self._ready:
+            self._ready.notify()
+        return seq
+
+    def get_result(self, timeout=None):
+        try:
+            item = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self.received += 1
+        return item
+
+    @property
+    def idle(self):
+        # Every published frame was either claimed and answered or skipped
+        with self._ready:
+            return self.ring.claimed == self.ring.head and self.received == self.ring.claims
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        with self._ready:
+            self._ready.notify_all()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        self._results.close()
+        self.ring.close()
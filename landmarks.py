@@ -0,0 +1,59 @@
+from itertools import chain
+import numpy as np
+
+NUM_LANDMARKS = 68
+LEFT_EYE_INDICES = list(range(42, 48))
+RIGHT_EYE_INDICES = list(range(36, 42))
+# (eye, point) index table so both eyes are gathered in one fancy-index
+EYE_INDICES = np.array([LEFT_EYE_INDICES, RIGHT_EYE_INDICES])
+
+LOW_ENGAGEMENT_EAR = 0.25
+NEUTRAL_EAR = 0.3
+ENGAGEMENT_LABELS = np.array(["Drowsy or Low Engagement", "Neutral", "Highly Engaged"])
+ENGAGEMENT_DIFFICULTY = {"Drowsy or Low Engagement": "Easy", "Neutral": "Medium", "Highly Engaged": "Hard"}
+
+
+def shape_to_array(shape):
+    # dlib full_object_detection -> (68, 2) int32 array
+    coords = chain.from_iterable((p.x, p.y) for p in shape.parts())
+    return np.fromiter(coords, dtype=np.int32, count=2 * shape.num_parts).reshape(-1, 2)
+
+
+def shapes_to_array(shapes):
+    # Any number of detections -> (N, 68, 2), (0, 68, 2) when there are none
+    if not shapes:
+        return np.empty((0, NUM_LANDMARKS, 2), dtype=np.int32)
+    return np.stack([shape_to_array(shape) for shape in shapes])
+
+
+def rects_to_boxes(rects):
+    # dlib rectangles -> (x, y, w, h) boxes like OpenCV detectors return
+    return [(r.left(), r.top(), r.width(), r.height()) for r in rects]
+
+
+def boxes_to_rects(boxes):
+    import dlib
+
+    return [dlib.rectangle(int(x), int(y), int(x + w), int(y + h)) for x, y, w, h in boxes]
+
+
+def eye_aspect_ratios(points):
+    """EAR of the left and right eye for landmark arrays of shape (..., 68, 2).
+
+    Leading dimensions (faces, frames, ...) are kept, so a (F, N, 68, 2)
+    stack returns (F, N, 2) in a single vectorized pass.
+    """
+    eyes = np.asarray(points, dtype=np.float32)[..., EYE_INDICES, :]
+    vertical = np.linalg.norm(eyes[..., [1, 2], :] - eyes[..., [5, 4], :], axis=-1).sum(axis=-1)
+    horizontal = np.linalg.norm(eyes[..., 0, :] - eyes[..., 3, :], axis=-1)
+    return vertical / (2.0 * horizontal)
+
+
+def average_ear(points):
+    return eye_aspect_ratios(points).mean(axis=-1)
+
+
+def engagement_levels(ear):
+    # Same thresholds as the original per-face if/elif chain
+    index = np.digitize(ear, [LOW_ENGAGEMENT_EAR, NEUTRAL_EAR])
+    return ENGAGEMENT_LABELS[index]
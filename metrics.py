@@ -0,0 +1,173 @@
+import atexit
+import bisect
+import functools
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Pass --metrics (or set QUIZ_METRICS=1) to time every pipeline stage. Set
+# QUIZ_METRICS_FILE to dump Prometheus text there every few seconds and at
+# exit, and QUIZ_METRICS_PORT to serve it at http://127.0.0.1:<port>/metrics.
+ENABLED = "--metrics" in sys.argv or os.environ.get("QUIZ_METRICS", "") not in ("", "0")
+METRICS_FILE_ENV = "QUIZ_METRICS_FILE"
+METRICS_PORT_ENV = "QUIZ_METRICS_PORT"
+DUMP_INTERVAL = 5.0
+# Upper bounds in seconds, from sub-millisecond grayscale conversion to multi-second speech
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    # Fixed-bucket latency histogram; observe() is O(log buckets) under a lock
+    def __init__(self, name, buckets=BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def quantile(self, q):
+        # Linear interpolation inside the bucket holding the q-th observation
+        counts, count, _ = self.snapshot()
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(name):
+    with _histograms_lock:
+        if name not in _histograms:
+            _histograms[name] = Histogram(name)
+        return _histograms[name]
+
+
+def histograms():
+    with _histograms_lock:
+        return dict(_histograms)
+
+
+@contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram(name).observe(time.perf_counter() - start)
+
+
+def timed(name):
+    # A shared do-nothing context manager when metrics are off
+    return _timed(name) if ENABLED else _NOOP
+
+
+def instrument(name):
+    """Decorator timing every call as stage name; returns fn untouched when disabled."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _timed(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def render_prometheus():
+    lines = [
+        "# HELP quiz_stage_seconds Latency of each quiz pipeline stage",
+        "# TYPE quiz_stage_seconds histogram",
+    ]
+    for name, hist in sorted(histograms().items()):
+        counts, count, total = hist.snapshot()
+        cumulative = 0
+        for bound, bucket_count in zip(list(hist.buckets) + ["+Inf"], counts):
+            cumulative += bucket_count
+            lines.append(f'quiz_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'quiz_stage_seconds_sum{{stage="{name}"}} {total}')
+        lines.append(f'quiz_stage_seconds_count{{stage="{name}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def dump(path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(render_prometheus())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def serve(port, host="127.0.0.1"):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _dump_periodically(path):
+    while True:
+        time.sleep(DUMP_INTERVAL)
+        dump(path)
+
+
+def start_exporters():
+    # Called once from each app's main(); a no-op unless metrics are enabled
+    if not ENABLED:
+        return
+    path = os.environ.get(METRICS_FILE_ENV)
+    if path:
+        threading.Thread(target=_dump_periodically, args=(path,), daemon=True).start()
+        atexit.register(dump, path)
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        serve(int(port))
+        print(f"Serving metrics at http://127.0.0.1:{port}/metrics", flush=True)
@@ -0,0 +1,198 @@
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.managers import BaseManager
+from landmarks import boxes_to_rects, rects_to_boxes, shapes_to_array
+
+# The launcher creates a fresh address and auth key per session and hands them
+# to the server and the quiz apps through these environment variables.
+ADDRESS_ENV = "QUIZ_MODEL_SERVER"
+AUTHKEY_ENV = "QUIZ_MODEL_SERVER_KEY"
+CONNECTION_ERRORS = (OSError, EOFError, AuthenticationError)
+
+LANDMARK_MODEL = "./shape_predictor_68_face_landmarks.dat"
+
+
+class ModelService:
+    # Keeps the heavy models of all three quiz apps resident in one process
+    def __init__(self):
+        self._locks = {name: threading.Lock() for name in ("emotion", "landmarks", "text")}
+        self._emotion_engine = None
+        self._detector = None
+        self._predictor = None
+        self._text_classifier = None
+
+    def warm_up(self):
+        for loader in (self._get_emotion_engine, self._get_landmark_models, self._get_text_classifier):
+            try:
+                loader()
+            except Exception as e:
+                print(f"Model server: failed to preload model: {e}")
+
+    def _get_emotion_engine(self):
+        with self._locks["emotion"]:
+            if self._emotion_engine is None:
+                from emotion_engine import EmotionEngine
+                self._emotion_engine = EmotionEngine()
+                self._emotion_engine.model
+            return self._emotion_engine
+
+    def _get_landmark_models(self):
+        with self._locks["landmarks"]:
+            if self._predictor is None:
+                import dlib
+                self._detector = dlib.get_frontal_face_detector()
+                self._predictor = dlib.shape_predictor(LANDMARK_MODEL)
+            return self._detector, self._predictor
+
+    def _get_text_classifier(self):
+        with self._locks["text"]:
+            if self._text_classifier is None:
+                from text_emotion import TextEmotionService
+                self._text_classifier = TextEmotionService()
+                self._text_classifier.classify("warm up")
+            return self._text_classifier
+
+    def ping(self):
+        return True
+
+    def emotion_proba(self, crops):
+        engine = self._get_emotion_engine()
+        with self._locks["emotion"]:
+            return engine.predict_proba(crops)
+
+    def detect_faces(self, gray):
+        detector, _ = self._get_landmark_models()
+        with self._locks["landmarks"]:
+            return rects_to_boxes(detector(gray))
+
+    def landmarks_in_boxes(self, gray, boxes):
+        _, predictor = self._get_landmark_models()
+        with self._locks["landmarks"]:
+            return shapes_to_array([predictor(gray, rect) for rect in boxes_to_rects(boxes)])
+
+    def classify_text(self, text):
+        # No lock: concurrent requests from several apps are micro-batched together
+        return self._get_text_classifier().classify(text)
+
+
+class ModelManager(BaseManager):
+    pass
+
+
+class ModelClient(BaseManager):
+    pass
+
+
+ModelClient.register("models")
+
+
+def new_session_config():
+    # Random auth key, and a socket inside a directory only this user can open
+    authkey = os.urandom(32).hex()
+    if hasattr(socket, "AF_UNIX"):
+        session_dir = tempfile.mkdtemp(prefix="quiz-models-")
+        os.chmod(session_dir, 0o700)
+        address = os.path.join(session_dir, "models.sock")
+    else:
+        address = r"\\.\pipe\quiz-models-" + os.urandom(8).hex()
+    return address, authkey
+
+
+def session_config():
+    address = os.environ.get(ADDRESS_ENV)
+    authkey = os.environ.get(AUTHKEY_ENV)
+    if not address or not authkey:
+        return None
+    return address, bytes.fromhex(authkey)
+
+
+def serve():
+    config = session_config()
+    if config is None:
+        address, authkey = new_session_config()
+        print("No model server session configured. Start the launcher, or export:")
+        print(f"  {ADDRESS_ENV}={address}")
+        print(f"  {AUTHKEY_ENV}={authkey}")
+        return
+    address, authkey = config
+
+    service = ModelService()
+    ModelManager.register("models", callable=lambda: service)
+    manager = ModelManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    # Turn the launcher's terminate() into a normal exit so the socket is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    threading.Thread(target=service.warm_up, daemon=True).start()
+    print(f"Model server listening on {address}")
+    try:
+        server.serve_forever()
+    finally:
+        if os.path.exists(address):
+            os.remove(address)
+
+
+def start_server():
+    # Launched as its own interpreter so the launcher's GUI never imports the models.
+    # The child apps started afterwards inherit the session's address and key.
+    address, authkey = new_session_config()
+    os.environ[ADDRESS_ENV] = address
+    os.environ[AUTHKEY_ENV] = authkey
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__)])
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    address = os.environ.get(ADDRESS_ENV)
+    if address and hasattr(socket, "AF_UNIX"):
+        shutil.rmtree(os.path.dirname(address), ignore_errors=True)
+
+
+def connect():
+    config = session_config()
+    if config is None:
+        return None
+    address, authkey = config
+    manager = ModelClient(address=address, authkey=authkey)
+    try:
+        manager.connect()
+        models = manager.models()
+        models.ping()
+    except CONNECTION_ERRORS:
+        return None
+    return models
+
+
+class RemoteModels:
+    # Calls the warm server while it is reachable and falls back to local
+    # models for good once it goes away (e.g. the launcher was closed)
+    def __init__(self, proxy=None):
+        self._proxy = proxy if proxy is not None else connect()
+
+    @property
+    def available(self):
+        return self._proxy is not None
+
+    def call(self, method, *args, fallback):
+        proxy = self._proxy
+        if proxy is not None:
+            try:
+                return getattr(proxy, method)(*args)
+            except CONNECTION_ERRORS as e:
+                print(f"Model server unavailable ({e}), loading models locally.")
+                self._proxy = None
+        return fallback(*args)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+import cv2
+import numpy as np
+from face_dataset import CROP_SIZE
+from face_tracking import FaceTracker, create_cv_tracker, landmark_boxes
+from landmarks import average_ear
+from preprocessing import HAAR_DETECT_WIDTH, FramePreprocessor
+import metrics
+
+
+@dataclass
+class FaceObservation:
+    # One face in one frame; emotion is a probability row, ear a float
+    box: tuple
+    emotion: object = None
+    ear: object = None
+    name: object = None
+    crop: object = None
+
+
+class PerceptionPipeline:
+    """Detects each face once per frame and fans it out to the enabled heads.
+
+    detect(gray) finds faces on the preprocessed frame. Each head is
+    optional and batched over all faces of the frame:
+    emotion(crops) -> probability rows, identify(crops) -> [(name, p)] and
+    landmarks(gray, boxes) -> (N, 68, 2) points, from which the EAR is
+    taken. Crops are CROP_SIZE squares, kept on the observations with
+    keep_crops=True for callers that batch their own models. With a
+    landmarks head the next frame's boxes come from the landmarks, as in the
+    eye tracker; without one an OpenCV tracker follows the faces.
+    """
+
+    def __init__(self, detect, emotion=None, identify=None, landmarks=None, keep_crops=False,
+                 redetect_every=5, detect_width=HAAR_DETECT_WIDTH):
+        self.emotion = emotion
+        self.identify = identify
+        self.landmarks = landmarks
+        self.keep_crops = keep_crops
+        self.preprocessor = FramePreprocessor(detect_width=detect_width)
+        self.tracker = FaceTracker(
+            self.preprocessor.detector(detect), redetect_every=redetect_every,
+            tracker_factory=None if landmarks is not None else create_cv_tracker,
+        )
+
+    @property
+    def needs_crops(self):
+        return self.keep_crops or self.emotion is not None or self.identify is not None
+
+    def __call__(self, frame):
+        gray = self.preprocessor.gray(frame)
+        boxes = self.tracker.update(frame, gray)
+        observations = [FaceObservation(tuple(box)) for box in boxes]
+        if not observations:
+            self.preprocessor.follow(boxes)
+            return observations
+
+        if self.needs_crops:
+            with metrics.timed("crops"):
+                crops = [
+                    cv2.resize(gray[y:y+h, x:x+w], (CROP_SIZE, CROP_SIZE), interpolation=cv2.INTER_AREA)
+                    for (x, y, w, h) in boxes
+                ]
+            if self.keep_crops:
+                for observation, crop in zip(observations, crops):
+                    observation.crop = crop
+            if self.emotion is not None:
+                probs = self.emotion(crops)
+                if probs is not None:
+                    for observation, row in zip(observations, np.asarray(probs)):
+                        observation.emotion = row
+            if self.identify is not None:
+                matches = self.identify(crops)
+                for observation, match in zip(observations, matches or []):
+                    observation.name = match[0]
+
+        if self.landmarks is not None:
+            points = self.landmarks(gray, boxes)
+            if points is not None and len(points) == len(boxes):
+                for observation, ear in zip(observations, average_ear(points)):
+                    observation.ear = float(ear)
+                self.tracker.refine(landmark_boxes(points))
+        self.preprocessor.follow(self.tracker.boxes)
+        return observations
@@ -0,0 +1,98 @@
+import cv2
+import numpy as np
+from face_tracking import clip_box
+import metrics
+
+# Width of the copy the detector searches; the HOG detector needs larger faces than Haar
+HAAR_DETECT_WIDTH = 480
+HOG_DETECT_WIDTH = 640
+# The search region is the last faces padded by this fraction of their size
+ROI_MARGIN = 0.5
+# Every this many detections the whole frame is searched for new faces
+FULL_SEARCH_EVERY = 10
+
+
+class FramePreprocessor:
+    """Grayscale and downscaled copies of each frame in reused buffers.
+
+    gray(frame) converts into one full-resolution buffer and downscale()
+    shrinks it into another, both allocated once per frame size. detect()
+    runs a detector on the small copy - only around the faces from the last
+    call (or follow()) when there are any - and maps the boxes back to full
+    resolution. When the region comes up empty, and every full_search_every
+    calls, the whole frame is searched so new or moving students are found.
+    """
+
+    def __init__(self, detect_width=HAAR_DETECT_WIDTH, roi_margin=ROI_MARGIN, full_search_every=FULL_SEARCH_EVERY):
+        self.detect_width = detect_width
+        self.roi_margin = roi_margin
+        self.full_search_every = full_search_every
+        self.boxes = []
+        self.searches = 0
+        self.region_searches = 0
+        self._gray = None
+        self._small = None
+        self._scale = 1.0
+
+    def gray(self, frame):
+        if frame.ndim == 2:
+            return frame
+        if self._gray is None or self._gray.shape != frame.shape[:2]:
+            self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        with metrics.timed("grayscale"):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        return self._gray
+
+    def downscale(self, gray):
+        height, width = gray.shape[:2]
+        if width <= self.detect_width:
+            self._scale = 1.0
+            return gray
+        self._scale = width / self.detect_width
+        shape = (max(1, round(height / self._scale)), self.detect_width)
+        if self._small is None or self._small.shape != shape:
+            self._small = np.empty(shape, dtype=np.uint8)
+        with metrics.timed("downscale"):
+            cv2.resize(gray, shape[::-1], dst=self._small, interpolation=cv2.INTER_AREA)
+        return self._small
+
+    def follow(self, boxes):
+        # Full-resolution boxes from a tracker or landmarks to centre the next search on
+        self.boxes = [tuple(int(v) for v in box) for box in boxes]
+
+    def region(self, shape):
+        # Padded union of the known faces in small-image coordinates, or None
+        if not self.boxes:
+            return None
+        boxes = np.asarray(self.boxes, dtype=np.float64) / self._scale
+        pad = boxes[:, 2:] * self.roi_margin
+        x0, y0 = (boxes[:, :2] - pad).min(axis=0)
+        x1, y1 = (boxes[:, :2] + boxes[:, 2:] + pad).max(axis=0)
+        return clip_box((x0, y0, x1 - x0, y1 - y0), shape)
+
+    def detect(self, detect, gray):
+        small = self.downscale(gray)
+        region = None
+        if self.searches % self.full_search_every:
+            region = self.region(small.shape)
+        self.searches += 1
+        boxes = []
+        if region is not None:
+            self.region_searches += 1
+            x, y, w, h = region
+            boxes = self._search(detect, small[y:y+h, x:x+w], x, y)
+        if not boxes:
+            boxes = self._search(detect, small, 0, 0)
+        self.boxes = boxes
+        return boxes
+
+    def _search(self, detect, image, x_offset, y_offset):
+        scale = self._scale
+        return [
+            (int((x + x_offset) * scale), int((y + y_offset) * scale), int(w * scale), int(h * scale))
+            for (x, y, w, h) in detect(image)
+        ]
+
+    def detector(self, detect):
+        # detect() with this preprocessing, e.g. to hand to FaceTracker
+        return lambda gray: self.detect(detect, gray)
@@ -0,0 +1,109 @@
+import os
+import random
+import tempfile
+import numpy as np
+from startup import LazyResource
+import metrics
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+QUESTIONS_CSV = "./math_questions.csv"
+# QUIZ_QUESTION_SOURCE=generator draws fresh questions instead of reading the
+# CSV; QUIZ_QUESTION_SEED makes the generated quizzes reproducible
+QUESTION_SOURCE_ENV = "QUIZ_QUESTION_SOURCE"
+QUESTION_SEED_ENV = "QUIZ_QUESTION_SEED"
+
+
+def cache_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + ".bank.npy"
+
+
+def build_bank_array(questions, difficulties, answers):
+    # Sort rows by difficulty so every tier is one contiguous slice of the file
+    levels = np.array([DIFFICULTIES.index(d.strip().capitalize()) for d in difficulties], dtype=np.uint8)
+    questions = np.array([q.strip().encode() for q in questions], dtype=bytes)
+    answers = np.array([str(a).strip().encode() for a in answers], dtype=bytes)
+    bank = np.empty(len(levels), dtype=[
+        ("difficulty", np.uint8),
+        ("question", questions.dtype),
+        ("answer", answers.dtype),
+    ])
+    order = np.argsort(levels, kind="stable")
+    bank["difficulty"] = levels[order]
+    bank["question"] = questions[order]
+    bank["answer"] = answers[order]
+    return bank
+
+
+def convert_csv(csv_path, cache_path):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, dtype=str)
+    df.columns = df.columns.str.strip()
+    bank = build_bank_array(df["Question"], df["Difficulty"], df["Answers"])
+    # Each process writes its own temp file; the last rename wins atomically
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, bank)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class QuestionBank:
+    """Question bank backed by a memory-mapped array sorted by difficulty.
+
+    Each difficulty tier is a contiguous [start, stop) row range, so drawing
+    k random questions touches only those k rows.
+    """
+
+    def __init__(self, bank):
+        self.bank = bank
+        bounds = np.searchsorted(bank["difficulty"], np.arange(len(DIFFICULTIES) + 1))
+        self.ranges = {
+            name.lower(): (int(bounds[i]), int(bounds[i + 1]))
+            for i, name in enumerate(DIFFICULTIES)
+        }
+
+    @classmethod
+    def load(cls, csv_path=QUESTIONS_CSV, cache_path=None):
+        cache_path = cache_path or cache_path_for(csv_path)
+        if not os.path.exists(cache_path) or (
+            os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(cache_path)
+        ):
+            convert_csv(csv_path, cache_path)
+        return cls(np.load(cache_path, mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.bank)
+
+    def count(self, difficulty):
+        start, stop = self.ranges.get(difficulty.lower(), (0, 0))
+        return stop - start
+
+    def record(self, index):
+        row = self.bank[index]
+        return {
+            "Question": row["question"].decode(),
+            "Difficulty": DIFFICULTIES[row["difficulty"]],
+            "Answers": row["answer"].decode(),
+        }
+
+    @metrics.instrument("question_sampling")
+    def sample(self, difficulty, k=10, rng=random):
+        start, stop = self.ranges.get(difficulty.lower(), (0, 0))
+        indices = rng.sample(range(start, stop), min(k, stop - start))
+        return [self.record(i) for i in indices]
+
+
+def load_question_source():
+    if os.environ.get(QUESTION_SOURCE_ENV, "").lower() == "generator":
+        from question_generator import QuestionGenerator
+
+        seed = os.environ.get(QUESTION_SEED_ENV)
+        return QuestionGenerator(seed=None if seed is None else int(seed))
+    return QuestionBank.load()
+
+
+question_bank = LazyResource("question bank", load_question_source)
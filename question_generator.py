@@ -0,0 +1,101 @@
+import numpy as np
+import metrics
+
+KINDS = ("+", "-", "*", "squared", "sqrt")
+NOT_A_PERFECT_SQUARE = "Not a perfect square"
+
+# Per tier: operand range for + - *, root range for squared / square root
+# questions, and how often each kind of question is drawn
+DEFAULT_RULES = {
+    "Easy": {
+        "operands": (1, 20), "roots": (1, 12),
+        "kinds": {"+": 0.35, "-": 0.35, "squared": 0.15, "sqrt": 0.15},
+    },
+    "Medium": {
+        "operands": (1, 100), "roots": (1, 30),
+        "kinds": {"+": 0.25, "-": 0.25, "*": 0.3, "squared": 0.1, "sqrt": 0.1},
+    },
+    "Hard": {
+        "operands": (10, 100), "roots": (10, 100),
+        "kinds": {"-": 0.2, "*": 0.5, "squared": 0.15, "sqrt": 0.15},
+    },
+}
+
+
+def format_question(kind, a, b):
+    if kind == "squared":
+        return f"What is {a} squared?"
+    if kind == "sqrt":
+        return f"What is the square root of {a}?"
+    return f"What is {a} {kind} {b}?"
+
+
+class QuestionGenerator:
+    """Draws arithmetic questions for a tier instead of reading them from the CSV.
+
+    Operands, operators and answers for a whole batch are drawn as NumPy
+    arrays; sample() returns the same {"Question", "Difficulty", "Answers"}
+    records as QuestionBank.sample, with no repeats within one call. Pass a
+    seed for a reproducible sequence of quizzes.
+    """
+
+    def __init__(self, rules=None, seed=None):
+        self.rules = rules or DEFAULT_RULES
+        self.rng = np.random.default_rng(seed)
+
+    def count(self, difficulty):
+        # Effectively unlimited for any tier the rules know about
+        return np.iinfo(np.int64).max if self._tier(difficulty) else 0
+
+    def _tier(self, difficulty):
+        for name in self.rules:
+            if name.lower() == difficulty.lower():
+                return name
+        return None
+
+    def generate_arrays(self, difficulty, k):
+        # (kind index, a, b, answer, perfect square) arrays for k questions
+        rule = self.rules[self._tier(difficulty)]
+        kinds, weights = zip(*rule["kinds"].items())
+        kind = np.array([KINDS.index(name) for name in kinds])[
+            self.rng.choice(len(kinds), size=k, p=np.asarray(weights) / sum(weights))
+        ]
+        low, high = rule["operands"]
+        a = self.rng.integers(low, high + 1, size=k)
+        b = self.rng.integers(low, high + 1, size=k)
+        answer = np.select([kind == 0, kind == 1, kind == 2], [a + b, a - b, a * b], 0)
+
+        root_low, root_high = rule["roots"]
+        roots = self.rng.integers(root_low, root_high + 1, size=k)
+        squared = kind == KINDS.index("squared")
+        a[squared] = roots[squared]
+        answer[squared] = roots[squared] ** 2
+        # Half the square root questions have a whole-number answer
+        sqrt = kind == KINDS.index("sqrt")
+        perfect = self.rng.random(k) < 0.5
+        a[sqrt] = np.where(perfect, roots ** 2, self.rng.integers(root_low ** 2, root_high ** 2 + 1, size=k))[sqrt]
+        root = np.rint(np.sqrt(a)).astype(np.int64)
+        perfect = sqrt & (root * root == a)
+        answer[sqrt] = root[sqrt]
+        b[squared | sqrt] = 0
+        return kind, a, b, answer, perfect
+
+    @metrics.instrument("question_sampling")
+    def sample(self, difficulty, k=10):
+        tier = self._tier(difficulty)
+        if tier is None:
+            return []
+        records, seen = [], set()
+        # Tiny tiers can run out of distinct questions; stop after a few tries
+        for _ in range(10):
+            kind, a, b, answer, perfect = self.generate_arrays(difficulty, 2 * (k - len(records)))
+            for row in zip(kind.tolist(), a.tolist(), b.tolist(), answer.tolist(), perfect.tolist()):
+                if row[:3] in seen:
+                    continue
+                seen.add(row[:3])
+                name = KINDS[row[0]]
+                text = str(row[3]) if name != "sqrt" or row[4] else NOT_A_PERFECT_SQUARE
+                records.append({"Question": format_question(name, row[1], row[2]), "Difficulty": tier, "Answers": text})
+                if len(records) == k:
+                    return records
+        return records
@@ -0,0 +1,87 @@
+import os
+import time
+import cv2
+
+# Point the apps at recordings instead of live hardware, e.g.
+#   QUIZ_CAMERA_SOURCE=session.mp4 python face_recognition_app.py
+#   QUIZ_CAMERA_SOURCE=dataset python eye_tracker_app.py
+#   QUIZ_AUDIO_SOURCE=temp_audio.wav python speech_recog_app.py
+CAMERA_SOURCE_ENV = "QUIZ_CAMERA_SOURCE"
+AUDIO_SOURCE_ENV = "QUIZ_AUDIO_SOURCE"
+# Live cameras are asked for this resolution ("WIDTHxHEIGHT"); "native" keeps theirs
+CAMERA_RESOLUTION_ENV = "QUIZ_CAMERA_RESOLUTION"
+DEFAULT_RESOLUTION = (1280, 720)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def list_images(folder):
+    # Every image under folder, walked in a stable order
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        paths += [os.path.join(root, f) for f in sorted(files) if f.lower().endswith(IMAGE_EXTENSIONS)]
+    return paths
+
+
+class ImageFolderCapture:
+    """cv2.VideoCapture look-alike that plays the images in a folder as frames.
+
+    Grayscale crops such as the dataset are returned as BGR like a camera
+    frame would be. With fps set, read() is paced to that frame rate.
+    """
+
+    def __init__(self, folder, fps=None, loop=False):
+        self.paths = list_images(folder)
+        self.fps = fps
+        self.loop = loop
+        self._index = 0
+        self._next_time = None
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def read(self):
+        if self._index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self._index = 0
+        if self.fps:
+            now = time.monotonic()
+            if self._next_time is not None and now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(now, self._next_time or now) + 1.0 / self.fps
+        frame = cv2.imread(self.paths[self._index], cv2.IMREAD_COLOR)
+        self._index += 1
+        return frame is not None, frame
+
+    def release(self):
+        self._index = len(self.paths)
+
+
+def camera_resolution():
+    value = os.environ.get(CAMERA_RESOLUTION_ENV, "").strip().lower()
+    if value == "native":
+        return None
+    if not value:
+        return DEFAULT_RESOLUTION
+    width, height = value.split("x")
+    return int(width), int(height)
+
+
+def open_capture(source, resolution=None):
+    # Camera index, video file or image folder -> an object with read()/isOpened()/release()
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    if isinstance(source, str) and os.path.isdir(source):
+        return ImageFolderCapture(source)
+    cap = cv2.VideoCapture(source)
+    resolution = resolution or camera_resolution()
+    if isinstance(source, int) and resolution and cap.isOpened():
+        # Fewer pixels per frame for every later stage; the camera picks its nearest mode
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
+    return cap
+
+
+def camera_source(default=0):
+    return os.environ.get(CAMERA_SOURCE_ENV, default)
@@ -0,0 +1,228 @@
+import argparse
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# Every answer of every quiz goes here; QUIZ_RESULTS_DB points the apps elsewhere
+RESULTS_DB_ENV = "QUIZ_RESULTS_DB"
+RESULTS_DB = "quiz_results.db"
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    app TEXT NOT NULL,
+    student TEXT,
+    started REAL NOT NULL,
+    finished REAL,
+    score INTEGER,
+    total INTEGER
+);
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    app TEXT NOT NULL,
+    student TEXT,
+    question TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    latency REAL,
+    signal TEXT,
+    answered REAL NOT NULL
+);
+-- Covering indexes: the aggregate helpers below never touch the table itself
+CREATE INDEX IF NOT EXISTS answers_by_student ON answers (student, difficulty, correct, latency);
+CREATE INDEX IF NOT EXISTS answers_by_question ON answers (question, correct, latency);
+CREATE INDEX IF NOT EXISTS answers_by_session ON answers (session);
+CREATE INDEX IF NOT EXISTS sessions_by_student ON sessions (student, started);
+"""
+
+_INSERT_SESSION = "INSERT INTO sessions (id, app, student, started) VALUES (?, ?, ?, ?)"
+_FINISH_SESSION = "UPDATE sessions SET finished = ?, score = ?, total = ?, student = coalesce(?, student) WHERE id = ?"
+_INSERT_ANSWER = (
+    "INSERT INTO answers (session, app, student, question, difficulty, correct, latency, signal, answered) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL lets the query helpers read while the writer appends
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class ResultsStore:
+    """SQLite record of every quiz session and answer.
+
+    start_session(), record_answer() and finish_session() only put a row on
+    a queue; one background thread writes the queue in transactions of up
+    to batch_size rows at least every flush_interval seconds, so the GUI
+    never waits on the disk. The thread and the database file are created
+    on the first write, and pending rows are written at exit.
+    """
+
+    def __init__(self, path=None, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path or os.environ.get(RESULTS_DB_ENV, RESULTS_DB)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.errors = []
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _put(self, sql, params):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+        self._queue.put((sql, params))
+
+    def start_session(self, app, student=None):
+        session = uuid.uuid4().hex
+        self._put(_INSERT_SESSION, (session, app, student, time.time()))
+        return session
+
+    def record_answer(self, session, app, question, difficulty, correct, latency=None, signal=None, student=None):
+        self._put(_INSERT_ANSWER, (
+            session, app, student, question, difficulty, int(bool(correct)),
+            latency, signal, time.time(),
+        ))
+
+    def finish_session(self, session, score, total, student=None):
+        self._put(_FINISH_SESSION, (time.time(), score, total, student, session))
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    self._queue.task_done()
+                    return
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        # Write what we have, then stop on the next turn
+                        self._queue.task_done()
+                        self._queue.put(None)
+                        break
+                    batch.append(item)
+                self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                # Runs of the same statement go through one executemany
+                start = 0
+                for i in range(1, len(batch) + 1):
+                    if i == len(batch) or batch[i][0] != batch[start][0]:
+                        conn.executemany(batch[start][0], [params for _, params in batch[start:i]])
+                        start = i
+        except sqlite3.Error as e:
+            self.errors.append(str(e))
+            print(f"Results store: could not write {len(batch)} rows ({e})")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        # Blocks until every queued row is written
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join()
+
+    def _reader(self):
+        # One read connection per thread, opened on first use
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def query(self, sql, params=()):
+        return [dict(row) for row in self._reader().execute(sql, params)]
+
+    def student_summary(self, student):
+        # Answers, accuracy and mean latency per difficulty for one student
+        return self.query(
+            "SELECT difficulty, count(*) AS answered, sum(correct) AS correct, "
+            "avg(correct) AS accuracy, avg(latency) AS mean_latency "
+            "FROM answers WHERE student IS ? GROUP BY difficulty",
+            (student,),
+        )
+
+    def question_stats(self, question):
+        rows = self.query(
+            "SELECT question, count(*) AS answered, avg(correct) AS accuracy, avg(latency) AS mean_latency "
+            "FROM answers WHERE question = ?",
+            (question,),
+        )
+        return rows[0] if rows and rows[0]["answered"] else None
+
+    def hardest_questions(self, limit=10, min_answers=5):
+        # Lowest accuracy among questions answered at least min_answers times
+        return self.query(
+            "SELECT question, count(*) AS answered, avg(correct) AS accuracy, avg(latency) AS mean_latency "
+            "FROM answers GROUP BY question HAVING count(*) >= ? ORDER BY accuracy, answered DESC LIMIT ?",
+            (min_answers, limit),
+        )
+
+    def student_sessions(self, student, limit=20):
+        return self.query(
+            "SELECT id, app, started, finished, score, total FROM sessions "
+            "WHERE student IS ? ORDER BY started DESC LIMIT ?",
+            (student, limit),
+        )
+
+
+results_store = ResultsStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the recorded quiz results.")
+    parser.add_argument("--db", help=f"results database (default {RESULTS_DB} or ${RESULTS_DB_ENV})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    student_parser = commands.add_parser("student", help="per-difficulty summary and recent sessions")
+    student_parser.add_argument("name")
+    hardest_parser = commands.add_parser("hardest", help="questions answered correctly least often")
+    hardest_parser.add_argument("--limit", type=int, default=10)
+    hardest_parser.add_argument("--min-answers", type=int, default=5)
+    args = parser.parse_args()
+
+    store = ResultsStore(args.db)
+    if args.command == "student":
+        for row in store.student_summary(args.name):
+            print(f"{row['difficulty']:<7} {row['correct']}/{row['answered']} correct, "
+                  f"mean {row['mean_latency'] or 0:.1f}s per answer")
+        for row in store.student_sessions(args.name):
+            print(f"{time.ctime(row['started'])}  {row['app']:<6} {row['score']}/{row['total']}")
+    else:
+        for row in store.hardest_questions(args.limit, args.min_answers):
+            print(f"{row['accuracy']:6.1%}  n={row['answered']:<5} {row['question']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import argparse
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from replay import open_capture
+from frame_ring import FrameSlot
+from signal_stream import SignalAggregator
+from emotion_engine import EMOTION_DIFFICULTY, EMOTION_LABELS
+from landmarks import ENGAGEMENT_DIFFICULTY, engagement_levels
+from perception import FaceObservation, PerceptionPipeline
+import metrics
+
+MATCH_IOU = 0.3
+FORGET_AFTER = 5.0
+
+
+def box_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    w = min(ax + aw, bx + bw) - max(ax, bx)
+    h = min(ay + ah, by + bh) - max(ay, by)
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+class StudentState:
+    """Everything the session knows about one face seen on one camera."""
+
+    def __init__(self, student_id, camera, box, now):
+        self.student_id = student_id
+        self.camera = camera
+        self.box = box
+        self.name = None
+        self.last_seen = now
+        self.emotion = SignalAggregator(EMOTION_LABELS)
+        self.engagement = SignalAggregator(["ear"])
+
+    def observe(self, observation, now):
+        self.box = observation.box
+        self.last_seen = now
+        if observation.name not in (None, "Unknown"):
+            self.name = observation.name
+        if observation.emotion is not None:
+            self.emotion.update(observation.emotion)
+        if observation.ear is not None:
+            self.engagement.update([observation.ear])
+
+    @property
+    def label(self):
+        return self.name or self.student_id
+
+    def current_emotion(self):
+        return self.emotion.dominant("neutral")
+
+    def current_engagement(self):
+        estimate = self.engagement.estimate()
+        return "Neutral" if estimate is None else str(engagement_levels(estimate[0]))
+
+    @property
+    def difficulty(self):
+        # Emotion drives difficulty like the face app; engagement is the fallback signal
+        if self.emotion.count:
+            return EMOTION_DIFFICULTY.get(self.current_emotion(), "Medium")
+        return ENGAGEMENT_DIFFICULTY.get(self.current_engagement(), "Medium")
+
+    def summary(self):
+        return {
+            "student": self.label, "camera": self.camera, "emotion": self.current_emotion(),
+            "engagement": self.current_engagement(), "difficulty": self.difficulty,
+        }
+
+
+class SessionEngine:
+    """Serves several cameras and several students per camera at once.
+
+    Every source gets a capture thread that keeps only its newest frame, and
+    an analysis loop that sends that frame to one inference pool shared by
+    all cameras, so a slow camera or a crowded frame never queues up stale
+    work. analyze_faces(frame) returns FaceObservation objects; they are
+    matched to the camera's students by box overlap, and students not seen
+    for forget_after seconds are dropped. Stateful analyzers such as a
+    PerceptionPipeline come from analyzer_factory, called once per camera.
+    """
+
+    def __init__(self, sources, analyze_faces=None, workers=None, forget_after=FORGET_AFTER, on_update=None,
+                 analyzer_factory=None):
+        self.sources = list(sources)
+        self.analyze_faces = analyze_faces
+        self.analyzer_factory = analyzer_factory
+        self.pool = ThreadPoolExecutor(max_workers=workers or max(1, len(self.sources)))
+        self.forget_after = forget_after
+        self.on_update = on_update
+        self.students = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for camera, source in enumerate(self.sources):
+            slot = FrameSlot()
+            analyze = self.analyzer_factory() if self.analyzer_factory is not None else self.analyze_faces
+            for target, args in (
+                (self._capture_loop, (source, slot, camera)), (self._analysis_loop, (slot, camera, analyze)),
+            ):
+                thread = threading.Thread(target=target, args=args, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.pool.shutdown()
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def wait(self, timeout=None):
+        # Until every source has run out (replays) or stop() is called
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def _capture_loop(self, source, slot, camera):
+        cap = open_capture(source)
+        try:
+            if not cap.isOpened():
+                self.errors[camera] = f"Could not open camera {source!r}"
+                return
+            while not self._stop.is_set():
+                with metrics.timed("capture"):
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+                slot.put(frame)
+        finally:
+            cap.release()
+            slot.close()
+
+    def _analysis_loop(self, slot, camera, analyze):
+        seq = 0
+        while not self._stop.is_set():
+            seq, frame = slot.get_after(seq, timeout=0.5)
+            if frame is None:
+                if slot.closed:
+                    break
+                continue
+            try:
+                observations = self.pool.submit(analyze, frame).result()
+            except Exception as e:
+                self.errors[camera] = str(e)
+                continue
+            self.update(camera, observations)
+
+    def update(self, camera, observations, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tracks = [s for s in self.students.values() if s.camera == camera]
+            # Greedy association, best overlaps first
+            pairs = sorted(
+                ((box_iou(s.box, o.box), i, s) for i, o in enumerate(observations) for s in tracks),
+                key=lambda pair: pair[0], reverse=True,
+            )
+            matched, used = {}, set()
+            for iou, i, student in pairs:
+                if iou < MATCH_IOU or i in matched or student.student_id in used:
+                    continue
+                matched[i] = student
+                used.add(student.student_id)
+            for i, observation in enumerate(observations):
+                student = matched.get(i)
+                if student is None:
+                    student_id = f"cam{camera}-student{next(self._ids)}"
+                    student = self.students[student_id] = StudentState(student_id, camera, observation.box, now)
+                student.observe(observation, now)
+            for student_id, student in list(self.students.items()):
+                if now - student.last_seen > self.forget_after:
+                    del self.students[student_id]
+            summaries = [s.summary() for s in self.students.values()]
+        if self.on_update is not None:
+            self.on_update(summaries)
+        return summaries
+
+    def snapshot(self):
+        with self._lock:
+            return [s.summary() for s in self.students.values()]
+
+
+# A head whose model cannot be loaded (not installed, file missing) stays off
+LOAD_ERRORS = (ImportError, OSError)
+
+
+class _OptionalStage:
+    # Turns fn off for good when its model cannot be loaded; any other error
+    # only skips that frame, and is printed when it differs from the last one
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.failed = False
+        self.errors = 0
+        self._last_error = None
+
+    def __call__(self, *args):
+        if self.failed:
+            return None
+        try:
+            return self.fn(*args)
+        except LOAD_ERRORS as e:
+            self.failed = True
+            print(f"Session engine: {self.name} disabled ({e})")
+        except Exception as e:
+            self.errors += 1
+            if str(e) != self._last_error:
+                self._last_error = str(e)
+                print(f"Session engine: {self.name} skipped a frame ({e})")
+        return None
+
+
+def make_face_analyzer():
+    """Default per-camera analyzer: one Haar detection feeding the emotion, identity and EAR heads."""
+    import face_models
+
+    emotion = _OptionalStage("emotion", face_models.predict_emotion_proba)
+    landmarks = _OptionalStage("landmarks", face_models.get_face_landmarks)
+    identify = _OptionalStage("identification", face_models.identify_faces)
+    return PerceptionPipeline(face_models.detect_faces, emotion=emotion, identify=identify, landmarks=landmarks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track emotion, engagement and difficulty for every student on several cameras.")
+    parser.add_argument("sources", nargs="*", default=["0"], help="camera indices, video files or image folders")
+    parser.add_argument("--workers", type=int, help="inference threads shared by all cameras")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between status lines")
+    args = parser.parse_args()
+
+    engine = SessionEngine(args.sources, workers=args.workers, analyzer_factory=make_face_analyzer)
+    engine.start()
+    try:
+        while engine.running:
+            time.sleep(args.interval)
+            for student in engine.snapshot():
+                print(f"[cam {student['camera']}] {student['student']}: {student['emotion']}, "
+                      f"{student['engagement']} -> {student['difficulty']}")
+            for camera, error in engine.errors.items():
+                print(f"[cam {camera}] {error}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class SignalAggregator:
+    """Streaming summary of per-frame scores with constant memory.
+
+    Each update(values) writes one row into a fixed-size ring buffer and folds
+    it into an exponentially weighted moving average, both in O(1). channels
+    names the columns, e.g. the seven emotion probabilities or ["ear"].
+    """
+
+    def __init__(self, channels, capacity=300, alpha=0.2):
+        self.channels = list(channels)
+        self.capacity = capacity
+        self.alpha = alpha
+        self._buffer = np.zeros((capacity, len(self.channels)), dtype=np.float32)
+        self._ewma = np.zeros(len(self.channels), dtype=np.float64)
+        self._next = 0
+        self.count = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(len(self.channels))
+        self._buffer[self._next] = values
+        self._next = (self._next + 1) % self.capacity
+        if self.count == 0:
+            self._ewma[:] = values
+        else:
+            self._ewma += self.alpha * (values - self._ewma)
+        self.count += 1
+
+    def reset(self):
+        self._next = 0
+        self.count = 0
+        self._ewma[:] = 0
+
+    def estimate(self):
+        # EWMA of every channel, or None before the first update
+        return self._ewma.copy() if self.count else None
+
+    def window(self):
+        # The most recent samples, oldest first
+        if self.count < self.capacity:
+            return self._buffer[:self.count].copy()
+        return np.roll(self._buffer, -self._next, axis=0)
+
+    def window_mean(self):
+        return self.window().mean(axis=0) if self.count else None
+
+    def dominant(self, default=None):
+        if not self.count:
+            return default
+        return self.channels[int(self._ewma.argmax())]
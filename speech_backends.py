@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import threading
+import time
+import wave
+import numpy as np
+import speech_recognition as sr
+from startup import LazyResource
+import metrics
+
+# The offline engine needs a Vosk model, which is not shipped with the repo.
+# Download vosk-model-small-en-us-0.15.zip from https://alphacephei.com/vosk/models,
+# unzip it next to this file, or point VOSK_MODEL_PATH at the unzipped folder.
+# Without it the apps fall back to the online Google recognizer.
+VOSK_MODEL_PATH = os.environ.get("VOSK_MODEL_PATH", "./vosk-model-small-en-us-0.15")
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 0.25
+CALIBRATION_SECONDS = 0.5
+END_OF_SPEECH_SECONDS = 1.0
+
+
+def chunk_rms(chunk):
+    samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+    return float(np.sqrt(np.mean(samples ** 2))) if samples.size else 0.0
+
+
+class MicrophoneSource:
+    # Streams 16-bit mono PCM chunks from the default microphone; max_seconds=None streams until stop()
+    def __init__(self, sample_rate=SAMPLE_RATE, chunk_seconds=CHUNK_SECONDS, max_seconds=10):
+        self.sample_rate = sample_rate
+        self.chunk_frames = int(sample_rate * chunk_seconds)
+        self.max_seconds = max_seconds
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def chunks(self):
+        with sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.chunk_frames) as source:
+            start_time = time.time()
+            while not self._stop.is_set() and (
+                self.max_seconds is None or time.time() - start_time < self.max_seconds
+            ):
+                yield source.stream.read(self.chunk_frames)
+
+
+class WavFileSource:
+    # Replays a WAV file (e.g. temp_audio.wav) as the same 16-bit mono chunks
+    def __init__(self, path, chunk_seconds=CHUNK_SECONDS):
+        self.path = path
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            self.sample_rate = wav.getframerate()
+            self.channels = wav.getnchannels()
+        self.chunk_frames = int(self.sample_rate * chunk_seconds)
+
+    def stop(self):
+        pass
+
+    def chunks(self):
+        with wave.open(self.path, "rb") as wav:
+            while True:
+                data = wav.readframes(self.chunk_frames)
+                if not data:
+                    break
+                if self.channels > 1:
+                    samples = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+                    data = samples.mean(axis=1).astype(np.int16).tobytes()
+                yield data
+
+
+def load_vosk_model():
+    from vosk import Model, SetLogLevel
+
+    SetLogLevel(-1)
+    if not os.path.isdir(VOSK_MODEL_PATH):
+        raise FileNotFoundError(f"Vosk model not found at {VOSK_MODEL_PATH}")
+    return Model(VOSK_MODEL_PATH)
+
+
+vosk_model = LazyResource("vosk speech model", load_vosk_model)
+
+
+class VoskRecognizer:
+    """Offline recognizer that decodes audio chunk by chunk as it arrives.
+
+    Partial hypotheses are passed to on_partial while the user is speaking,
+    and transcription ends at the first utterance boundary Vosk detects.
+    """
+
+    name = "vosk"
+
+    def prefetch(self):
+        vosk_model.prefetch()
+
+    @metrics.instrument("speech_recognition")
+    def transcribe(self, source, on_partial=None, single_utterance=True):
+        from vosk import KaldiRecognizer
+
+        recognizer = KaldiRecognizer(vosk_model.get(), source.sample_rate)
+        texts = []
+        for chunk in source.chunks():
+            if recognizer.AcceptWaveform(chunk):
+                text = json.loads(recognizer.Result()).get("text", "")
+                if text:
+                    texts.append(text)
+                    if single_utterance:
+                        source.stop()
+                        break
+            elif on_partial is not None:
+                partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                if partial:
+                    on_partial(" ".join(texts + [partial]))
+        else:
+            text = json.loads(recognizer.FinalResult()).get("text", "")
+            if text:
+                texts.append(text)
+        if not texts:
+            raise sr.UnknownValueError()
+        return " ".join(texts)
+
+
+class GoogleRecognizer:
+    # The original online backend; needs an internet connection
+    name = "google"
+
+    def prefetch(self):
+        pass
+
+    @metrics.instrument("speech_recognition")
+    def transcribe(self, source, on_partial=None, single_utterance=True):
+        chunks = self.record(source) if single_utterance else list(source.chunks())
+        audio = sr.AudioData(b"".join(chunks), source.sample_rate, 2)
+        return sr.Recognizer().recognize_google(audio)
+
+    def record(self, source):
+        # Calibrate the noise floor on the first chunks, then stop after a
+        # second of silence following speech (or when the source runs out)
+        chunk_seconds = source.chunk_frames / source.sample_rate
+        calibration_chunks = max(1, int(CALIBRATION_SECONDS / chunk_seconds))
+        silence_chunks = max(1, int(END_OF_SPEECH_SECONDS / chunk_seconds))
+        chunks, noise = [], []
+        heard_speech, silent = False, 0
+        for chunk in source.chunks():
+            chunks.append(chunk)
+            level = chunk_rms(chunk)
+            if len(noise) < calibration_chunks:
+                noise.append(level)
+                continue
+            if level > max(2.0 * float(np.mean(noise)), 100.0):
+                heard_speech, silent = True, 0
+            elif heard_speech:
+                silent += 1
+                if silent >= silence_chunks:
+                    source.stop()
+                    break
+        return chunks
+
+
+RECOGNIZERS = {"vosk": VoskRecognizer, "google": GoogleRecognizer}
+
+
+def get_recognizer(name=None):
+    # Prefer the offline engine whenever vosk and its model are available
+    name = name or os.environ.get("SPEECH_RECOGNIZER")
+    if name is None:
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            name = "google"
+            reason = "vosk is not installed"
+        else:
+            if os.path.isdir(VOSK_MODEL_PATH):
+                name = "vosk"
+                reason = f"model found at {VOSK_MODEL_PATH}"
+            else:
+                name = "google"
+                reason = f"no Vosk model at {VOSK_MODEL_PATH} (set VOSK_MODEL_PATH)"
+    else:
+        reason = "requested"
+    print(f"Speech recognizer: {name} ({reason})")
+    return RECOGNIZERS[name]()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a WAV file with a speech backend.")
+    parser.add_argument("wav", nargs="?", default="temp_audio.wav")
+    parser.add_argument("--recognizer", choices=sorted(RECOGNIZERS))
+    args = parser.parse_args()
+
+    recognizer = get_recognizer(args.recognizer)
+    start_time = time.perf_counter()
+    text = recognizer.transcribe(
+        WavFileSource(args.wav), on_partial=lambda partial: print(f"... {partial}"), single_utterance=False
+    )
+    print(f"[{recognizer.name}] {text} ({time.perf_counter() - start_time:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,73 @@
+import os
 import sys
+import time
+import startup
 import random
-import pandas as pd
 import speech_recognition as sr
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QLineEdit, QHBoxLayout
 )
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt
-from transformers import pipeline
-
-# Load the emotion classification model
-emotion_classifier = pipeline("text-classification", model="bhadresh-savani/distilbert-base-uncased-emotion")
-
-df = pd.read_csv("./math_questions.csv")
-df.columns = df.columns.str.strip()  # Remove leading/trailing spaces from column names
+from PyQt6.QtCore import Qt, QTimer
+from workers import StreamWorker, TaskWorker
+from question_bank import question_bank
+from adaptive_difficulty import AdaptiveDifficulty, QuestionPool
+from results_store import results_store
+from speech_backends import MicrophoneSource, WavFileSource, get_recognizer
+from voice_activity import UtteranceSource, VoiceActivityDetector, segment_utterances
+from replay import AUDIO_SOURCE_ENV
+from text_emotion import TextEmotionService
+from acoustic_emotion import AcousticEmotionEngine, fuse_emotions
+import model_server
+import metrics
+from stats_overlay import attach_overlay
+
+# Use the launcher's warm model server when it is running, otherwise load locally
+remote_models = model_server.RemoteModels()
+
+# Batched, cached emotion classifier used when the model server is not running
+text_emotion_service = TextEmotionService()
+
+@metrics.instrument("text_classification")
+def classify_text(text):
+    return remote_models.call("classify_text", text, fallback=text_emotion_service.classify)
+
+# Offline Vosk when available, otherwise the online Google recognizer
+speech_recognizer = get_recognizer()
+
+# Emotion from the tone of voice, straight from the waveform
+acoustic_emotion_engine = AcousticEmotionEngine()
+
+# "text" classifies the transcript, "acoustic" only the tone of voice (no transcription),
+# "fused" both; the default is fused when a trained acoustic model exists
+VOICE_EMOTION_ENV = "QUIZ_VOICE_EMOTION"
+
+def voice_emotion_mode():
+    mode = os.environ.get(VOICE_EMOTION_ENV)
+    if mode in ("text", "acoustic", "fused"):
+        return mode
+    return "fused" if acoustic_emotion_engine.available else "text"
+
+def classify_utterances(source, detector, acoustic=True):
+    # (samples, acoustic result or None) per utterance; the tone is classified here,
+    # on the listening thread, right when the utterance ends
+    for samples in segment_utterances(source, detector):
+        result = None
+        if acoustic:
+            try:
+                result = acoustic_emotion_engine.classify(samples, detector.sample_rate)
+            except Exception as e:
+                print(f"Acoustic emotion failed: {e}")
+        yield samples, result
+
+VOICE_BUTTON_TEXT = "Detect Emotion (Voice) 🎙️"
+STOP_LISTENING_TEXT = "Stop Listening ⏹️"
+
+def open_voice_source():
+    # A recorded WAV stands in for the microphone when QUIZ_AUDIO_SOURCE is set;
+    # the microphone stays open until listening is stopped
+    path = os.environ.get(AUDIO_SOURCE_ENV)
+    return WavFileSource(path) if path else MicrophoneSource(max_seconds=None)
 
 class EmotionApp(QWidget):
     def __init__(self):
@@ -33,7 +87,7 @@ class EmotionApp(QWidget):
         self.textbox.setStyleSheet("background-color: #3B4252; color: white; border-radius: 5px; padding: 5px;")
 
         
-        self.voice_button = QPushButton("Detect Emotion (Voice) 🎙️", self)
+        self.voice_button = QPushButton(VOICE_BUTTON_TEXT, self)
 
         self.voice_button.setStyleSheet(self.button_style())
 
@@ -86,10 +140,25 @@ class EmotionApp(QWidget):
         layout.addWidget(self.answer_result_label)
 
         self.setLayout(layout)
+        self.stats_overlay = attach_overlay(self)
 
         self.questions = []  
         self.current_index = 0  
         self.score = 0  
+        self.voice_worker = None
+        self.text_worker = None
+        self.adaptive = AdaptiveDifficulty()
+        self.question_pool = None
+        self.signal_difficulty = "Medium"
+        self.detected_emotion = None
+        self.session = None
+        self.question_shown_at = None
+        self.voice_source = None
+        self.listen_worker = None
+        # Kept for the whole session so the noise floor is only measured once
+        self.voice_activity = None
+        self.pending_utterance = None
+        self.voice_emotion_mode = voice_emotion_mode()
 
     def button_style(self):
         return """
@@ -105,38 +174,120 @@ class EmotionApp(QWidget):
             }
         """
 
-    def detect_emotion(self):
+    def detect_emotion(self, acoustic=None):
+        # acoustic is the tone of the same utterance, fused with the text result.
+        # A newer utterance supersedes this worker; its late result is dropped.
         text = self.textbox.text().strip()
         if text:
-            result = emotion_classifier(text)
-            emotion = result[0]['label']
-            self.result_label.setText(f"Detected Emotion: {emotion}")
-            self.suggest_quiz(emotion)
+            self.result_label.setText("Detecting emotion...")
+            worker = self.text_worker = TaskWorker(classify_text, text, parent=self)
+            worker.result.connect(
+                lambda result: self.on_text_classified(result, acoustic) if worker is self.text_worker else None
+            )
+            worker.error.connect(
+                lambda e: self.result_label.setText(f"⚠️ Error: {str(e)}") if worker is self.text_worker else None
+            )
+            worker.finished.connect(worker.deleteLater)
+            worker.start()
         else:
             self.result_label.setText("⚠️ Please enter some text.")
 
+    def on_text_classified(self, result, acoustic=None):
+        if acoustic is not None:
+            result = fuse_emotions(result, acoustic)
+        emotion = result[0]['label']
+        self.result_label.setText(f"Detected Emotion: {emotion}")
+        self.suggest_quiz(emotion)
+
     def detect_emotion_voice(self):
-        recognizer = sr.Recognizer()
-        self.result_label.setText("🎙️ Listening... Please speak.")
-
-        try:
-            with sr.Microphone() as source:
-                recognizer.adjust_for_ambient_noise(source, duration=1)
-                print("speak now..")
-                
-                audio = recognizer.listen(source, timeout=5)
-                text = recognizer.recognize_google(audio)
-
-                self.textbox.setText(text)
-                self.detect_emotion()
-        except sr.UnknownValueError:
+        # Toggles continuous listening: one open stream, each utterance
+        # transcribed as soon as the voice activity detector hears it end
+        if self.listen_worker is not None and self.listen_worker.isRunning():
+            self.voice_source.stop()
+            return
+        self.voice_source = open_voice_source()
+        if self.voice_activity is None or self.voice_activity.sample_rate != self.voice_source.sample_rate:
+            self.voice_activity = VoiceActivityDetector(self.voice_source.sample_rate)
+        self.voice_activity.reset()
+        if self.voice_activity.calibrated:
+            self.result_label.setText("🎙️ Listening... Speak any time.")
+        else:
+            self.result_label.setText("🎙️ Listening... (measuring background noise)")
+        self.voice_button.setText(STOP_LISTENING_TEXT)
+
+        self.listen_worker = StreamWorker(
+            classify_utterances, self.voice_source, self.voice_activity,
+            acoustic=self.voice_emotion_mode != "text",
+        )
+        self.listen_worker.item.connect(self.on_utterance)
+        self.listen_worker.error.connect(self.on_voice_error)
+        self.listen_worker.finished.connect(lambda: self.voice_button.setText(VOICE_BUTTON_TEXT))
+        self.listen_worker.start()
+
+    def on_utterance(self, item):
+        samples, acoustic = item
+        if acoustic is not None:
+            self.result_label.setText(f"Tone of Voice: {acoustic[0]['label']}")
+            if self.voice_emotion_mode == "acoustic":
+                self.suggest_quiz(acoustic[0]['label'])
+                return
+        # An utterance ending mid-transcription waits; only the newest one is kept
+        utterance = UtteranceSource(samples, self.voice_activity.sample_rate)
+        if self.voice_worker is not None and self.voice_worker.isRunning():
+            self.pending_utterance = (utterance, acoustic)
+            return
+        self.transcribe_utterance(utterance, acoustic)
+
+    def transcribe_utterance(self, utterance, acoustic=None):
+        if acoustic is None:
+            self.result_label.setText("📝 Transcribing...")
+        self.voice_worker = TaskWorker(
+            speech_recognizer.transcribe, utterance, progress_arg="on_partial", single_utterance=False
+        )
+        self.voice_worker.progress.connect(self.on_voice_partial)
+        self.voice_worker.result.connect(lambda text: self.on_voice_transcribed(text, acoustic))
+        self.voice_worker.error.connect(self.on_voice_error)
+        self.voice_worker.finished.connect(self.on_transcription_finished)
+        self.voice_worker.start()
+
+    def on_transcription_finished(self):
+        if self.pending_utterance is not None:
+            (utterance, acoustic), self.pending_utterance = self.pending_utterance, None
+            self.transcribe_utterance(utterance, acoustic)
+
+    def on_voice_partial(self, text):
+        self.textbox.setText(text)
+
+    def on_voice_transcribed(self, text, acoustic=None):
+        self.textbox.setText(text)
+        self.detect_emotion(acoustic)
+
+    def on_voice_error(self, error):
+        if isinstance(error, sr.UnknownValueError):
             self.result_label.setText("⚠️ Could not understand audio.")
-        except sr.RequestError:
+        elif isinstance(error, sr.RequestError):
             self.result_label.setText("⚠️ Internet connection required.")
-        except Exception as e:
-            self.result_label.setText(f"⚠️ Error: {str(e)}")
+        else:
+            self.result_label.setText(f"⚠️ Error: {str(error)}")
+
+    def closeEvent(self, event):
+        if self.listen_worker is not None and self.listen_worker.isRunning():
+            self.voice_source.stop()
+            self.listen_worker.wait()
+        self.pending_utterance = None
+        if self.voice_worker is not None and self.voice_worker.isRunning():
+            self.voice_worker.wait()
+        for worker in self.findChildren(TaskWorker):
+            worker.wait()
+        super().closeEvent(event)
+
+    @property
+    def quiz_running(self):
+        return 0 < len(self.questions) and self.current_index < len(self.questions)
 
     def suggest_quiz(self, emotion):
+        # Picks the starting difficulty; once a quiz runs, later emotions only
+        # steer the next questions through the adaptive difficulty
         quiz_difficulty = {
             "joy": "Hard 💪",  
             "surprise": "Hard 💪",  
@@ -148,42 +299,63 @@ class EmotionApp(QWidget):
         }
 
         difficulty = quiz_difficulty.get(emotion.lower(), "Medium ⚖️")
+        self.signal_difficulty = difficulty.split()[0]
+        self.detected_emotion = emotion.lower()
+        if self.quiz_running:
+            self.quiz_label.setText(f"🎯 Next questions lean {difficulty}")
+            return
         self.quiz_label.setText(f"🎯 Recommended Quiz Difficulty: {difficulty}")
-
-        self.questions = self.get_random_questions(difficulty.split()[0])
+        self.questions = self.get_random_questions(self.signal_difficulty)
         self.current_index = 0  
         self.score = 0  
 
         if self.questions:
+            self.session = results_store.start_session("speech")
             self.display_question()
         else:
             self.question_label.setText("⚠️ No questions available for this difficulty.")
 
     def get_random_questions(self, difficulty):
-        filtered_df = df[df['Difficulty'].str.lower() == difficulty.lower()]
-        if not filtered_df.empty:
-            return filtered_df.sample(min(10, len(filtered_df))).to_dict(orient="records")
-        return []
+        self.question_pool = QuestionPool(question_bank.get())
+        return self.question_pool.draw_many(difficulty, 10)
+
+    def adapt_difficulty(self, correct):
+        # Rate the answer, then pick the next question for the new ability and the detected emotion
+        answered = self.questions[self.current_index - 1]
+        self.adaptive.record_answer(None, answered["Difficulty"], correct)
+        if self.current_index >= len(self.questions):
+            return
+        question = self.question_pool.draw(self.adaptive.next_difficulty(None, self.signal_difficulty))
+        if question is not None:
+            self.questions[self.current_index] = question
 
     def display_question(self):
         if self.current_index < len(self.questions):
             question_data = self.questions[self.current_index]
             self.question_label.setText(f"❓ Question {self.current_index + 1}: {question_data['Question']}")
+            self.question_shown_at = time.monotonic()
         else:
             self.show_final_score()
 
     def check_answer(self):
         if self.current_index < len(self.questions):
+            question = self.questions[self.current_index]
             user_answer = self.answer_input.text().strip()
-            correct_answer = str(self.questions[self.current_index]['Answers']).strip()
+            correct_answer = str(question['Answers']).strip()
 
-            if user_answer.lower() == correct_answer.lower():
+            correct = user_answer.lower() == correct_answer.lower()
+            if correct:
                 self.answer_result_label.setText("✅ Correct!")
                 self.score += 1
             else:
                 self.answer_result_label.setText(f"❌ Incorrect! The correct answer is: {correct_answer}")
+            results_store.record_answer(
+                self.session, "speech", question["Question"], question["Difficulty"], correct,
+                latency=time.monotonic() - self.question_shown_at, signal=self.detected_emotion,
+            )
 
             self.current_index += 1
+            self.adapt_difficulty(correct)
             self.answer_input.clear()
 
             if self.current_index < len(self.questions):
@@ -192,6 +364,7 @@ class EmotionApp(QWidget):
                 self.show_final_score()
 
     def show_final_score(self):
+        results_store.finish_session(self.session, self.score, len(self.questions))
         self.question_label.setText(f"🏆 Quiz Complete! Your Score: {self.score} / {len(self.questions)}")
         self.answer_result_label.setText("🎉 Great Job!")
 
@@ -199,4 +372,11 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = EmotionApp()
     window.show()
+    QTimer.singleShot(0, startup.window_shown)
+    metrics.start_exporters()
+    if not remote_models.available:
+        QTimer.singleShot(0, text_emotion_service.prefetch)
+    QTimer.singleShot(0, question_bank.prefetch)
+    QTimer.singleShot(0, speech_recognizer.prefetch)
+    QTimer.singleShot(0, acoustic_emotion_engine.prefetch)
     sys.exit(app.exec())
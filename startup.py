@@ -0,0 +1,101 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Pass --profile-startup to any quiz app to print import and model-load times,
+# and --no-prefetch to keep models from loading in the background after the
+# window is shown.
+PROFILE = "--profile-startup" in sys.argv
+PREFETCH = "--no-prefetch" not in sys.argv
+
+_start_time = time.perf_counter()
+_timings = []
+_timings_lock = threading.Lock()
+_window_shown = False
+_import_state = threading.local()
+_original_import = builtins.__import__
+
+
+def record(name, seconds):
+    with _timings_lock:
+        _timings.append((name, seconds))
+    if _window_shown:
+        print(f"[startup] {name}: {seconds:.3f}s (after window shown)", flush=True)
+
+
+@contextmanager
+def timed(name):
+    if not PROFILE:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def _profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only time top-level imports; nested ones are included in their parent
+    if level or getattr(_import_state, "active", False) or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    _import_state.active = True
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _import_state.active = False
+        record(f"import {name}", time.perf_counter() - start)
+
+
+def window_shown():
+    global _window_shown
+    if not PROFILE or _window_shown:
+        return
+    _window_shown = True
+    with _timings_lock:
+        timings = sorted(_timings, key=lambda item: item[1], reverse=True)
+    print(f"[startup] time to first window: {time.perf_counter() - _start_time:.3f}s", flush=True)
+    for name, seconds in timings:
+        print(f"[startup]   {name}: {seconds:.3f}s", flush=True)
+
+
+if PROFILE:
+    builtins.__import__ = _profiled_import
+
+
+class LazyResource:
+    """Loads an expensive object on first use, at most once, from any thread."""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    with timed(f"load {self.name}"):
+                        self._value = self.loader()
+                    self._loaded = True
+        return self._value
+
+    def prefetch(self):
+        if not PREFETCH or self._loaded:
+            return
+        threading.Thread(target=self._prefetch, daemon=True).start()
+
+    def _prefetch(self):
+        try:
+            self.get()
+        except Exception as e:
+            print(f"Failed to prefetch {self.name}: {e}", flush=True)
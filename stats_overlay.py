@@ -0,0 +1,36 @@
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QLabel
+import metrics
+
+
+class StatsOverlay(QLabel):
+    """Live p50/p95 per stage, drawn over the top-right corner of a window."""
+
+    def __init__(self, parent, interval_ms=1000):
+        super().__init__(parent)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: #9CCC65; font-family: monospace; "
+            "font-size: 11px; padding: 4px;"
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(interval_ms)
+        self.refresh()
+
+    def refresh(self):
+        lines = []
+        for name, hist in sorted(metrics.histograms().items()):
+            p50, p95 = hist.quantile(0.5), hist.quantile(0.95)
+            if p50 is not None:
+                lines.append(f"{name:<20} p50 {p50 * 1000:7.1f}ms  p95 {p95 * 1000:7.1f}ms  n={hist.count}")
+        self.setText("\n".join(lines) or "no stage timings yet")
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(max(0, parent.width() - self.width() - 8), 8)
+        self.raise_()
+
+
+def attach_overlay(window):
+    # Only windows started with --metrics get the overlay
+    return StatsOverlay(window) if metrics.ENABLED else None
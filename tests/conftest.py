@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The apps are plain top-level modules, so make the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,74 @@
+import wave
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from acoustic_emotion import (
+    FEATURE_NAMES, SAMPLE_RATE, AcousticEmotionEngine, AcousticEmotionModel, frame_features,
+    fuse_emotions, utterance_features,
+)
+
+
+def voice(f0, amplitude, seconds=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = f0 * (1 + 0.05 * rng.standard_normal())
+    signal = amplitude * (np.sin(2 * np.pi * f0 * t) + 0.3 * np.sin(4 * np.pi * f0 * t))
+    return (signal + rng.normal(0, 200, len(t))).astype(np.int16)
+
+
+def trained_model():
+    features = [utterance_features(voice(120, 3000, seed=i)) for i in range(15)]
+    features += [utterance_features(voice(300, 12000, seed=100 + i)) for i in range(15)]
+    return AcousticEmotionModel.fit(np.array(features), ["sadness"] * 15 + ["joy"] * 15)
+
+
+def test_pitch_of_a_pure_tone():
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    _, pitch, voiced = frame_features((8000 * np.sin(2 * np.pi * 200 * t)).astype(np.int16))
+    assert voiced.mean() > 0.9
+    assert abs(np.median(pitch[voiced]) - 200) < 5
+
+
+def test_silence_and_short_clips_give_finite_features():
+    for samples in (np.zeros(SAMPLE_RATE, dtype=np.int16), np.zeros(100, dtype=np.int16)):
+        features = utterance_features(samples)
+        assert features.shape == (len(FEATURE_NAMES),)
+        assert np.isfinite(features).all()
+
+
+def test_engine_separates_tones_and_loads_saved_model(tmp_path):
+    path = tmp_path / "model.npz"
+    trained_model().save(path)
+    engine = AcousticEmotionEngine(str(path))
+    assert engine.available
+    result = engine.classify(voice(310, 11000, seed=999))
+    assert result[0]["label"] == "joy"
+    assert abs(sum(r["score"] for r in result) - 1.0) < 1e-6
+    assert engine.classify(voice(115, 2500, seed=998))[0]["label"] == "sadness"
+
+
+def test_classify_wav_mixes_stereo_down(tmp_path):
+    path = tmp_path / "model.npz"
+    trained_model().save(path)
+    mono = voice(300, 12000, seed=7)
+    wav_path = tmp_path / "clip.wav"
+    with wave.open(str(wav_path), "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(np.repeat(mono, 2).tobytes())
+    assert AcousticEmotionEngine(str(path)).classify_wav(str(wav_path))[0]["label"] == "joy"
+
+
+def test_missing_model_is_unavailable(tmp_path):
+    assert not AcousticEmotionEngine(str(tmp_path / "missing.npz")).available
+
+
+def test_fusion_weights_text_and_spreads_unscored_labels():
+    text = [{"label": "joy", "score": 0.9}]
+    acoustic = [{"label": "sadness", "score": 0.7}, {"label": "joy", "score": 0.3}]
+    fused = {r["label"]: r["score"] for r in fuse_emotions(text, acoustic, text_weight=0.5)}
+    assert fused["joy"] == pytest.approx(0.6)
+    assert fused["sadness"] == pytest.approx(0.5 * 0.1 + 0.5 * 0.7)
+    assert fuse_emotions(text, acoustic, text_weight=0.2)[0]["label"] == "sadness"
@@ -0,0 +1,55 @@
+import pytest
+
+from adaptive_difficulty import AdaptiveDifficulty, QuestionPool, StudentAbility, success_probability
+
+
+class FakeSource:
+    def __init__(self, per_tier=30):
+        self.per_tier = per_tier
+        self.calls = 0
+
+    def sample(self, difficulty, k=10):
+        self.calls += 1
+        return [
+            {"Question": f"{difficulty} {i}", "Difficulty": difficulty, "Answers": str(i)}
+            for i in range(min(k, self.per_tier))
+        ]
+
+
+def test_elo_update_moves_ability_towards_the_answers():
+    ability = StudentAbility()
+    expected = ability.update(0.0, True)
+    assert expected == pytest.approx(0.5)
+    assert ability.rating > 0
+    first_step = ability.rating
+    ability.update(0.0, False)
+    assert ability.rating < first_step
+    assert ability.k < StudentAbility().k
+    assert success_probability(1.0, 0.0) > 0.5 > success_probability(0.0, 1.0)
+
+
+def test_signal_picks_the_first_tier_and_fades_with_answers():
+    engine = AdaptiveDifficulty()
+    for tier in ("Easy", "Medium", "Hard"):
+        assert engine.next_difficulty("new", tier) == tier
+    for _ in range(12):
+        engine.record_answer("ann", "Hard", True)
+    assert engine.signal_weight("ann") == pytest.approx(0.3)
+    # A strong answer record overrides a frustrated-looking student
+    assert engine.next_difficulty("ann", "Easy") == "Hard"
+    for _ in range(12):
+        engine.record_answer("bob", "Easy", False)
+    assert engine.next_difficulty("bob", "Hard") == "Easy"
+    assert engine.ability("ann").correct == 12 and engine.ability("bob").answered == 12
+
+
+def test_pool_draws_without_repeats_and_refills_lazily():
+    source = FakeSource(per_tier=5)
+    pool = QuestionPool(source, batch=3)
+    drawn = pool.draw_many("Easy", 10)
+    # FakeSource returns the same first items on every refill, so only 3 are new
+    assert [q["Question"] for q in drawn] == ["Easy 0", "Easy 1", "Easy 2"]
+    assert pool.draw("Hard")["Difficulty"] == "Hard"
+    calls = source.calls
+    pool.draw("Hard")
+    assert source.calls == calls
@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+import benchmark
+from benchmark import StageTimer, compare
+
+
+def test_stage_timer_reports_percentiles_and_disables_failing_stages():
+    timer = StageTimer()
+    for _ in range(10):
+        assert timer.run("ok", lambda x: x + 1, 1) == (True, 2)
+
+    def broken():
+        raise RuntimeError("no model")
+
+    assert timer.run("broken", broken) == (False, None)
+    assert timer.run("broken", lambda: 1) == (False, None)
+    summary = timer.summary()
+    assert summary["ok"]["count"] == 10
+    assert summary["ok"]["p50_ms"] <= summary["ok"]["p95_ms"] <= summary["ok"]["p99_ms"]
+    assert "broken" not in summary
+    assert timer.skipped == {"broken": "RuntimeError: no model"}
+
+
+def test_compare_flags_throughput_and_latency_regressions():
+    baseline = {"face": {"units_per_sec": 100.0, "stages": {"faces": {"p95_ms": 10.0}}}}
+    fast = {"face": {"units_per_sec": 95.0, "stages": {"faces": {"p95_ms": 11.0}}}}
+    slow = {"face": {"units_per_sec": 50.0, "stages": {"faces": {"p95_ms": 20.0}}}}
+    assert compare(fast, baseline) == []
+    assert len(compare(slow, baseline)) == 2
+    assert compare(slow, {}) == []
+
+
+def test_compare_flags_baseline_stages_that_are_skipped_or_missing():
+    baseline = {
+        "face": {"units_per_sec": 100.0, "stages": {"faces": {"p95_ms": 10.0}, "emotion": {"p95_ms": 5.0}}},
+        "eye": {"units_per_sec": 50.0, "stages": {}},
+    }
+    skipped = {"face": {"units_per_sec": 100.0, "stages": {"faces": {"p95_ms": 10.0}},
+                        "skipped": {"emotion": "FileNotFoundError: no model"}}}
+    regressions = compare(skipped, baseline)
+    assert len(regressions) == 2
+    assert any("face.emotion" in r and "no model" in r for r in regressions)
+    assert any(r.startswith("eye:") for r in regressions)
+    missing = {"face": {"units_per_sec": 100.0, "stages": {"faces": {"p95_ms": 10.0}}, "skipped": {}},
+               "eye": {"units_per_sec": 50.0, "stages": {}}}
+    assert compare(missing, baseline) == ["face.emotion: measured in the baseline but not run"]
+
+
+def test_pipeline_runs_headless_on_an_image_folder(tmp_path, monkeypatch):
+    for i in range(3):
+        cv2.imwrite(str(tmp_path / f"{i}.png"), np.zeros((32, 32), dtype=np.uint8))
+
+    def counting_pipeline(video, audio, timer, max_frames):
+        return sum(1 for _ in benchmark.frames(video, timer, max_frames))
+
+    monkeypatch.setitem(benchmark.PIPELINES, "count", counting_pipeline)
+    result = benchmark.run_pipeline("count", video=str(tmp_path), max_frames=2)
+    assert result["units"] == 2
+    assert result["stages"]["decode"]["count"] == 2
+    assert result["units_per_sec"] > 0
@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from emotion_engine import EMOTION_LABELS, INPUT_SIZE, EmotionEngine, dominant_emotion
+
+
+class FakeModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, batch, training=False):
+        self.batch_sizes.append(len(batch))
+        # Score each crop by its mean brightness so outputs are distinguishable
+        scores = np.ones((len(batch), len(EMOTION_LABELS)), dtype=np.float32)
+        scores[:, 3] += batch.mean(axis=(1, 2, 3)) * 10
+        return scores
+
+
+def make_engine(batch_size=64):
+    engine = EmotionEngine(batch_size=batch_size)
+    model = FakeModel()
+    engine._model.loader = lambda: model
+    return engine, model
+
+
+def test_preprocess_resizes_color_and_gray_crops_into_one_batch():
+    engine, _ = make_engine()
+    crops = [
+        np.full((120, 90, 3), 255, dtype=np.uint8),
+        np.zeros((30, 30), dtype=np.uint8),
+    ]
+    batch = engine.preprocess(crops)
+    assert batch.shape == (2, INPUT_SIZE, INPUT_SIZE, 1)
+    assert batch.dtype == np.float32
+    assert np.allclose(batch[0], 1.0)
+    assert np.allclose(batch[1], 0.0)
+
+
+def test_predict_proba_splits_into_batches_and_normalizes():
+    engine, model = make_engine(batch_size=2)
+    crops = [np.full((50, 50), v, dtype=np.uint8) for v in (0, 128, 255, 64, 32)]
+    probs = engine.predict_proba(crops)
+    assert model.batch_sizes == [2, 2, 1]
+    assert probs.shape == (5, len(EMOTION_LABELS))
+    assert np.allclose(probs.sum(axis=1), 1.0)
+    assert probs[2, 3] > probs[0, 3]
+
+
+def test_predict_proba_handles_no_crops_without_loading_the_model():
+    engine, model = make_engine()
+    assert engine.predict_proba([]).shape == (0, len(EMOTION_LABELS))
+    assert model.batch_sizes == []
+
+
+def test_analyze_returns_percentage_distributions():
+    engine, _ = make_engine()
+    [result] = engine.analyze([np.full((48, 48), 255, dtype=np.uint8)])
+    assert result["dominant_emotion"] == "happy"
+    assert set(result["emotion"]) == set(EMOTION_LABELS)
+    assert sum(result["emotion"].values()) == pytest.approx(100.0)
+
+
+def test_dominant_emotion_averages_distributions():
+    probs = np.zeros((3, len(EMOTION_LABELS)))
+    probs[0, EMOTION_LABELS.index("sad")] = 1.0
+    probs[1, EMOTION_LABELS.index("happy")] = 0.6
+    probs[1, EMOTION_LABELS.index("sad")] = 0.4
+    probs[2, EMOTION_LABELS.index("happy")] = 0.7
+    probs[2, EMOTION_LABELS.index("sad")] = 0.3
+    assert dominant_emotion(probs) == "sad"
+    assert dominant_emotion([]) == "neutral"
+    assert dominant_emotion([], default="fear") == "fear"
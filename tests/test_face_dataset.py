@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from face_dataset import PackedFaceDataset, export_folder, pack_folder
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    root = tmp_path / "dataset"
+    for person, value, count in (("bob", 200, 2), ("alice", 100, 3)):
+        (root / person).mkdir(parents=True)
+        for i in range(count):
+            cv2.imwrite(str(root / person / f"{i}.png"), np.full((40 + i, 30), value, dtype=np.uint8))
+    cv2.imwrite(str(root / "loose.png"), np.full((20, 20), 50, dtype=np.uint8))
+    (root / "bob" / "broken.jpg").write_bytes(b"not an image")
+    return root
+
+
+def test_pack_groups_people_into_memory_mapped_slices(dataset, tmp_path):
+    pack = str(tmp_path / "pack")
+    assert pack_folder(str(dataset), pack, size=32, workers=0) == 5
+    packed = PackedFaceDataset.open(pack)
+    assert packed.images.shape == (5, 32, 32)
+    assert isinstance(packed.images, np.memmap)
+    assert packed.names == ["alice", "bob"]
+    assert packed.labels.tolist() == [0, 0, 0, 1, 1]
+    bob = packed.person("bob")
+    assert np.shares_memory(bob, packed.images)
+    assert (np.asarray(bob) == 200).all()
+    assert packed.person_files("bob") == ["bob/0.png", "bob/1.png"]
+
+
+def test_loose_images_get_their_own_label_and_export_round_trips(dataset, tmp_path):
+    pack = str(tmp_path / "pack")
+    assert pack_folder(str(dataset), pack, size=32, loose_label="unsorted", workers=0) == 6
+    out = tmp_path / "exported"
+    assert export_folder(pack, str(out)) == 6
+    assert (out / "loose.png").exists()
+    assert pack_folder(str(out), str(tmp_path / "again"), size=32, loose_label="unsorted", workers=0) == 6
+    again = PackedFaceDataset.open(str(tmp_path / "again"))
+    assert np.array_equal(np.asarray(again.images), np.asarray(PackedFaceDataset.open(pack).images))
+
+
+def test_packed_training_is_incremental(dataset, tmp_path):
+    if not hasattr(cv2, "face"):
+        pytest.skip("opencv-contrib-python is not installed")
+    from face_training import FaceTrainer
+
+    pack = str(tmp_path / "pack")
+    pack_folder(str(dataset), pack, size=32, workers=0)
+    trainer = FaceTrainer(str(tmp_path / "model.yml"), str(tmp_path / "labels.pkl"))
+    assert trainer.train_packed(PackedFaceDataset.open(pack)) == 5
+    assert trainer.train_packed(PackedFaceDataset.open(pack)) == 0
+    assert trainer.labels == {"alice": 0, "bob": 1}
@@ -0,0 +1,78 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from face_identity import FaceIndex, fit_calibration, lbp_histograms
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset")
+
+
+def make_people(count, samples=6, seed=0):
+    rng = np.random.default_rng(seed)
+    images, labels = [], []
+    for label in range(count):
+        base = rng.integers(0, 255, (100, 100)).astype(np.int16)
+        for _ in range(samples):
+            noise = rng.integers(-6, 7, base.shape)
+            images.append(np.clip(base + noise, 0, 255).astype(np.uint8))
+            labels.append(label)
+    return np.stack(images), np.array(labels)
+
+
+def test_lbp_histograms_count_every_pixel_once():
+    hist = lbp_histograms([np.zeros((50, 80), dtype=np.uint8)], size=100, grid=7)
+    assert hist.shape == (1, 7 * 7 * 59)
+    assert hist.sum() == 98 * 98
+
+
+def test_identifies_enrolled_people():
+    images, labels = make_people(5)
+    names = [f"student{i}" for i in range(5)]
+    index = FaceIndex.build(images, labels, names, embedding_size=16)
+    matches = index.identify(list(images[::6]))
+    assert [name for name, _ in matches] == names
+    assert all(p > 0.5 for _, p in matches)
+
+
+@pytest.mark.skipif(not os.path.isdir(DATASET), reason="needs the face dataset")
+def test_rejects_a_person_left_out_of_the_index(tmp_path):
+    from face_dataset import PackedFaceDataset, pack_folder
+
+    pack_folder(DATASET, str(tmp_path / "pack"))
+    dataset = PackedFaceDataset.open(str(tmp_path / "pack"))
+    stranger = dataset.names.index("Mayank")
+    images, labels = np.asarray(dataset.images), np.asarray(dataset.labels)
+    enrolled = labels != stranger
+    names = [name for name in dataset.names if name != "Mayank"]
+    index = FaceIndex.build(images[enrolled], np.where(labels > stranger, labels - 1, labels)[enrolled], names)
+
+    rejected = [name == "Unknown" for name, _ in index.identify(list(images[~enrolled]))]
+    assert np.mean(rejected) > 0.9
+    noise = np.random.default_rng(1).integers(0, 255, (100, 100)).astype(np.uint8)
+    assert index.identify([noise])[0][0] == "Unknown"
+    accepted = [name in names for name, _ in index.identify(list(images[enrolled][::10]))]
+    assert np.mean(accepted) > 0.8
+
+
+def test_partitioned_search_matches_brute_force(tmp_path):
+    images, labels = make_people(12, samples=3)
+    index = FaceIndex.build(images, labels, [str(i) for i in range(12)], embedding_size=16)
+    expected = index.identify(list(images))
+    index.partition(4)
+    index.nprobe = 4
+    assert index.identify(list(images)) == expected
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = FaceIndex.load(path)
+    assert loaded.names == index.names
+    assert [len(ids) for ids in loaded.lists] == [len(ids) for ids in index.lists]
+    assert loaded.identify(list(images)) == expected
+
+
+def test_calibration_separates_genuine_from_impostor_scores():
+    a, b = fit_calibration(np.array([0.8, 0.9, 0.85]), np.array([0.1, 0.2, 0.3]))
+    assert a > 0
+    assert 1 / (1 + np.exp(-(a * 0.9 + b))) > 0.9
+    assert 1 / (1 + np.exp(-(a * 0.1 + b))) < 0.1
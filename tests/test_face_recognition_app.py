@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("PyQt6.QtWidgets")
+
+import face_recognition_app
+
+
+def test_emotion_analyzer_batches_crops_across_frames(monkeypatch):
+    seen = []
+
+    def predict(crops):
+        seen.append(len(crops))
+        probs = np.zeros((len(crops), 7))
+        probs[:, 3] = 1.0
+        return probs
+
+    crop = np.zeros((20, 20), dtype=np.uint8)
+    crops_per_frame = iter([[crop], [], [crop, crop]])
+    monkeypatch.setattr(face_recognition_app, "predict_emotion_proba", predict)
+    monkeypatch.setattr(face_recognition_app, "identify_student", lambda crops: f"{len(crops)} crops")
+    monkeypatch.setattr(face_recognition_app, "make_crop_extractor", lambda: lambda frame: next(crops_per_frame))
+    analyze = face_recognition_app.make_emotion_analyzer(batch_frames=3)
+    assert analyze(None) == (None, None)
+    assert analyze(None) == (None, None)
+    probs, student = analyze(None)
+    assert seen == [3]
+    assert student == "3 crops"
+    assert face_recognition_app.EMOTION_LABELS[int(probs.argmax())] == "happy"
+
+
+def test_estimate_emotion_is_none_on_model_errors(monkeypatch):
+    def predict(crops):
+        raise RuntimeError("model failed to load")
+
+    monkeypatch.setattr(face_recognition_app, "predict_emotion_proba", predict)
+    crop = np.zeros((20, 20), dtype=np.uint8)
+    assert face_recognition_app.estimate_emotion([crop]) is None
+    assert face_recognition_app.estimate_emotion([]) is None
+
+
+def test_identify_student_picks_the_most_confident_crop(monkeypatch):
+    class Index:
+        def identify(self, crops):
+            return [("Unknown", 0.2), ("alice", 0.9), ("bob", 0.6)]
+
+    monkeypatch.setattr(face_recognition_app.face_index, "get", lambda: Index())
+    assert face_recognition_app.identify_student([1, 2, 3]) == "alice"
+    assert face_recognition_app.identify_student([]) is None
+    monkeypatch.setattr(face_recognition_app.face_index, "get", lambda: None)
+    assert face_recognition_app.identify_student([1]) is None
@@ -0,0 +1,109 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from face_tracking import FaceTracker, clip_box, create_cv_tracker, landmark_boxes
+
+FRAME = np.zeros((100, 200, 3), dtype=np.uint8)
+
+
+class CountingDetector:
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.calls = 0
+
+    def __call__(self, image):
+        self.calls += 1
+        return self.boxes
+
+
+class ShiftingTracker:
+    # Moves its box 1px right per frame, and loses it when told to
+    lose = False
+
+    def init(self, frame, box):
+        self.box = box
+
+    def update(self, frame):
+        if ShiftingTracker.lose:
+            return False, None
+        x, y, w, h = self.box
+        self.box = (x + 1, y, w, h)
+        return True, self.box
+
+
+@pytest.fixture(autouse=True)
+def reset_tracker():
+    ShiftingTracker.lose = False
+
+
+def test_detects_every_n_frames_and_tracks_in_between():
+    detect = CountingDetector([(10, 10, 20, 20)])
+    tracker = FaceTracker(detect, redetect_every=3, tracker_factory=ShiftingTracker)
+    results = [tracker.update(FRAME) for _ in range(6)]
+    assert detect.calls == 2
+    assert results[0] == [(10, 10, 20, 20)]
+    assert results[1] == [(11, 10, 20, 20)]
+    assert results[2] == [(12, 10, 20, 20)]
+    assert results[3] == [(10, 10, 20, 20)]
+
+
+def test_lost_track_triggers_immediate_redetection():
+    detect = CountingDetector([(10, 10, 20, 20)])
+    tracker = FaceTracker(detect, redetect_every=100, tracker_factory=ShiftingTracker)
+    tracker.update(FRAME)
+    ShiftingTracker.lose = True
+    assert tracker.update(FRAME) == [(10, 10, 20, 20)]
+    assert detect.calls == 2
+
+
+def test_keeps_detecting_while_no_face_is_found():
+    detect = CountingDetector([])
+    tracker = FaceTracker(detect, redetect_every=10, tracker_factory=ShiftingTracker)
+    for _ in range(3):
+        assert tracker.update(FRAME) == []
+    assert detect.calls == 3
+
+
+def test_detector_runs_on_the_detect_image():
+    seen = []
+    tracker = FaceTracker(lambda image: seen.append(image.ndim) or [], tracker_factory=None)
+    tracker.update(FRAME, FRAME[:, :, 0])
+    assert seen == [2]
+
+
+def test_refine_replaces_boxes_without_tracker():
+    detect = CountingDetector([(10, 10, 20, 20)])
+    tracker = FaceTracker(detect, redetect_every=5, tracker_factory=None)
+    tracker.update(FRAME)
+    tracker.refine([(-5, 12, 30, 30)])
+    assert tracker.update(FRAME) == [(0, 12, 25, 30)]
+    assert detect.calls == 1
+
+
+def test_landmark_boxes_pad_the_landmark_extent():
+    points = np.zeros((1, 68, 2))
+    points[0, :, 0] = np.linspace(100, 140, 68)
+    points[0, :, 1] = np.linspace(50, 90, 68)
+    assert landmark_boxes(points, margin=0.25) == [(90, 40, 60, 60)]
+    assert landmark_boxes(np.empty((0, 68, 2))) == []
+
+
+def test_clip_box_limits_to_frame_and_drops_empty_boxes():
+    assert clip_box((-10, 90, 50, 50), (100, 200)) == (0, 90, 40, 10)
+    assert clip_box((300, 10, 20, 20), (100, 200)) is None
+
+
+def test_opencv_tracker_follows_a_moving_square():
+    frames = []
+    for shift in range(0, 12, 2):
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        frame[40:80, 30 + shift:70 + shift] = 255
+        frames.append(frame)
+    tracker = FaceTracker(lambda image: [(28, 38, 44, 44)], redetect_every=100, tracker_factory=create_cv_tracker)
+    for frame in frames:
+        boxes = tracker.update(frame)
+    assert tracker.detections == 1
+    assert len(boxes) == 1
+    assert boxes[0][0] > 28
@@ -0,0 +1,95 @@
+import os
+import pickle
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+if not hasattr(cv2, "face"):
+    pytest.skip("opencv-contrib-python is not installed", allow_module_level=True)
+
+import face_training
+from face_training import FaceTrainer, load_images
+
+
+def add_person(dataset, name, seed, count=3, start=1):
+    rng = np.random.default_rng(seed)
+    folder = dataset / name
+    folder.mkdir(parents=True, exist_ok=True)
+    base = rng.integers(0, 255, (60, 60), dtype=np.uint8)
+    for i in range(start, start + count):
+        noise = rng.integers(0, 8, base.shape, dtype=np.uint8)
+        cv2.imwrite(str(folder / f"{i}.png"), base + noise)
+    return base
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "dataset", str(tmp_path / "face_model.yml"), str(tmp_path / "labels.pkl")
+
+
+def test_incremental_training_only_decodes_new_images(paths, monkeypatch):
+    dataset, model_path, labels_path = paths
+    alice = add_person(dataset, "alice", 0)
+    trainer = FaceTrainer(model_path, labels_path, workers=0)
+    assert trainer.train(str(dataset), full=True) == 3
+    trainer.save()
+
+    bob = add_person(dataset, "bob", 1)
+    decoded = []
+    real_load = face_training.load_images
+    monkeypatch.setattr(face_training, "load_images", lambda p, w=None: decoded.extend(p) or real_load(p, w))
+    trainer = FaceTrainer(model_path, labels_path, workers=0)
+    assert trainer.load()
+    assert trainer.train(str(dataset)) == 3
+    assert sorted(os.path.basename(p) for p in decoded) == ["1.png", "2.png", "3.png"]
+    assert all("bob" in p for p in decoded)
+    trainer.save()
+
+    with open(labels_path, "rb") as f:
+        assert pickle.load(f) == {"alice": 0, "bob": 1}
+    reloaded = FaceTrainer(model_path, labels_path)
+    assert reloaded.load()
+    assert reloaded.recognizer.predict(alice)[0] == 0
+    assert reloaded.recognizer.predict(bob)[0] == 1
+
+
+def test_packing_a_folder_trained_model_adds_nothing(paths, tmp_path):
+    from face_dataset import PackedFaceDataset, pack_folder
+
+    dataset, model_path, labels_path = paths
+    add_person(dataset, "alice", 0)
+    trainer = FaceTrainer(model_path, labels_path, workers=0)
+    assert trainer.train(str(dataset), full=True) == 3
+    trainer.save()
+
+    add_person(dataset, "alice", 0, count=1, start=4)
+    pack_folder(str(dataset), str(tmp_path / "pack"), workers=0)
+    trainer = FaceTrainer(model_path, labels_path, workers=0)
+    assert trainer.load()
+    assert trainer.train_packed(PackedFaceDataset.open(str(tmp_path / "pack"))) == 1
+    assert trainer.trained == {"alice": {"1.png", "2.png", "3.png", "4.png"}}
+    trainer.save()
+    trainer = FaceTrainer(model_path, labels_path, workers=0)
+    assert trainer.load()
+    assert trainer.train(str(dataset)) == 0
+
+
+def test_mismatched_labels_force_a_rebuild(paths):
+    dataset, model_path, labels_path = paths
+    add_person(dataset, "alice", 0)
+    trainer = FaceTrainer(model_path, labels_path, workers=0)
+    trainer.train(str(dataset))
+    trainer.save()
+    with open(labels_path, "wb") as f:
+        pickle.dump({"someone else": 0}, f)
+    assert not FaceTrainer(model_path, labels_path).load()
+
+
+def test_parallel_decode_matches_serial(tmp_path, monkeypatch):
+    add_person(tmp_path, "carol", 2, count=4)
+    files = sorted(str(p) for p in (tmp_path / "carol").iterdir()) + [str(tmp_path / "missing.png")]
+    monkeypatch.setattr(face_training, "MIN_PARALLEL_IMAGES", 1)
+    parallel = load_images(files, workers=2)
+    serial = load_images(files, workers=0)
+    assert parallel[-1] is None and serial[-1] is None
+    assert all(np.array_equal(a, b) for a, b in zip(parallel[:-1], serial[:-1]))
@@ -0,0 +1,89 @@
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from frame_ring import AnalysisError, AnalysisPool, FrameRing
+
+
+def make_mean_analyzer():
+    return lambda frame: float(frame.mean())
+
+
+def make_broken_analyzer():
+    raise RuntimeError("no model here")
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing.create((4, 6, 3), slots=4)
+    yield ring
+    ring.close()
+
+
+def test_ring_keeps_the_newest_frames_and_detects_overwrites(ring):
+    assert ring.latest() == (0, None)
+    for value in range(1, 11):
+        ring.put(np.full((4, 6, 3), value, dtype=np.uint8))
+    seq, frame = ring.latest()
+    assert seq == 10 and (frame == 10).all()
+    assert ring.latest(after=10) == (10, None)
+    assert ring.still_valid(7)
+    assert not ring.still_valid(6)
+    with pytest.raises(ValueError):
+        ring.put(np.zeros((4, 6), dtype=np.uint8))
+
+
+def test_attached_ring_shares_frames_without_copies(ring):
+    other = FrameRing.attach(ring.name)
+    try:
+        assert other.shape == (4, 6, 3) and other.slots == 4
+        seq = ring.put(np.full((4, 6, 3), 9, dtype=np.uint8))
+        assert (other.view(seq) == 9).all()
+        assert other.claim() == seq
+        assert ring.claim() is None
+        assert ring.claims == 1
+    finally:
+        other.close()
+
+
+def test_grayscale_rings_have_two_dimensional_frames():
+    ring = FrameRing.create((5, 7), slots=2)
+    try:
+        ring.put(np.ones((5, 7), dtype=np.uint8))
+        assert ring.latest()[1].shape == (5, 7)
+    finally:
+        ring.close()
+
+
+def wait_for_results(pool, count, timeout=30):
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < count and time.monotonic() < deadline:
+        item = pool.get_result(timeout=0.1)
+        if item is not None:
+            results.append(item)
+    return results
+
+
+def test_analysis_pool_processes_frames_from_shared_memory():
+    pool = AnalysisPool(make_mean_analyzer, (8, 8), processes=2)
+    try:
+        values = {}
+        for value in (10, 20, 30):
+            values[pool.publish(np.full((8, 8), value, dtype=np.uint8))] = value
+            seq, result = wait_for_results(pool, 1)[0]
+            assert result == values[seq]
+        assert pool.idle
+    finally:
+        pool.close()
+
+
+def test_analysis_pool_reports_factory_errors():
+    pool = AnalysisPool(make_broken_analyzer, (8, 8), processes=1)
+    try:
+        (_, error), = wait_for_results(pool, 1)
+        assert isinstance(error, AnalysisError)
+        assert "no model here" in error.message
+    finally:
+        pool.close()
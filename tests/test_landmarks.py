@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from landmarks import (
+    LEFT_EYE_INDICES, RIGHT_EYE_INDICES, average_ear, engagement_levels,
+    eye_aspect_ratios, shape_to_array, shapes_to_array,
+)
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+
+class Shape:
+    # Stand-in for dlib.full_object_detection
+    def __init__(self, points):
+        self._points = [Point(x, y) for x, y in points]
+        self.num_parts = len(self._points)
+
+    def parts(self):
+        return self._points
+
+
+def reference_ear(eye):
+    a = np.linalg.norm(eye[1] - eye[5])
+    b = np.linalg.norm(eye[2] - eye[4])
+    c = np.linalg.norm(eye[0] - eye[3])
+    return (a + b) / (2.0 * c)
+
+
+def random_faces(*shape, seed=0):
+    return np.random.default_rng(seed).integers(0, 200, size=shape + (68, 2))
+
+
+def test_shape_to_array_keeps_point_order():
+    points = random_faces(seed=1)
+    array = shape_to_array(Shape(points))
+    assert array.shape == (68, 2)
+    assert array.dtype == np.int32
+    assert np.array_equal(array, points)
+
+
+def test_shapes_to_array_stacks_faces_and_handles_none():
+    faces = random_faces(3)
+    assert np.array_equal(shapes_to_array([Shape(face) for face in faces]), faces)
+    assert shapes_to_array([]).shape == (0, 68, 2)
+
+
+def test_eye_aspect_ratios_match_per_eye_norms():
+    faces = random_faces(4)
+    ears = eye_aspect_ratios(faces)
+    assert ears.shape == (4, 2)
+    for face, (left, right) in zip(faces, ears):
+        assert left == pytest.approx(reference_ear(face[LEFT_EYE_INDICES].astype(float)), rel=1e-5)
+        assert right == pytest.approx(reference_ear(face[RIGHT_EYE_INDICES].astype(float)), rel=1e-5)
+
+
+def test_ear_keeps_frame_and_face_dimensions():
+    stack = random_faces(5, 3)
+    assert eye_aspect_ratios(stack).shape == (5, 3, 2)
+    assert average_ear(stack).shape == (5, 3)
+    assert average_ear(shapes_to_array([])).shape == (0,)
+
+
+def test_engagement_levels_use_original_thresholds():
+    levels = engagement_levels(np.array([0.1, 0.25, 0.29, 0.3, 0.5]))
+    assert levels.tolist() == [
+        "Drowsy or Low Engagement", "Neutral", "Neutral", "Highly Engaged", "Highly Engaged",
+    ]
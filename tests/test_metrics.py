@@ -0,0 +1,72 @@
+import urllib.request
+import pytest
+
+import metrics
+from metrics import Histogram
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(metrics, "_histograms", {})
+    return metrics
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    hist = Histogram("stage", buckets=(0.01, 0.1, 1.0))
+    assert hist.quantile(0.5) is None
+    for seconds in (0.005, 0.005, 0.05, 0.5):
+        hist.observe(seconds)
+    assert hist.counts == [2, 1, 1, 0]
+    assert hist.quantile(0.5) == pytest.approx(0.01)
+    assert 0.1 < hist.quantile(0.95) <= 1.0
+    assert hist.sum == pytest.approx(0.56)
+
+
+def test_instrument_is_free_when_disabled(registry, monkeypatch):
+    def stage():
+        return 42
+
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    assert metrics.instrument("stage")(stage) is stage
+    with metrics.timed("stage"):
+        pass
+    assert registry.histograms() == {}
+
+
+def test_enabled_stages_are_exported_as_prometheus_text(registry, monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    wrapped = metrics.instrument("detection")(lambda x: x * 2)
+    assert wrapped(2) == 4
+    with metrics.timed("detection"):
+        pass
+    text = metrics.render_prometheus()
+    assert '# TYPE quiz_stage_seconds histogram' in text
+    assert 'quiz_stage_seconds_bucket{stage="detection",le="+Inf"} 2' in text
+    assert 'quiz_stage_seconds_count{stage="detection"} 2' in text
+
+    path = tmp_path / "metrics.prom"
+    metrics.dump(str(path))
+    assert path.read_text() == text
+    server = metrics.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        assert 'stage="detection"' in urllib.request.urlopen(url).read().decode()
+    finally:
+        server.shutdown()
+
+
+def test_overlay_only_attaches_when_enabled(registry, monkeypatch):
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    from stats_overlay import StatsOverlay, attach_overlay
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    window = QtWidgets.QWidget()
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    assert attach_overlay(window) is None
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.histogram("emotion_inference").observe(0.02)
+    overlay = attach_overlay(window)
+    assert isinstance(overlay, StatsOverlay)
+    assert "emotion_inference" in overlay.text()
+    window.deleteLater()
+    app.processEvents()
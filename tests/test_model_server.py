@@ -0,0 +1,61 @@
+import os
+import socket
+import stat
+import time
+import pytest
+
+pytest.importorskip("numpy")
+
+import model_server
+
+
+@pytest.fixture
+def session_env(monkeypatch):
+    monkeypatch.setenv(model_server.ADDRESS_ENV, "")
+    monkeypatch.setenv(model_server.AUTHKEY_ENV, "")
+
+
+def wait_for_server(timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        proxy = model_server.connect()
+        if proxy is not None:
+            return proxy
+        time.sleep(0.1)
+    raise AssertionError("model server did not start")
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets only")
+def test_session_config_uses_private_directory_and_random_key():
+    address, authkey = model_server.new_session_config()
+    other_address, other_authkey = model_server.new_session_config()
+    try:
+        assert stat.S_IMODE(os.stat(os.path.dirname(address)).st_mode) == 0o700
+        assert len(bytes.fromhex(authkey)) == 32
+        assert authkey != other_authkey
+        assert address != other_address
+    finally:
+        os.rmdir(os.path.dirname(address))
+        os.rmdir(os.path.dirname(other_address))
+
+
+def test_connect_without_session_returns_none(session_env):
+    assert model_server.connect() is None
+    assert not model_server.RemoteModels().available
+
+
+def test_remote_models_fall_back_when_server_goes_away(session_env, monkeypatch):
+    process = model_server.start_server()
+    try:
+        remote = model_server.RemoteModels(wait_for_server())
+        assert remote.available
+        assert remote.call("ping", fallback=lambda: False) is True
+
+        # A client holding a different key is rejected
+        monkeypatch.setenv(model_server.AUTHKEY_ENV, os.urandom(32).hex())
+        assert model_server.connect() is None
+    finally:
+        model_server.stop_server(process)
+
+    assert remote.call("ping", fallback=lambda: "local") == "local"
+    assert not remote.available
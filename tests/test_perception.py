@@ -0,0 +1,80 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from face_dataset import CROP_SIZE
+from perception import PerceptionPipeline
+
+FACE = (40, 30, 60, 60)
+
+
+def frame():
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    x, y, w, h = FACE
+    image[y:y+h, x:x+w] = 200
+    return image
+
+
+class Recorder:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, *args):
+        self.calls.append(args)
+        return self.result(*args)
+
+
+def landmarks_around(gray, boxes):
+    # 68 points spread over each box so landmark_boxes gives the box back
+    points = []
+    for x, y, w, h in boxes:
+        xs = np.linspace(x + w * 0.2, x + w * 0.8, 68)
+        ys = np.linspace(y + h * 0.2, y + h * 0.8, 68)
+        points.append(np.stack([xs, ys], axis=1).astype(np.int32))
+    return np.array(points)
+
+
+def test_one_detection_fans_out_to_every_head():
+    detect = Recorder(lambda gray: [FACE])
+    emotion = Recorder(lambda crops: np.tile(np.eye(7)[3], (len(crops), 1)))
+    identify = Recorder(lambda crops: [("alice", 0.9)] * len(crops))
+    landmarks = Recorder(landmarks_around)
+    pipeline = PerceptionPipeline(detect, emotion=emotion, identify=identify, landmarks=landmarks, keep_crops=True)
+
+    observation, = pipeline(frame())
+    assert observation.box == FACE
+    assert observation.name == "alice"
+    assert observation.emotion.argmax() == 3
+    assert observation.ear is not None
+    assert observation.crop.shape == (CROP_SIZE, CROP_SIZE)
+    assert len(detect.calls) == len(emotion.calls) == len(identify.calls) == len(landmarks.calls) == 1
+    # Emotion and identity see the same crops
+    assert emotion.calls[0][0][0] is identify.calls[0][0][0]
+
+
+def test_landmarks_carry_faces_between_detections():
+    detect = Recorder(lambda gray: [FACE])
+    pipeline = PerceptionPipeline(detect, landmarks=Recorder(landmarks_around), redetect_every=3)
+    for _ in range(3):
+        assert len(pipeline(frame())) == 1
+    assert len(detect.calls) == 1
+    assert pipeline.needs_crops is False
+
+
+def test_failed_heads_leave_fields_empty():
+    pipeline = PerceptionPipeline(
+        lambda gray: [FACE], emotion=lambda crops: None, identify=lambda crops: None,
+        landmarks=lambda gray, boxes: None,
+    )
+    observation, = pipeline(frame())
+    assert observation.emotion is None and observation.name is None and observation.ear is None
+    assert observation.crop is None
+
+
+def test_no_faces_means_no_head_calls():
+    emotion = Recorder(lambda crops: None)
+    pipeline = PerceptionPipeline(lambda gray: [], emotion=emotion)
+    assert pipeline(frame()) == []
+    assert emotion.calls == []
@@ -0,0 +1,70 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from preprocessing import FramePreprocessor
+
+
+class BrightSquareDetector:
+    # Box around the pixels above 128, recording the size of every image searched
+    def __init__(self):
+        self.shapes = []
+
+    def __call__(self, image):
+        self.shapes.append(image.shape)
+        ys, xs = np.nonzero(image > 128)
+        if not len(xs):
+            return []
+        return [(xs.min(), ys.min(), xs.max() - xs.min() + 1, ys.max() - ys.min() + 1)]
+
+
+def frame_with_face(x, y, size=200, shape=(1080, 1920)):
+    frame = np.zeros(shape + (3,), dtype=np.uint8)
+    frame[y:y+size, x:x+size] = 255
+    return frame
+
+
+def test_detects_on_a_downscaled_copy_and_maps_boxes_back():
+    preprocessor = FramePreprocessor(detect_width=480)
+    detector = BrightSquareDetector()
+    boxes = preprocessor.detect(detector, preprocessor.gray(frame_with_face(400, 300)))
+    assert detector.shapes == [(270, 480)]
+    (x, y, w, h), = boxes
+    assert abs(x - 400) <= 4 and abs(y - 300) <= 4 and abs(w - 200) <= 8 and abs(h - 200) <= 8
+
+
+def test_later_searches_stay_near_the_last_face_and_reuse_buffers():
+    preprocessor = FramePreprocessor(detect_width=480, full_search_every=3)
+    detector = BrightSquareDetector()
+    gray = preprocessor.gray(frame_with_face(400, 300))
+    preprocessor.detect(detector, gray)
+    small = preprocessor._small
+    gray_again = preprocessor.gray(frame_with_face(420, 300))
+    assert gray_again is gray
+    (x, _, _, _), = preprocessor.detect(detector, gray_again)
+    assert abs(x - 420) <= 4
+    assert preprocessor._small is small
+    assert detector.shapes[1][0] < 270 and detector.shapes[1][1] < 480
+    assert preprocessor.region_searches == 1
+    # Every third search covers the whole frame again
+    preprocessor.detect(detector, gray_again)
+    preprocessor.detect(detector, gray_again)
+    assert detector.shapes[-1] == (270, 480)
+
+
+def test_falls_back_to_the_whole_frame_when_the_face_moved_away():
+    preprocessor = FramePreprocessor(detect_width=480)
+    detector = BrightSquareDetector()
+    preprocessor.detect(detector, preprocessor.gray(frame_with_face(100, 100)))
+    (x, y, _, _), = preprocessor.detect(detector, preprocessor.gray(frame_with_face(1500, 800)))
+    assert abs(x - 1500) <= 4 and abs(y - 800) <= 4
+    assert detector.shapes[-1] == (270, 480)
+
+
+def test_small_frames_are_searched_as_they_are():
+    preprocessor = FramePreprocessor(detect_width=480)
+    detector = BrightSquareDetector()
+    gray = preprocessor.gray(frame_with_face(10, 10, size=20, shape=(120, 160)))
+    assert preprocessor.detect(detector, gray) == [(10, 10, 20, 20)]
+    assert detector.shapes == [(120, 160)]
@@ -0,0 +1,84 @@
+import os
+import random
+import threading
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from question_bank import QuestionBank, cache_path_for
+
+ROWS = [
+    ("What is 1 + 1?", "Easy", "2"),
+    ("What is 9 * 9?", "Hard", "81"),
+    ("What is 5 - 7?", "Medium", "-2"),
+    ("What is the square root of 18?", "easy", "Not a perfect square"),
+    ("What is 12 squared?", "Hard", "144"),
+    ("What is 3 + 4?", "Easy", "7"),
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "questions.csv"
+    lines = ["S.No.,Question,Difficulty,Answers"]
+    lines += [f"{i},{q},{d},{a}" for i, (q, d, a) in enumerate(ROWS, 1)]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_rows_are_grouped_into_difficulty_ranges(csv_path):
+    bank = QuestionBank.load(csv_path)
+    assert len(bank) == len(ROWS)
+    assert bank.ranges == {"easy": (0, 3), "medium": (3, 4), "hard": (4, 6)}
+    assert bank.count("EASY") == 3
+    assert bank.count("unknown") == 0
+
+
+def test_sample_draws_distinct_questions_of_one_difficulty(csv_path):
+    bank = QuestionBank.load(csv_path)
+    hard = bank.sample("Hard", 10, rng=random.Random(0))
+    assert len(hard) == 2
+    assert {q["Question"] for q in hard} == {"What is 9 * 9?", "What is 12 squared?"}
+    assert all(q["Difficulty"] == "Hard" for q in hard)
+
+    easy = bank.sample("easy", 2, rng=random.Random(1))
+    assert len(easy) == 2
+    assert len({q["Question"] for q in easy}) == 2
+    assert bank.sample("unknown") == []
+
+
+def test_records_keep_text_answers(csv_path):
+    bank = QuestionBank.load(csv_path)
+    answers = {q["Question"]: q["Answers"] for q in bank.sample("Easy", 3)}
+    assert answers["What is the square root of 18?"] == "Not a perfect square"
+
+
+def test_cache_is_memory_mapped_and_rebuilt_when_csv_changes(csv_path):
+    bank = QuestionBank.load(csv_path)
+    assert isinstance(bank.bank, np.memmap)
+
+    with open(csv_path, "a") as f:
+        f.write("7,What is 2 + 2?,Medium,4\n")
+    later = os.path.getmtime(cache_path_for(csv_path)) + 10
+    os.utime(csv_path, (later, later))
+    assert QuestionBank.load(csv_path).count("medium") == 2
+
+
+def test_concurrent_first_loads_share_one_cache(csv_path):
+    errors = []
+
+    def load():
+        try:
+            assert len(QuestionBank.load(csv_path)) == len(ROWS)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    leftovers = [name for name in os.listdir(os.path.dirname(csv_path)) if name.endswith(".tmp")]
+    assert leftovers == []
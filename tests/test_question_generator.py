@@ -0,0 +1,62 @@
+import math
+import re
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from question_generator import DEFAULT_RULES, NOT_A_PERFECT_SQUARE, QuestionGenerator
+
+ARITHMETIC = re.compile(r"What is (-?\d+) ([-+*]) (-?\d+)\?")
+SQUARED = re.compile(r"What is (\d+) squared\?")
+SQUARE_ROOT = re.compile(r"What is the square root of (\d+)\?")
+
+
+def expected_answer(question):
+    match = ARITHMETIC.fullmatch(question)
+    if match:
+        a, op, b = int(match[1]), match[2], int(match[3])
+        return str({"+": a + b, "-": a - b, "*": a * b}[op])
+    match = SQUARED.fullmatch(question)
+    if match:
+        return str(int(match[1]) ** 2)
+    n = int(SQUARE_ROOT.fullmatch(question)[1])
+    root = math.isqrt(n)
+    return str(root) if root * root == n else NOT_A_PERFECT_SQUARE
+
+
+@pytest.mark.parametrize("difficulty", ["Easy", "Medium", "Hard"])
+def test_answers_match_questions(difficulty):
+    records = QuestionGenerator(seed=1).sample(difficulty, 200)
+    assert len(records) == 200
+    assert len({r["Question"] for r in records}) == 200
+    for record in records:
+        assert set(record) == {"Question", "Difficulty", "Answers"}
+        assert record["Difficulty"] == difficulty
+        assert record["Answers"] == expected_answer(record["Question"])
+
+
+def test_same_seed_gives_same_quizzes():
+    first, second = QuestionGenerator(seed=7), QuestionGenerator(seed=7)
+    assert [first.sample("medium") for _ in range(3)] == [second.sample("medium") for _ in range(3)]
+    assert QuestionGenerator(seed=8).sample("medium") != QuestionGenerator(seed=7).sample("medium")
+
+
+def test_tier_rules_bound_operands_and_operators():
+    records = QuestionGenerator(seed=3).sample("Easy", 300)
+    low, high = DEFAULT_RULES["Easy"]["operands"]
+    for record in records:
+        match = ARITHMETIC.fullmatch(record["Question"])
+        if match:
+            assert match[2] in "+-"
+            assert low <= int(match[1]) <= high and low <= int(match[3]) <= high
+    answers = {r["Answers"] for r in records}
+    assert NOT_A_PERFECT_SQUARE in answers
+
+
+def test_custom_rules_and_unknown_tier():
+    rules = {"Easy": {"operands": (2, 2), "roots": (1, 1), "kinds": {"*": 1.0}}}
+    generator = QuestionGenerator(rules=rules, seed=0)
+    # Only one distinct question exists, so the batch stops short instead of repeating
+    assert generator.sample("easy", 5) == [{"Question": "What is 2 * 2?", "Difficulty": "Easy", "Answers": "4"}]
+    assert generator.sample("Impossible") == []
+    assert generator.count("Impossible") == 0
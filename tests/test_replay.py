@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from replay import ImageFolderCapture, open_capture
+
+
+@pytest.fixture
+def image_folder(tmp_path):
+    for person, value in (("b", 20), ("a", 10)):
+        (tmp_path / person).mkdir()
+        for i in range(2):
+            cv2.imwrite(str(tmp_path / person / f"{i}.png"), np.full((8, 6), value + i, dtype=np.uint8))
+    (tmp_path / "notes.txt").write_text("not an image")
+    return tmp_path
+
+
+def test_image_folder_plays_crops_as_bgr_frames_in_order(image_folder):
+    cap = open_capture(str(image_folder))
+    assert isinstance(cap, ImageFolderCapture)
+    assert cap.isOpened()
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    assert [int(f[0, 0, 0]) for f in frames] == [10, 11, 20, 21]
+    assert frames[0].shape == (8, 6, 3)
+
+
+def test_image_folder_can_loop_and_release(image_folder):
+    cap = ImageFolderCapture(str(image_folder / "a"), loop=True)
+    values = [int(cap.read()[1][0, 0, 0]) for _ in range(3)]
+    assert values == [10, 11, 10]
+    cap.release()
+    cap.loop = False
+    assert cap.read() == (False, None)
+    assert not ImageFolderCapture(str(image_folder / "missing")).isOpened()
+
+
+def test_camera_resolution_comes_from_the_environment(monkeypatch):
+    from replay import CAMERA_RESOLUTION_ENV, DEFAULT_RESOLUTION, camera_resolution
+
+    monkeypatch.delenv(CAMERA_RESOLUTION_ENV, raising=False)
+    assert camera_resolution() == DEFAULT_RESOLUTION
+    monkeypatch.setenv(CAMERA_RESOLUTION_ENV, "640x480")
+    assert camera_resolution() == (640, 480)
+    monkeypatch.setenv(CAMERA_RESOLUTION_ENV, "native")
+    assert camera_resolution() is None
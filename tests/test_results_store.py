@@ -0,0 +1,79 @@
+import pytest
+
+from results_store import ResultsStore, connect
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"), flush_interval=0.05)
+    yield store
+    store.close()
+
+
+def test_answers_and_sessions_are_written_in_the_background(store):
+    session = store.start_session("face", "ann")
+    for i, (difficulty, correct) in enumerate([("Easy", True), ("Easy", False), ("Hard", True)]):
+        store.record_answer(session, "face", f"What is {i} + 1?", difficulty, correct,
+                            latency=2.0 + i, signal="happy", student="ann")
+    store.finish_session(session, 2, 3)
+    store.flush()
+
+    summary = {row["difficulty"]: row for row in store.student_summary("ann")}
+    assert summary["Easy"]["answered"] == 2 and summary["Easy"]["correct"] == 1
+    assert summary["Hard"]["mean_latency"] == pytest.approx(4.0)
+    sessions = store.student_sessions("ann")
+    assert [(s["app"], s["score"], s["total"]) for s in sessions] == [("face", 2, 3)]
+    assert store.question_stats("What is 0 + 1?")["accuracy"] == 1.0
+    assert store.question_stats("never asked") is None
+
+
+def test_anonymous_students_and_hardest_questions(store):
+    session = store.start_session("eye")
+    for i in range(6):
+        store.record_answer(session, "eye", "hard one", "Hard", i == 0)
+        store.record_answer(session, "eye", "easy one", "Easy", True)
+    store.record_answer(session, "eye", "rare one", "Medium", False)
+    store.flush()
+    assert store.student_summary(None)[0]["answered"] > 0
+    hardest = store.hardest_questions(limit=5, min_answers=5)
+    assert [row["question"] for row in hardest] == ["hard one", "easy one"]
+
+
+def test_database_uses_wal_and_covering_indexes(store):
+    store.start_session("speech")
+    store.flush()
+    conn = connect(store.path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plans = [
+        " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        for sql, params in (
+            ("SELECT difficulty, count(*), avg(correct), avg(latency) FROM answers "
+             "WHERE student IS ? GROUP BY difficulty", ("ann",)),
+            ("SELECT count(*), avg(correct), avg(latency) FROM answers WHERE question = ?", ("q",)),
+        )
+    ]
+    assert "COVERING INDEX answers_by_student" in plans[0]
+    assert "COVERING INDEX answers_by_question" in plans[1]
+    conn.close()
+
+
+def test_rows_are_batched_into_few_transactions(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"), batch_size=500, flush_interval=0.2)
+    commits = []
+    original = store._write
+    store._write = lambda conn, batch: (commits.append(len(batch)), original(conn, batch))
+    session = store.start_session("face", "bob")
+    for i in range(1000):
+        store.record_answer(session, "face", f"q{i}", "Medium", i % 2, latency=1.0, student="bob")
+    store.close()
+    assert sum(commits) == 1001
+    assert len(commits) <= 5
+    assert store.student_summary("bob")[0]["answered"] == 1000
+
+
+def test_write_errors_are_reported_not_raised(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    store._put("INSERT INTO missing_table VALUES (?)", (1,))
+    store.flush()
+    store.close()
+    assert store.errors and "missing_table" in store.errors[0]
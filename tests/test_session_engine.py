@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from emotion_engine import EMOTION_LABELS
+from session_engine import FaceObservation, SessionEngine, _OptionalStage, box_iou
+
+
+def probs_for(emotion):
+    row = np.zeros(len(EMOTION_LABELS))
+    row[EMOTION_LABELS.index(emotion)] = 1.0
+    return row
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == pytest.approx(50 / 150)
+    assert box_iou((0, 0, 10, 10), (20, 20, 5, 5)) == 0.0
+
+
+def test_faces_are_associated_to_students_per_camera():
+    engine = SessionEngine([], analyze_faces=None, workers=1, forget_after=5.0)
+    left, right = (0, 0, 50, 50), (200, 0, 50, 50)
+    engine.update(0, [FaceObservation(left, emotion=probs_for("happy")),
+                      FaceObservation(right, ear=0.2)], now=0.0)
+    engine.update(0, [FaceObservation((205, 2, 50, 50), ear=0.2),
+                      FaceObservation((3, 1, 50, 50), emotion=probs_for("happy"), name="alice")], now=1.0)
+    engine.update(1, [FaceObservation(left, emotion=probs_for("angry"))], now=1.0)
+    students = {(s["camera"], s["student"]): s for s in engine.snapshot()}
+    assert len(students) == 3
+    assert students[(0, "alice")]["difficulty"] == "Hard"
+    assert students[(0, "cam0-student2")]["engagement"] == "Drowsy or Low Engagement"
+    assert students[(0, "cam0-student2")]["difficulty"] == "Easy"
+    assert students[(1, "cam1-student3")]["emotion"] == "angry"
+    engine.update(1, [], now=10.0)
+    assert engine.snapshot() == []
+    engine.pool.shutdown()
+
+
+def test_engine_runs_several_replayed_cameras_on_one_pool(tmp_path):
+    sources = []
+    for camera in range(3):
+        folder = tmp_path / f"cam{camera}"
+        folder.mkdir()
+        for i in range(4):
+            cv2.imwrite(str(folder / f"{i}.png"), np.full((20, 20, 3), camera, dtype=np.uint8))
+        sources.append(str(folder))
+
+    def analyze_faces(frame):
+        # One face per camera, identified by the frame's fill value
+        return [FaceObservation((0, 0, 10, 10), name=f"student{int(frame[0, 0, 0])}")]
+
+    engine = SessionEngine(sources + [str(tmp_path / "missing")], analyze_faces, workers=2)
+    engine.start()
+    engine.wait(timeout=10)
+    assert not engine.running
+    engine.stop()
+    assert sorted(s["student"] for s in engine.snapshot()) == ["student0", "student1", "student2"]
+    assert "missing" in engine.errors[3]
+
+
+def test_optional_stage_only_turns_off_on_load_errors():
+    calls = []
+
+    def flaky(x):
+        calls.append(x)
+        if x == 1:
+            raise ValueError("bad frame")
+        return x
+
+    stage = _OptionalStage("flaky", flaky)
+    assert stage(1) is None
+    assert stage(2) == 2
+    assert not stage.failed and stage.errors == 1
+
+    def missing(x):
+        raise FileNotFoundError("no model file")
+
+    stage = _OptionalStage("missing", missing)
+    assert stage(1) is None
+    assert stage.failed
+    assert stage(2) is None
+
+
+def test_engine_and_models_import_without_the_gui():
+    code = (
+        "import sys, session_engine, face_models; "
+        "print(sorted(m for m in sys.modules if m.startswith('PyQt') or m.endswith('_app')))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root)
+    assert output.stdout.strip() == "[]"
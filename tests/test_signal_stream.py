@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from signal_stream import SignalAggregator
+
+
+def test_estimate_is_exponentially_weighted():
+    stream = SignalAggregator(["a", "b"], alpha=0.5)
+    assert stream.estimate() is None
+    assert stream.dominant("none") == "none"
+    stream.update([1.0, 0.0])
+    stream.update([0.0, 1.0])
+    np.testing.assert_allclose(stream.estimate(), [0.5, 0.5])
+    stream.update([0.0, 1.0])
+    np.testing.assert_allclose(stream.estimate(), [0.25, 0.75])
+    assert stream.dominant() == "b"
+
+
+def test_window_wraps_in_chronological_order_with_fixed_memory():
+    stream = SignalAggregator(["x"], capacity=3)
+    for value in range(5):
+        stream.update([value])
+    assert stream.count == 5
+    assert stream.window()[:, 0].tolist() == [2.0, 3.0, 4.0]
+    assert stream.window_mean()[0] == pytest.approx(3.0)
+    assert stream._buffer.shape == (3, 1)
+
+
+def test_reset_forgets_history():
+    stream = SignalAggregator(["x"])
+    stream.update([1.0])
+    stream.reset()
+    assert stream.estimate() is None
+    assert len(stream.window()) == 0
@@ -0,0 +1,77 @@
+import sys
+import types
+import wave
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("speech_recognition")
+
+import speech_backends
+from speech_backends import GoogleRecognizer, VoskRecognizer, WavFileSource, get_recognizer
+
+
+def write_wav(path, samples, rate=16000, channels=1):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    return str(path)
+
+
+def test_wav_source_downmixes_stereo_to_mono_chunks(tmp_path):
+    left = np.full(8000, 1000, dtype=np.int16)
+    right = np.full(8000, 3000, dtype=np.int16)
+    path = write_wav(tmp_path / "stereo.wav", np.stack([left, right], axis=1).ravel(), channels=2)
+
+    source = WavFileSource(path, chunk_seconds=0.25)
+    chunks = list(source.chunks())
+    assert source.sample_rate == 16000
+    assert [len(chunk) for chunk in chunks] == [8000, 8000]
+    assert np.all(np.frombuffer(b"".join(chunks), dtype=np.int16) == 2000)
+
+
+def test_wav_source_rejects_non_16_bit_audio(tmp_path):
+    path = tmp_path / "8bit.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(1)
+        wav.setframerate(8000)
+        wav.writeframes(bytes(800))
+    with pytest.raises(ValueError):
+        WavFileSource(str(path))
+
+
+def test_google_recording_stops_after_silence_following_speech(tmp_path):
+    rng = np.random.default_rng(0)
+    quiet = lambda seconds: rng.normal(0, 20, int(16000 * seconds))
+    speech = 3000 * np.sin(np.arange(16000) * 0.3)
+    path = write_wav(tmp_path / "utterance.wav", np.concatenate([quiet(1), speech, quiet(3)]))
+
+    chunks = GoogleRecognizer().record(WavFileSource(path, chunk_seconds=0.25))
+    assert len(chunks) * 0.25 == pytest.approx(3.0)
+
+
+def test_explicit_recognizer_choice_wins(monkeypatch):
+    monkeypatch.setenv("SPEECH_RECOGNIZER", "google")
+    assert isinstance(get_recognizer(), GoogleRecognizer)
+    assert isinstance(get_recognizer("vosk"), VoskRecognizer)
+
+
+def test_offline_engine_is_preferred_when_its_model_exists(monkeypatch, tmp_path, capsys):
+    monkeypatch.delenv("SPEECH_RECOGNIZER", raising=False)
+    monkeypatch.setitem(sys.modules, "vosk", types.ModuleType("vosk"))
+
+    monkeypatch.setattr(speech_backends, "VOSK_MODEL_PATH", str(tmp_path))
+    assert isinstance(get_recognizer(), VoskRecognizer)
+
+    monkeypatch.setattr(speech_backends, "VOSK_MODEL_PATH", str(tmp_path / "missing"))
+    assert isinstance(get_recognizer(), GoogleRecognizer)
+    assert "VOSK_MODEL_PATH" in capsys.readouterr().out
+
+
+def test_falls_back_to_google_without_vosk(monkeypatch, capsys):
+    monkeypatch.delenv("SPEECH_RECOGNIZER", raising=False)
+    monkeypatch.setitem(sys.modules, "vosk", None)
+    assert isinstance(get_recognizer(), GoogleRecognizer)
+    assert "vosk is not installed" in capsys.readouterr().out
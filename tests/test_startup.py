@@ -0,0 +1,74 @@
+import sys
+import threading
+import time
+import pytest
+
+import startup
+from startup import LazyResource
+
+
+def test_concurrent_gets_load_once():
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    resource = LazyResource("slow", loader)
+    values = []
+    threads = [threading.Thread(target=lambda: values.append(resource.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(values) == 8 and all(value is values[0] for value in values)
+    assert resource.loaded
+
+
+def test_get_after_prefetch_returns_the_prefetched_object(monkeypatch):
+    monkeypatch.setattr(startup, "PREFETCH", True)
+    calls = []
+    resource = LazyResource("model", lambda: calls.append(1) or object())
+    resource.prefetch()
+    value = resource.get()
+    assert resource.get() is value
+    assert len(calls) == 1
+
+
+def test_prefetch_error_is_raised_again_from_get(monkeypatch):
+    monkeypatch.setattr(startup, "PREFETCH", True)
+    failures = []
+
+    def loader():
+        failures.append(1)
+        raise FileNotFoundError("weights missing")
+
+    resource = LazyResource("broken", loader)
+    resource._prefetch()
+    assert failures and not resource.loaded
+    with pytest.raises(FileNotFoundError, match="weights missing"):
+        resource.get()
+    assert not resource.loaded
+
+
+def test_profiled_import_records_each_top_level_module(tmp_path, monkeypatch):
+    (tmp_path / "profiled_outer.py").write_text("import profiled_inner\n")
+    (tmp_path / "profiled_inner.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(startup, "_timings", [])
+    try:
+        module = startup._profiled_import("profiled_outer")
+        startup._profiled_import("profiled_outer")
+    finally:
+        sys.modules.pop("profiled_outer", None)
+        sys.modules.pop("profiled_inner", None)
+    assert module.profiled_inner.VALUE == 1
+    names = [name for name, _ in startup._timings]
+    # Nested imports count towards their parent; modules already loaded are not timed again
+    assert names == ["import profiled_outer"]
+    assert startup._timings[0][1] >= 0
@@ -0,0 +1,75 @@
+import threading
+import pytest
+
+from text_emotion import LRUCache, TextEmotionService, normalize_text
+
+
+class FakeClassifier:
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def __call__(self, texts):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append(list(texts))
+        return [[{"label": "joy" if "happy" in text else "sadness", "score": 0.9}] for text in texts]
+
+
+def test_normalize_text_ignores_case_punctuation_and_spacing():
+    assert normalize_text("  I'm SO   happy!! ") == "i'm so happy"
+    assert normalize_text("I'm so happy") == normalize_text("i'm, so... HAPPY")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+
+def test_repeated_phrases_are_served_from_cache():
+    classifier = FakeClassifier()
+    service = TextEmotionService(classify_batch=classifier)
+    assert service.classify("I am happy!")[0]["label"] == "joy"
+    assert service("i am HAPPY")[0]["label"] == "joy"
+    assert classifier.batches == [["i am happy"]]
+
+
+def test_concurrent_requests_share_one_batch():
+    classifier = FakeClassifier()
+    service = TextEmotionService(classify_batch=classifier, max_wait=0.5)
+
+    futures = [service.submit(text) for text in ("so happy", "So happy!", "feeling down", "really sad")]
+    labels = [future.result(5)[0]["label"] for future in futures]
+
+    assert labels == ["joy", "joy", "sadness", "sadness"]
+    # Duplicates after normalization are classified once, in a single forward pass
+    assert len(classifier.batches) == 1
+    assert sorted(classifier.batches[0]) == ["feeling down", "really sad", "so happy"]
+
+
+def test_batch_respects_max_batch():
+    gate = threading.Event()
+    classifier = FakeClassifier(gate)
+    service = TextEmotionService(classify_batch=classifier, max_batch=2, max_wait=0.2)
+    futures = [service.submit(f"text {i}") for i in range(5)]
+    gate.set()
+    for future in futures:
+        future.result(5)
+    assert all(len(batch) <= 2 for batch in classifier.batches)
+    assert sum(len(batch) for batch in classifier.batches) == 5
+
+
+def test_classifier_errors_reach_every_waiting_caller():
+    def failing(texts):
+        raise RuntimeError("model unavailable")
+
+    service = TextEmotionService(classify_batch=failing)
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        service.classify("hello", timeout=5)
+    assert len(service.cache) == 0
@@ -0,0 +1,96 @@
+import os
+import wave
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from voice_activity import (
+    FRAME_SECONDS, SAMPLE_RATE, UtteranceSource, VoiceActivityDetector, segment_utterances,
+)
+
+
+def noise(seconds, level=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, level, int(seconds * SAMPLE_RATE)).astype(np.int16)
+
+
+def tone(seconds, amplitude=3000):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def chunked(samples, chunk=4000):
+    return [samples[i:i + chunk].tobytes() for i in range(0, len(samples), chunk)]
+
+
+class ListSource:
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def chunks(self):
+        return chunked(self.samples)
+
+
+def test_calibrates_once_then_segments_each_utterance():
+    audio = np.concatenate([noise(0.6), tone(0.5), noise(1.0, seed=1), tone(0.8), noise(1.0, seed=2)])
+    detector = VoiceActivityDetector()
+    utterances = list(segment_utterances(ListSource(audio), detector))
+    assert detector.calibrated
+    assert 40 < detector.noise_floor < 60
+    assert len(utterances) == 2
+    durations = [len(u) / SAMPLE_RATE for u in utterances]
+    assert 0.5 <= durations[0] < 1.5 and 0.8 <= durations[1] < 1.8
+
+
+def test_utterance_is_handed_off_as_soon_as_speech_ends():
+    detector = VoiceActivityDetector(noise_floor=50.0)
+    # Already calibrated: speech in the very first chunk counts
+    assert detector.feed(tone(0.3).tobytes()) == []
+    assert detector.in_speech
+    utterances = detector.feed(noise(0.7).tobytes())
+    assert len(utterances) == 1
+    assert not detector.in_speech
+
+
+def test_short_clicks_are_ignored_and_noise_floor_tracks_quiet_frames():
+    detector = VoiceActivityDetector(noise_floor=50.0)
+    click = tone(FRAME_SECONDS)
+    assert detector.feed(np.concatenate([noise(0.2), click, noise(1.0)]).tobytes()) == []
+    detector.feed(noise(3.0, level=90).tobytes())
+    assert detector.noise_floor > 80
+    assert detector.flush() == []
+
+
+def test_open_utterance_is_flushed_at_end_of_stream():
+    detector = VoiceActivityDetector(noise_floor=50.0)
+    utterances = list(segment_utterances(ListSource(tone(0.5)), detector))
+    assert len(utterances) == 1
+
+
+def test_speech_inside_the_calibration_window_keeps_a_low_floor():
+    audio = np.concatenate([noise(0.2), tone(0.8), noise(1.0, seed=1)])
+    detector = VoiceActivityDetector()
+    utterances = list(segment_utterances(ListSource(audio), detector))
+    assert detector.noise_floor < 100
+    assert len(utterances) == 1
+
+
+def test_finds_speech_in_the_bundled_recording():
+    # temp_audio.wav is the replay source; its speech starts about 0.18s in
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "temp_audio.wav")
+    with wave.open(path, "rb") as wav:
+        sample_rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    source = UtteranceSource(samples, sample_rate)
+    detector = VoiceActivityDetector(sample_rate)
+    assert len(list(segment_utterances(source, detector))) >= 1
+
+
+def test_utterance_source_replays_samples_in_chunks():
+    samples = np.arange(10000, dtype=np.int16)
+    source = UtteranceSource(samples)
+    data = b"".join(source.chunks())
+    assert np.array_equal(np.frombuffer(data, dtype=np.int16), samples)
+    assert source.duration == pytest.approx(10000 / SAMPLE_RATE)
@@ -0,0 +1,179 @@
+import threading
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+from workers import CaptureWorker, FrameSlot, StreamWorker, TaskWorker
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(40):
+        writer.write(np.full((48, 64, 3), i * 5, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def run_worker(qt_app, worker, cancel_after_ms=None):
+    events = {"frames": [], "final": None, "cancelled": False, "failed": None}
+    worker.frame_result.connect(events["frames"].append)
+    worker.finished_results.connect(lambda final: events.update(final=final))
+    worker.cancelled.connect(lambda: events.update(cancelled=True))
+    worker.failed.connect(lambda message: events.update(failed=message))
+    worker.finished.connect(qt_app.quit)
+    worker.start()
+    if cancel_after_ms is not None:
+        QtCore.QTimer.singleShot(cancel_after_ms, worker.cancel)
+    qt_app.exec()
+    worker.wait()
+    return events
+
+
+def test_frame_slot_returns_only_the_newest_frame():
+    slot = FrameSlot()
+    slot.put("a")
+    slot.put("b")
+    assert slot.get_after(0) == (2, "b")
+    assert slot.get_after(2, timeout=0.01) == (2, None)
+
+
+def test_frame_slot_wakes_waiters_on_close():
+    slot = FrameSlot()
+    threading.Timer(0.05, slot.close).start()
+    assert slot.get_after(0, timeout=5) == (0, None)
+    assert slot.closed
+
+
+def test_capture_worker_streams_results_and_finalizes(qt_app, video_path):
+    worker = CaptureWorker(lambda frame: frame.shape, finalize=len, source=video_path, max_frames=5)
+    events = run_worker(qt_app, worker)
+    # A file source can outrun analysis; stale frames are dropped, never queued
+    assert 1 <= len(events["frames"]) <= 5
+    assert set(events["frames"]) == {(48, 64, 3)}
+    assert events["final"] == len(events["frames"])
+    assert not events["cancelled"]
+
+
+def test_capture_worker_cancel_skips_finalize(qt_app, video_path):
+    finalized = []
+    worker = CaptureWorker(lambda frame: 0, finalize=finalized.append, source=video_path, interval=10)
+    events = run_worker(qt_app, worker, cancel_after_ms=100)
+    assert events["cancelled"]
+    assert events["final"] is None
+    assert finalized == []
+
+
+def test_capture_worker_reports_analysis_errors(qt_app, video_path):
+    def analyze(frame):
+        raise RuntimeError("boom")
+
+    events = run_worker(qt_app, CaptureWorker(analyze, source=video_path, max_frames=3))
+    assert events["failed"] == "boom"
+
+
+def test_capture_worker_reports_missing_source(qt_app, tmp_path):
+    events = run_worker(qt_app, CaptureWorker(lambda frame: 0, source=str(tmp_path / "missing.avi")))
+    assert events["failed"] == "Could not open camera."
+
+
+def test_task_worker_passes_progress_callback(qt_app):
+    def work(n, on_step=None):
+        for i in range(n):
+            on_step(i)
+        return "done"
+
+    progress, results = [], []
+    worker = TaskWorker(work, 3, progress_arg="on_step")
+    worker.progress.connect(progress.append)
+    worker.result.connect(results.append)
+    worker.finished.connect(qt_app.quit)
+    worker.start()
+    qt_app.exec()
+    worker.wait()
+    assert progress == [0, 1, 2]
+    assert results == ["done"]
+
+
+def test_stream_worker_emits_every_item_then_the_error(qt_app):
+    def stream(n):
+        yield from range(n)
+        raise ValueError("stream closed")
+
+    items, errors = [], []
+    worker = StreamWorker(stream, 3)
+    worker.item.connect(items.append)
+    worker.error.connect(errors.append)
+    worker.finished.connect(qt_app.quit)
+    worker.start()
+    qt_app.exec()
+    worker.wait()
+    assert items == [0, 1, 2]
+    assert [str(e) for e in errors] == ["stream closed"]
+
+
+def make_shape_analyzer():
+    return lambda frame: frame.shape
+
+
+def test_process_capture_worker_analyzes_in_other_processes(qt_app, video_path):
+    from workers import ProcessCaptureWorker
+
+    worker = ProcessCaptureWorker(make_shape_analyzer, processes=2, finalize=len, source=video_path)
+    events = run_worker(qt_app, worker)
+    assert events["failed"] is None
+    assert len(events["frames"]) >= 1
+    assert set(events["frames"]) == {(48, 64, 3)}
+    assert events["final"] == len(events["frames"])
+
+
+def test_process_capture_worker_resizes_mixed_frames_and_reports_bad_ones(qt_app, tmp_path):
+    from workers import ProcessCaptureWorker
+
+    cv2.imwrite(str(tmp_path / "0.png"), np.zeros((48, 64, 3), dtype=np.uint8))
+    cv2.imwrite(str(tmp_path / "1.png"), np.zeros((30, 40, 3), dtype=np.uint8))
+    worker = ProcessCaptureWorker(make_shape_analyzer, processes=1, finalize=len, source=str(tmp_path))
+    events = run_worker(qt_app, worker)
+    assert events["failed"] is None
+    assert set(events["frames"]) == {(48, 64, 3)}
+
+
+def test_process_capture_worker_keeps_publisher_errors_for_failed():
+    from frame_ring import FrameRing
+    from workers import ProcessCaptureWorker
+
+    class GrayCapture:
+        def read(self):
+            return True, np.zeros((48, 64), dtype=np.uint8)
+
+    class RingOnly:
+        ring = FrameRing.create((48, 64, 3), slots=2)
+
+        def publish(self, frame):
+            return self.ring.put(frame)
+
+    worker = ProcessCaptureWorker(make_shape_analyzer, processes=1)
+    try:
+        worker._publish_loop(GrayCapture(), RingOnly())
+    finally:
+        RingOnly.ring.close()
+    assert "does not match ring shape" in worker._publish_error
+    assert worker._stop.is_set()
+
+
+def test_make_capture_worker_picks_processes_from_the_environment(monkeypatch):
+    from workers import ProcessCaptureWorker, make_capture_worker
+
+    monkeypatch.delenv("QUIZ_ANALYSIS_PROCESSES", raising=False)
+    assert type(make_capture_worker(make_shape_analyzer)) is CaptureWorker
+    monkeypatch.setenv("QUIZ_ANALYSIS_PROCESSES", "3")
+    worker = make_capture_worker(make_shape_analyzer)
+    assert isinstance(worker, ProcessCaptureWorker) and worker.processes == 3
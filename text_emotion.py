@@ -0,0 +1,154 @@
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from startup import LazyResource
+
+TEXT_EMOTION_MODEL = "bhadresh-savani/distilbert-base-uncased-emotion"
+# "torch" (default), "quantized" for int8 dynamic quantization, or "onnx"
+# for an ONNX Runtime export through optimum
+TEXT_EMOTION_BACKEND = os.environ.get("TEXT_EMOTION_BACKEND", "torch")
+
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    # "I'm SO happy!!" and "i'm so happy" share one cache entry
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def load_text_classifier(backend=TEXT_EMOTION_BACKEND, model_name=TEXT_EMOTION_MODEL):
+    from transformers import AutoTokenizer, pipeline
+
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer)
+    if backend == "quantized":
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer)
+    return pipeline("text-classification", model=model_name)
+
+
+class LRUCache:
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class TextEmotionService:
+    """Classifies text emotion with micro-batching and an LRU cache.
+
+    Requests that arrive within max_wait seconds of each other are sent to
+    the model as one batch, identical normalized texts are classified once,
+    and results are cached by normalized text. Results use the pipeline's
+    format, e.g. [{"label": "joy", "score": 0.98}].
+    """
+
+    def __init__(self, classify_batch=None, max_batch=32, max_wait=0.01, cache_size=4096):
+        self.classify_batch = classify_batch or self._pipeline_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = LRUCache(cache_size)
+        self._classifier = LazyResource("text emotion classifier", load_text_classifier)
+        self._requests = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def _pipeline_batch(self, texts):
+        results = self._classifier.get()(texts, batch_size=len(texts))
+        return [[result] for result in results]
+
+    def prefetch(self):
+        self._classifier.prefetch()
+
+    def submit(self, text):
+        key = normalize_text(text)
+        future = Future()
+        cached = self.cache.get(key)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+        self._ensure_thread()
+        self._requests.put((key, future))
+        return future
+
+    def classify(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def __call__(self, text):
+        return self.classify(text)
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._batch_loop, daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._next_batch()
+            pending = {}
+            for key, future in batch:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    future.set_result(cached)
+                else:
+                    pending.setdefault(key, []).append(future)
+            if not pending:
+                continue
+            keys = list(pending)
+            try:
+                results = self.classify_batch(keys)
+            except Exception as e:
+                for futures in pending.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+            for key, result in zip(keys, results):
+                self.cache.put(key, result)
+                for future in pending[key]:
+                    future.set_result(result)
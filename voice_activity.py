@@ -0,0 +1,171 @@
+from collections import deque
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+CHUNK_SECONDS = 0.25
+# A frame is speech when its RMS is this many times the noise floor, and at least MIN_SPEECH_LEVEL
+SPEECH_RATIO = 2.0
+MIN_SPEECH_LEVEL = 100.0
+CALIBRATION_SECONDS = 0.5
+# The floor is this percentile of the calibration frames, so speech that starts
+# inside the calibration window does not raise it
+CALIBRATION_PERCENTILE = 10
+# How fast the noise floor follows the quiet frames between utterances
+NOISE_ALPHA = 0.05
+END_OF_SPEECH_SECONDS = 0.6
+PRE_ROLL_SECONDS = 0.3
+MIN_SPEECH_SECONDS = 0.15
+MAX_UTTERANCE_SECONDS = 15.0
+
+
+def frame_levels(frames):
+    # RMS of every row of an (N, frame_samples) int16 array
+    frames = frames.astype(np.float32)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+class VoiceActivityDetector:
+    """Splits a stream of 16-bit PCM chunks into utterances.
+
+    Audio is cut into FRAME_SECONDS frames whose RMS is compared with a
+    noise floor. The floor is measured once, from the quietest frames of the
+    first CALIBRATION_SECONDS, and afterwards follows the quiet frames between
+    utterances as an exponential average, so a detector kept for the whole
+    session never calibrates again. feed() returns every utterance that
+    ended inside the chunk, as int16 arrays including a short pre-roll.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_seconds=FRAME_SECONDS, noise_floor=None):
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_seconds)
+        self.noise_floor = noise_floor
+        self._calibration = []
+        self._calibration_frames = max(1, int(CALIBRATION_SECONDS / frame_seconds))
+        self._end_frames = max(1, int(END_OF_SPEECH_SECONDS / frame_seconds))
+        self._min_frames = max(1, int(MIN_SPEECH_SECONDS / frame_seconds))
+        self._max_frames = int(MAX_UTTERANCE_SECONDS / frame_seconds)
+        self._pre_roll = deque(maxlen=max(1, int(PRE_ROLL_SECONDS / frame_seconds)))
+        self._pending = np.empty(0, dtype=np.int16)
+        self.reset()
+
+    def reset(self):
+        # Drop any half-heard utterance; the noise floor is kept
+        self._utterance = []
+        self._speech_frames = 0
+        self._silent_frames = 0
+        self._pre_roll.clear()
+        self._pending = self._pending[:0]
+
+    @property
+    def calibrated(self):
+        return self.noise_floor is not None
+
+    @property
+    def in_speech(self):
+        return bool(self._utterance)
+
+    @property
+    def threshold(self):
+        return max(SPEECH_RATIO * (self.noise_floor or 0.0), MIN_SPEECH_LEVEL)
+
+    def _calibrate(self, levels):
+        needed = self._calibration_frames - len(self._calibration)
+        self._calibration.extend(levels[:needed].tolist())
+        if len(self._calibration) >= self._calibration_frames:
+            self.noise_floor = float(np.percentile(self._calibration, CALIBRATION_PERCENTILE))
+            self._calibration = []
+        return min(needed, len(levels))
+
+    def _update_noise(self, levels):
+        # The EWMA over a batch of quiet frames in closed form
+        if not len(levels):
+            return
+        decay = (1.0 - NOISE_ALPHA) ** np.arange(len(levels) - 1, -1, -1)
+        self.noise_floor = float(
+            (1.0 - NOISE_ALPHA) ** len(levels) * self.noise_floor + NOISE_ALPHA * np.dot(decay, levels)
+        )
+
+    def feed(self, chunk):
+        samples = np.frombuffer(chunk, dtype=np.int16) if isinstance(chunk, (bytes, bytearray)) else chunk
+        if len(self._pending):
+            samples = np.concatenate([self._pending, samples])
+        count = len(samples) // self.frame_samples
+        self._pending = samples[count * self.frame_samples:].copy()
+        if not count:
+            return []
+        frames = samples[:count * self.frame_samples].reshape(count, self.frame_samples)
+        levels = frame_levels(frames)
+        start = 0 if self.calibrated else self._calibrate(levels)
+        for frame in frames[:start]:
+            self._pre_roll.append(frame)
+
+        speech = levels > self.threshold
+        quiet = []
+        utterances = []
+        for i in range(start, count):
+            frame = frames[i]
+            if speech[i]:
+                if not self._utterance:
+                    self._utterance = list(self._pre_roll)
+                    self._pre_roll.clear()
+                self._utterance.append(frame)
+                self._speech_frames += 1
+                self._silent_frames = 0
+            elif self._utterance:
+                self._utterance.append(frame)
+                self._silent_frames += 1
+            else:
+                self._pre_roll.append(frame)
+                quiet.append(levels[i])
+            if self._utterance and (
+                self._silent_frames >= self._end_frames or len(self._utterance) >= self._max_frames
+            ):
+                utterance = self._finish()
+                if utterance is not None:
+                    utterances.append(utterance)
+        if self.calibrated:
+            self._update_noise(np.asarray(quiet, dtype=np.float64))
+        return utterances
+
+    def flush(self):
+        # The utterance still open when the stream ends, if it had enough speech
+        if not self._utterance:
+            return []
+        utterance = self._finish()
+        return [] if utterance is None else [utterance]
+
+    def _finish(self):
+        frames, speech_frames = self._utterance, self._speech_frames
+        self._utterance = []
+        self._speech_frames = 0
+        self._silent_frames = 0
+        if speech_frames < self._min_frames:
+            return None
+        return np.concatenate(frames)
+
+
+def segment_utterances(source, detector):
+    # Utterances from one open source, each yielded as soon as its speech ends
+    for chunk in source.chunks():
+        yield from detector.feed(chunk)
+    yield from detector.flush()
+
+
+class UtteranceSource:
+    # A segmented utterance replayed through the chunks() interface the recognizers read
+    def __init__(self, samples, sample_rate=SAMPLE_RATE, chunk_seconds=CHUNK_SECONDS):
+        self.samples = np.asarray(samples, dtype=np.int16)
+        self.sample_rate = sample_rate
+        self.chunk_frames = int(sample_rate * chunk_seconds)
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    def stop(self):
+        pass
+
+    def chunks(self):
+        for start in range(0, len(self.samples), self.chunk_frames):
+            yield self.samples[start:start + self.chunk_frames].tobytes()
@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+from replay import open_capture
+from frame_ring import FrameSlot
+import metrics
+
+ANALYSIS_PROCESSES_ENV = "QUIZ_ANALYSIS_PROCESSES"
+
+
+class CaptureWorker(QThread):
+    """Grabs camera frames on one thread and analyzes them on another.
+
+    analyze_frame(frame) runs for every frame picked up by the analysis loop
+    and its return value is streamed through frame_result. Once capture ends,
+    finalize(results) runs on the worker thread and its return value is sent
+    through finished_results. cancel() stops both loops without finalizing.
+    source may be a camera index, a video file or an image folder.
+    """
+
+    frame_result = pyqtSignal(object)
+    finished_results = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, analyze_frame, finalize=None, source=0, max_frames=None,
+                 duration=None, interval=0.0, parent=None):
+        super().__init__(parent)
+        self.analyze_frame = analyze_frame
+        self.finalize = finalize
+        self.source = source
+        self.max_frames = max_frames
+        self.duration = duration
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def cancel(self):
+        self._stop.set()
+
+    def is_cancelled(self):
+        return self._stop.is_set()
+
+    def _grab_loop(self, cap, slot):
+        while not self._stop.is_set():
+            with metrics.timed("capture"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            slot.put(frame)
+        slot.close()
+
+    def run(self):
+        cap = open_capture(self.source)
+        if not cap.isOpened():
+            self.failed.emit("Could not open camera.")
+            return
+
+        slot = FrameSlot()
+        grabber = threading.Thread(target=self._grab_loop, args=(cap, slot), daemon=True)
+        grabber.start()
+
+        results = []
+        seq = 0
+        start_time = time.time()
+        try:
+            while not self._stop.is_set():
+                if self.max_frames is not None and len(results) >= self.max_frames:
+                    break
+                if self.duration is not None and time.time() - start_time >= self.duration:
+                    break
+                seq, frame = slot.get_after(seq)
+                if frame is None:
+                    if slot.closed:
+                        break
+                    continue
+                result = self.analyze_frame(frame)
+                results.append(result)
+                self.frame_result.emit(result)
+                if self.interval:
+                    self._stop.wait(self.interval)
+        except Exception as e:
+            self._stop.set()
+            grabber.join()
+            cap.release()
+            self.failed.emit(str(e))
+            return
+
+        cancelled = self._stop.is_set()
+        self._stop.set()
+        grabber.join()
+        cap.release()
+
+        if cancelled:
+            self.cancelled.emit()
+            return
+        try:
+            final = self.finalize(results) if self.finalize else results
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished_results.emit(final)
+
+
+class ProcessCaptureWorker(CaptureWorker):
+    """CaptureWorker whose analysis runs in separate processes.
+
+    Frames go through a shared-memory FrameRing instead of being pickled,
+    and analyzer_factory (a module-level function returning analyze_frame)
+    is called once in each of the processes. Results can finish out of
+    order; any older than the last one emitted are dropped.
+    """
+
+    def __init__(self, analyzer_factory, processes=2, **kwargs):
+        super().__init__(None, **kwargs)
+        self.analyzer_factory = analyzer_factory
+        self.processes = processes
+        self._publish_error = None
+
+    def _publish_loop(self, cap, pool):
+        import cv2
+
+        # The ring has the first frame's shape; later frames of another size (an
+        # image folder with mixed sizes) are resized to it, anything else fails the run
+        height, width = pool.ring.shape[:2]
+        try:
+            while not self._stop.is_set():
+                with metrics.timed("capture"):
+                    ret, frame = cap.read()
+                if not ret:
+                    break
+                if frame.shape != pool.ring.shape and frame.shape[2:] == pool.ring.shape[2:]:
+                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                pool.publish(frame)
+        except Exception as e:
+            self._publish_error = str(e)
+            self._stop.set()
+
+    def run(self):
+        from frame_ring import AnalysisError, AnalysisPool, Overwritten
+
+        cap = open_capture(self.source)
+        ret, frame = cap.read() if cap.isOpened() else (False, None)
+        if not ret:
+            cap.release()
+            self.failed.emit("Could not open camera.")
+            return
+
+        pool = AnalysisPool(self.analyzer_factory, frame.shape, self.processes)
+        pool.publish(frame)
+        grabber = threading.Thread(target=self._publish_loop, args=(cap, pool), daemon=True)
+        grabber.start()
+
+        results = []
+        last_seq = 0
+        error = None
+        start_time = time.time()
+        while not self._stop.is_set():
+            if self.max_frames is not None and len(results) >= self.max_frames:
+                break
+            if self.duration is not None and time.time() - start_time >= self.duration:
+                break
+            item = pool.get_result(timeout=0.1)
+            if item is None:
+                if not grabber.is_alive() and pool.idle:
+                    break
+                continue
+            seq, result = item
+            if isinstance(result, AnalysisError):
+                error = result.message
+                break
+            if isinstance(result, Overwritten) or seq < last_seq:
+                continue
+            last_seq = seq
+            results.append(result)
+            self.frame_result.emit(result)
+
+        cancelled = self._stop.is_set()
+        self._stop.set()
+        grabber.join()
+        cap.release()
+        pool.close()
+
+        error = error or self._publish_error
+        if error is not None:
+            self.failed.emit(error)
+        elif cancelled:
+            self.cancelled.emit()
+        else:
+            try:
+                final = self.finalize(results) if self.finalize else results
+            except Exception as e:
+                self.failed.emit(str(e))
+                return
+            self.finished_results.emit(final)
+
+
+def make_capture_worker(analyzer_factory, **kwargs):
+    # QUIZ_ANALYSIS_PROCESSES=N moves frame analysis into N processes
+    processes = int(os.environ.get(ANALYSIS_PROCESSES_ENV, "0") or 0)
+    if processes > 0:
+        return ProcessCaptureWorker(analyzer_factory, processes=processes, **kwargs)
+    return CaptureWorker(analyzer_factory(), **kwargs)
+
+
+class StreamWorker(QThread):
+    # Runs a generator (e.g. continuous listening) off the GUI thread and emits each item
+    item = pyqtSignal(object)
+    error = pyqtSignal(object)
+
+    def __init__(self, fn, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            for value in self.fn(*self.args, **self.kwargs):
+                self.item.emit(value)
+        except Exception as e:
+            self.error.emit(e)
+
+
+class TaskWorker(QThread):
+    # Runs a single blocking call (e.g. microphone listening) off the GUI thread.
+    # If progress_arg is given, the call receives progress.emit under that name.
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    progress = pyqtSignal(object)
+
+    def __init__(self, fn, *args, parent=None, progress_arg=None, **kwargs):
+        super().__init__(parent)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        if progress_arg is not None:
+            self.kwargs[progress_arg] = self.progress.emit
+
+    def run(self):
+        try:
+            value = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error.emit(e)
+            return
+        self.result.emit(value)